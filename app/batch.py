@@ -0,0 +1,138 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from utils import decimation, helpers, implicit
+from utils.exceptions import ValidationError
+
+MANIFEST_FIELDS = ("function", "xmin", "xmax", "style", "output")
+REQUIRED_MANIFEST_FIELDS = ("function", "xmin", "xmax", "output")
+
+class BatchItem:
+    """One plot to render: a function, its x range, a matplotlib format string and an output path."""
+
+    def __init__(self, function: str, xmin: str, xmax: str, style: str, output: str):
+        self.function = function
+        self.xmin = xmin
+        self.xmax = xmax
+        self.style = style
+        self.output = output
+
+class BatchResult:
+    """The outcome of rendering one batch item."""
+
+    def __init__(self, index: int, item: BatchItem, seconds: float, error: str | None = None):
+        self.index = index
+        self.item = item
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def load_manifest(manifest_path: str) -> list[BatchItem]:
+    """Load batch items from a CSV file with a header row or a JSON list of objects."""
+    with open(manifest_path, newline="") as manifest_file:
+        if manifest_path.lower().endswith(".json"):
+            rows = json.load(manifest_file)
+        else:
+            rows = list(csv.DictReader(manifest_file))
+    if not isinstance(rows, list):
+        raise ValidationError("manifest must be a list of plots.")
+    items = []
+    for row_number, row in enumerate(rows, start=1):
+        fields = {field: "" if row.get(field) is None else str(row.get(field)).strip() for field in MANIFEST_FIELDS}
+        missing_fields = [field for field in REQUIRED_MANIFEST_FIELDS if not fields[field]]
+        if missing_fields:
+            raise ValidationError(f"manifest entry {row_number} is missing {', '.join(missing_fields)}.")
+        items.append(BatchItem(**fields))
+    return items
+
+def render_item(item: BatchItem, num_samples: int = helpers.PLOT_NUM_SAMPLES) -> None:
+    """Evaluate and render one batch item to its output file with the Agg backend."""
+    cached_expression = helpers.get_cached_expression(item.function)
+    xmin, xmax = helpers.get_x_range(item.xmin, item.xmax)
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    if helpers.is_implicit(cached_expression.tree):
+        x_data, y_data = implicit.contour(cached_expression.kernel, xmin, xmax, xmin, xmax)
+    else:
+        x_data, y_data = decimation.decimate(*helpers.evaluate_function(cached_expression.kernel, xmin, xmax, num_samples), xmin, xmax, ax.bbox.width)
+    ax.plot(x_data, y_data, item.style or "-", label=helpers.get_label(cached_expression.tree))
+    ax.legend()
+    output_directory = os.path.dirname(item.output)
+    if output_directory:
+        os.makedirs(output_directory, exist_ok=True)
+    figure.savefig(item.output)
+
+def render_item_safely(index: int, item: BatchItem, num_samples: int = helpers.PLOT_NUM_SAMPLES) -> BatchResult:
+    """Render one batch item, reporting any failure in the result instead of raising."""
+    start = time.perf_counter()
+    try:
+        render_item(item, num_samples)
+    except Exception as error:
+        return BatchResult(index, item, time.perf_counter() - start, str(error) or type(error).__name__)
+    return BatchResult(index, item, time.perf_counter() - start)
+
+def run_batch(items: list[BatchItem], workers: int = 1, num_samples: int = helpers.PLOT_NUM_SAMPLES, on_result=None) -> list[BatchResult]:
+    """Render batch items across a pool of worker processes, in-process when workers is 1."""
+    results = []
+    if workers <= 1:
+        for index, item in enumerate(items):
+            result = render_item_safely(index, item, num_samples)
+            results.append(result)
+            if on_result:
+                on_result(result, len(results), len(items))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(render_item_safely, index, item, num_samples): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    # a worker process that died or a result that could not be sent back fails only its own item
+                    result = BatchResult(index, items[index], 0.0, str(error) or type(error).__name__)
+                results.append(result)
+                if on_result:
+                    on_result(result, len(results), len(items))
+    return sorted(results, key=lambda result: result.index)
+
+def print_progress(result: BatchResult, done: int, total: int) -> None:
+    """Print one progress line for a finished item."""
+    status = "ok" if result.ok else "failed"
+    print(f"[{done}/{total}] {status} {result.item.output} ({result.seconds:.2f} s)", flush=True)
+
+def print_summary(results: list[BatchResult], seconds: float) -> None:
+    """Print the totals and an error report for the failed items."""
+    failed = [result for result in results if not result.ok]
+    print(f"Rendered {len(results) - len(failed)} of {len(results)} plots in {seconds:.2f} s, {len(failed)} failed.")
+    for result in failed:
+        print(f"  entry {result.index + 1} ({result.item.function!r} -> {result.item.output}): {result.error}")
+
+def main(argv: list[str] | None = None) -> int:
+    """Render every plot of a manifest without starting the GUI."""
+    parser = argparse.ArgumentParser(description="Render function plots listed in a CSV or JSON manifest.")
+    parser.add_argument("manifest", help="CSV or JSON manifest with function, xmin, xmax, style and output fields")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--samples", type=int, default=helpers.PLOT_NUM_SAMPLES, help="number of samples per plot")
+    args = parser.parse_args(argv)
+    try:
+        items = load_manifest(args.manifest)
+    except (ValidationError, ValueError, OSError) as error:
+        print(f"Could not load manifest: {error}", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    results = run_batch(items, args.workers, args.samples, on_result=print_progress)
+    print_summary(results, time.perf_counter() - start)
+    return 0 if all(result.ok for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
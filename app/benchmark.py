@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import matplotlib
+import numpy as np
+import sympy
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from utils import decimation, helpers
+from utils.exceptions import ValidationError
+
+CORPUS = {
+    "polynomial": "5*x^3 + 2*x^2 - x + 1",
+    "trigonometric": "sin(x) + cos(2*x)",
+    "nested": "exp(sin(x^2)) * log(1 + cos(x)^2)",
+    "piecewise_like": "abs(x) + sign(x)*sqrt(abs(x))",
+    "singular": "1/x + tan(x)",
+}
+SAMPLE_COUNTS = (1_000, 100_000, 1_000_000)
+X_RANGE = (-10.0, 10.0)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+MIN_COMPARED_SECONDS = 1e-4
+RESULTS_PATH = "benchmarks/results.json"
+BASELINE_PATH = "benchmarks/baseline.json"
+
+def measure(stage, repeat: int) -> dict:
+    """Time a stage as the median of repeat runs, then measure its peak traced memory in one more run."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        stage()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(durations), "peak_bytes": peak_bytes}
+
+def parse_stage(function_string: str):
+    """Parse a function string with an empty expression cache."""
+    def stage():
+        helpers.expression_cache.clear()
+        helpers.get_cached_expression(function_string)
+    return stage
+
+def compile_stage(function_string: str):
+    """Compile the kernel of a freshly parsed function string."""
+    def stage():
+        helpers.expression_cache.clear()
+        helpers.get_cached_expression(function_string).kernel
+    return stage
+
+def evaluate_stage(function_string: str, num_samples: int):
+    """Evaluate a compiled function over the benchmark range."""
+    kernel = helpers.get_cached_expression(function_string).kernel
+    def stage():
+        helpers.evaluate_function(kernel, *X_RANGE, num_samples)
+    return stage
+
+def get_derivative_trees(function_string: str, order: int = 2) -> list:
+    """Get the tree of a function followed by the trees of its symbolic derivatives up to order."""
+    trees = [helpers.get_cached_expression(function_string).tree]
+    for _ in range(order):
+        trees.append(helpers.get_derivative_tree(str(trees[-1])))
+    return trees
+
+def fused_stage(trees: list, num_samples: int):
+    """Evaluate a function and its derivatives in one fused pass over the benchmark range."""
+    fused_kernel = helpers.compile_fused_functions(trees)
+    x_data = np.linspace(*X_RANGE, num_samples)
+    def stage():
+        helpers.evaluate_fused_at(fused_kernel, x_data)
+    return stage
+
+def separate_stage(trees: list, num_samples: int):
+    """Evaluate a function and its derivatives with one kernel each over the benchmark range, for comparison with fused_stage."""
+    kernels = [helpers.compile_function(tree) for tree in trees]
+    x_data = np.linspace(*X_RANGE, num_samples)
+    def stage():
+        for kernel in kernels:
+            helpers.evaluate_at(kernel, x_data)
+    return stage
+
+def draw_stage(function_string: str, num_samples: int):
+    """Render the sampled function, decimated for the canvas width, on a headless Agg canvas."""
+    x_data, y_data = helpers.evaluate_function(helpers.get_cached_expression(function_string).kernel, *X_RANGE, num_samples)
+    figure = Figure()
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    ax.plot(*decimation.decimate(x_data, y_data, *X_RANGE, ax.bbox.width))
+    def stage():
+        canvas.draw()
+    return stage
+
+def run_benchmarks(corpus: dict[str, str] = CORPUS, sample_counts=SAMPLE_COUNTS, repeat: int = DEFAULT_REPEAT, on_result=None) -> dict:
+    """Time every pipeline stage for every corpus expression and return the results keyed by name/stage[/samples]."""
+    results = {}
+
+    def add(key: str, stage):
+        results[key] = measure(stage, repeat)
+        if on_result:
+            on_result(key, results[key])
+
+    for name, function_string in corpus.items():
+        add(f"{name}/parse", parse_stage(function_string))
+        add(f"{name}/compile", compile_stage(function_string))
+        try:
+            derivative_trees = get_derivative_trees(function_string)
+        except ValidationError:
+            # sympy writes some derivatives, such as that of abs, with functions the plotter grammar lacks
+            derivative_trees = None
+        for num_samples in sample_counts:
+            add(f"{name}/evaluate/{num_samples}", evaluate_stage(function_string, num_samples))
+            add(f"{name}/draw/{num_samples}", draw_stage(function_string, num_samples))
+            if derivative_trees:
+                add(f"{name}/fused/{num_samples}", fused_stage(derivative_trees, num_samples))
+                add(f"{name}/separate/{num_samples}", separate_stage(derivative_trees, num_samples))
+    return {"metadata": get_metadata(repeat), "results": results}
+
+def get_metadata(repeat: int) -> dict:
+    """Describe the machine and library versions the benchmarks ran with."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sympy": sympy.__version__,
+        "matplotlib": matplotlib.__version__,
+        "repeat": repeat,
+    }
+
+def compare_results(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """List the measurements that got slower than the baseline by more than threshold."""
+    regressions = []
+    for key, measurement in results["results"].items():
+        baseline_measurement = baseline["results"].get(key)
+        if baseline_measurement is None:
+            continue
+        seconds, baseline_seconds = measurement["seconds"], baseline_measurement["seconds"]
+        if max(seconds, baseline_seconds) < MIN_COMPARED_SECONDS:
+            continue
+        if seconds > baseline_seconds * (1 + threshold):
+            regressions.append({"key": key, "baseline_seconds": baseline_seconds, "seconds": seconds, "ratio": seconds / baseline_seconds})
+    return regressions
+
+def write_json(file_name: str, data: dict) -> None:
+    """Write data as indented JSON, creating the parent directory if needed."""
+    directory = os.path.dirname(file_name)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_name, "w") as json_file:
+        json.dump(data, json_file, indent=2)
+
+def print_result(key: str, measurement: dict) -> None:
+    """Print one measurement."""
+    print(f"{key:<40} {measurement['seconds'] * 1000:>10.3f} ms {measurement['peak_bytes'] / 1024:>12.1f} KiB", flush=True)
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark suite, save the results and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark parsing, evaluation and rendering of the plotter pipeline.")
+    parser.add_argument("--samples", type=int, nargs="+", default=list(SAMPLE_COUNTS), help="sample counts to evaluate and draw")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per measurement")
+    parser.add_argument("--output", default=RESULTS_PATH, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown reported as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="also save the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    helpers.configure_logging()
+    results = run_benchmarks(CORPUS, sample_counts=args.samples, repeat=args.repeat, on_result=print_result)
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as baseline_file:
+        regressions = compare_results(results, json.load(baseline_file), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['key']}: {regression['baseline_seconds'] * 1000:.3f} ms -> {regression['seconds'] * 1000:.3f} ms ({regression['ratio']:.2f}x)")
+    print(f"{len(regressions)} regressions above {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,18 +11,32 @@ from PySide6.QtWidgets import (
     QColorDialog,
     QInputDialog,
     QScrollArea,
+    QProgressBar,
+    QCheckBox,
+    QComboBox,
 )
-from PySide6.QtCore import Qt, QTimer
-import sympy
+from PySide6.QtCore import Qt, QTimer, QThreadPool, Signal
 import numpy as np
-import re
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.colors import to_hex
 from matplotlib.figure import Figure
-from utils.enums import MessageType
+from utils.enums import MessageType, OverlayKind, SamplingMode, SurfaceStyle
 from utils.exceptions import ValidationError
-from utils import helpers
+from utils import export, helpers, session, surfaces, viewport, widgets
+from utils.curves import DEFAULT_MEMORY_BUDGET_BYTES, Curve, OverlayCurve, enforce_memory_budget, resample_curves
+from utils.implicit import ImplicitCurve
+from utils.interaction import InteractionLayer
+from utils.workers import EvaluationJob, ExportJob, IntegralJob, PlotResult, evaluate_plot_request
+from utils.widgets import InstrumentedFigureCanvas as FigureCanvas
+from utils.instrumentation import instrumentation
+
+PREVIEW_DEBOUNCE_MILLISECONDS = 300
+# the choices of the two-variable function combo box, in order
+SURFACE_STYLES = {"Implicit curve f(x, y) = 0": None, "Heatmap z = f(x, y)": SurfaceStyle.HEATMAP, "Contour plot z = f(x, y)": SurfaceStyle.CONTOUR}
 
 class FunctionPlotter(QMainWindow):
+    plot_finished = Signal()
+    integral_finished = Signal(str)
+
     def __init__(self):
         super().__init__()
         self.init_variables()
@@ -35,22 +49,53 @@ class FunctionPlotter(QMainWindow):
         self.ax = None
         self.grid_visible = False
         self.legend_visible = False
+        self.num_samples = helpers.PLOT_NUM_SAMPLES
+        self.sampling_mode = SamplingMode.UNIFORM
+        self.curves = []
+        self.implicit_curves = []
+        self.surfaces = []
+        self.mesh_cache = surfaces.MeshCache()
+        self.overlays = []
+        self.background_evaluation = True
+        self.thread_pool = QThreadPool()
+        self.evaluation_job = None
+        self.evaluation_job_id = 0
+        self.export_job = None
+        self.export_job_id = 0
+        self.integral_job = None
+        self.integral_job_id = 0
+        self.integral_message_timeout_seconds = 0
+        self.export_message_timeout_seconds = 0
+        self.plot_options = (0, False, False)
+        self.preview_key = None
+        self.session_path = None
+        self.curve_dtype = np.float64
+        self.memory_budget_bytes = DEFAULT_MEMORY_BUDGET_BYTES
 
     def create_widgets(self):
         self.scroll_area = QScrollArea()
-        self.function_label = QLabel("Enter a function of x:")
+        self.function_label = QLabel("Enter a function of x, or a function or equation of x and y:")
         self.function_input = QLineEdit()
         self.xmin_label = QLabel("Enter the minimum value of x:")
         self.xmin_input = QLineEdit()
         self.xmax_label = QLabel("Enter the maximum value of x:")
         self.xmax_input = QLineEdit()
+        self.live_preview_checkbox = QCheckBox("Live Preview")
+        self.surface_style_combo_box = QComboBox()
+        self.surface_style_combo_box.addItems(list(SURFACE_STYLES))
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DEBOUNCE_MILLISECONDS)
         self.plot_button = QPushButton("Plot")
         self.zoom_in_button = QPushButton("Zoom In")
         self.zoom_out_button = QPushButton("Zoom Out")
         self.reset_button = QPushButton("Reset")
         self.save_image_button = QPushButton("Save Image")
+        self.export_data_button = QPushButton("Export Data")
         self.derivative_button = QPushButton("Derivative")
         self.integral_button = QPushButton("Integral")
+        self.derivative_curve_button = QPushButton("Plot Derivative Curve")
+        self.integral_curve_button = QPushButton("Plot Integral Curve")
         self.change_color_button = QPushButton("Change Color")
         self.toggle_grid_button = QPushButton("Toggle Gridlines")
         self.toggle_legend_button = QPushButton("Toggle Legend")
@@ -62,6 +107,21 @@ class FunctionPlotter(QMainWindow):
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setMinimumSize(800, 420)
+        self.interaction = InteractionLayer(self.canvas)
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setMaximumWidth(120)
+        self.busy_indicator.setVisible(False)
+        self.export_progress_bar = QProgressBar()
+        self.export_progress_bar.setRange(0, 100)
+        self.export_progress_bar.setMaximumWidth(120)
+        self.export_progress_bar.setVisible(False)
+        self.cancel_export_button = QPushButton("Cancel Export")
+        self.cancel_export_button.setVisible(False)
+        self.timings_label = QLabel()
+        self.save_timings_button = QPushButton("Save Timings")
+        self.save_session_button = QPushButton("Save Session")
+        self.open_session_button = QPushButton("Open Session")
 
     def create_layout(self):
         """Create the layout for the main window."""
@@ -72,6 +132,8 @@ class FunctionPlotter(QMainWindow):
         self.layout.addWidget(self.xmin_input)
         self.layout.addWidget(self.xmax_label)
         self.layout.addWidget(self.xmax_input)
+        self.layout.addWidget(self.live_preview_checkbox)
+        self.layout.addWidget(self.surface_style_combo_box)
         self.layout.addWidget(self.plot_button)
         self.layout.addWidget(self.canvas)
         self.layout.addWidget(self.title_button)
@@ -81,12 +143,18 @@ class FunctionPlotter(QMainWindow):
         self.layout.addWidget(self.zoom_out_button)
         self.layout.addWidget(self.reset_button)
         self.layout.addWidget(self.save_image_button)
+        self.layout.addWidget(self.export_data_button)
         self.layout.addWidget(self.derivative_button)
         self.layout.addWidget(self.integral_button)
+        self.layout.addWidget(self.derivative_curve_button)
+        self.layout.addWidget(self.integral_curve_button)
         self.layout.addWidget(self.change_color_button)
         self.layout.addWidget(self.toggle_grid_button)
         self.layout.addWidget(self.toggle_legend_button)
         self.layout.addWidget(self.plot_another_function_button)
+        self.layout.addWidget(self.save_timings_button)
+        self.layout.addWidget(self.save_session_button)
+        self.layout.addWidget(self.open_session_button)
         self.layout.addWidget(self.cursor_label)
 
     def set_layout(self):
@@ -98,17 +166,31 @@ class FunctionPlotter(QMainWindow):
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setWidget(central_widget)
         self.setCentralWidget(self.scroll_area)
+        self.statusBar().addPermanentWidget(self.timings_label)
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+        self.statusBar().addPermanentWidget(self.export_progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_export_button)
         self.setGeometry(600, 100, 1000, 900)
 
     def connect_signals(self):
         """Connect signals to slots."""
         self.plot_button.clicked.connect(self.plot)
+        self.function_input.textChanged.connect(self.schedule_preview)
+        self.xmin_input.textChanged.connect(self.schedule_preview)
+        self.xmax_input.textChanged.connect(self.schedule_preview)
+        self.live_preview_checkbox.toggled.connect(self.schedule_preview)
+        self.surface_style_combo_box.currentIndexChanged.connect(self.schedule_preview)
+        self.preview_timer.timeout.connect(self.update_preview)
         self.zoom_in_button.clicked.connect(self.zoom_in)
         self.zoom_out_button.clicked.connect(self.zoom_out)
         self.reset_button.clicked.connect(self.reset_plot)
         self.save_image_button.clicked.connect(self.save_image)
+        self.export_data_button.clicked.connect(self.export_data)
+        self.cancel_export_button.clicked.connect(self.cancel_export)
         self.derivative_button.clicked.connect(self.get_derivative)
         self.integral_button.clicked.connect(self.get_integral)
+        self.derivative_curve_button.clicked.connect(self.plot_derivative_curve)
+        self.integral_curve_button.clicked.connect(self.plot_integral_curve)
         self.change_color_button.clicked.connect(self.change_color)
         self.toggle_grid_button.clicked.connect(self.toggle_grid)
         self.toggle_legend_button.clicked.connect(self.toggle_legend)
@@ -116,19 +198,30 @@ class FunctionPlotter(QMainWindow):
         self.x_label_button.clicked.connect(self.change_x_label)
         self.y_label_button.clicked.connect(self.change_y_label)
         self.title_button.clicked.connect(self.change_title)
+        self.save_timings_button.clicked.connect(self.save_timings)
+        self.save_session_button.clicked.connect(self.save_session)
+        self.open_session_button.clicked.connect(self.open_session)
+        self.canvas.drawn.connect(self.update_timings)
         self.canvas.mpl_connect("button_press_event", self.on_press_canvas)
         self.canvas.mpl_connect("button_release_event", self.on_release_canvas)
         self.canvas.mpl_connect("motion_notify_event", self.on_motion_canvas)
+        self.canvas.mpl_connect("scroll_event", self.on_scroll_canvas)
+        self.canvas.mpl_connect("resize_event", self.on_resize_canvas)
 
     def on_press_canvas(self, event):
         """When the mouse is pressed, record the x and y coordinates."""
         if event.inaxes != self.ax:
             return
         self.press = event.xdata, event.ydata
+        if self.ax:
+            self.interaction.start_pan([curve.line for curve in self.curves + self.implicit_curves + self.overlays], *self.press)
 
     def on_release_canvas(self, event):
         """When the mouse is released, record the x and y coordinates and"""
         if self.ax:
+            if self.interaction.panning:
+                self.interaction.end_pan()
+                self.canvas.draw_idle()
             if event.inaxes != self.ax:
                 return
             self.release = event.xdata, event.ydata
@@ -142,67 +235,247 @@ class FunctionPlotter(QMainWindow):
                 ylim[0] + (self.press[1] - self.release[1]),
                 ylim[1] + (self.press[1] - self.release[1]),
             )
-            self.canvas.draw()
+            self.refresh_curves()
+            self.canvas.draw_idle()
 
     def on_motion_canvas(self, event):
-        """When the mouse is moved, update the cursor label"""
+        """When the mouse is moved, update the cursor label and blit the crosshair or the pan offset"""
         if self.ax:
             if event.inaxes != self.ax:
                 return
             x, y = event.xdata, event.ydata
+            if self.interaction.panning:
+                self.interaction.update_pan(x, y)
+            else:
+                self.interaction.update_crosshair(x, y)
             x = round(x, 2)
             y = round(y, 2)
             self.cursor_label.setText(f"x: {x}, y: {y}")
 
-    def plot(self, message_timeout_seconds=0, is_another_function=False):
+    def on_scroll_canvas(self, event):
+        """When the mouse wheel is scrolled, zoom around the cursor position"""
+        if not self.ax or event.inaxes != self.ax:
+            return
+        factor = viewport.ZOOM_IN_FACTOR if event.button == "up" else viewport.ZOOM_OUT_FACTOR
+        self.ax.set_xlim(viewport.zoom_limits(self.ax.get_xlim(), event.xdata, factor))
+        self.ax.set_ylim(viewport.zoom_limits(self.ax.get_ylim(), event.ydata, factor))
+        self.refresh_curves()
+        self.canvas.draw_idle()
+
+    def refresh_curves(self):
+        """Resample every curve for the visible x range"""
+        view_xmin, view_xmax = self.ax.get_xlim()
+        for curve in self.curves:
+            curve.width_pixels = self.ax.bbox.width
+        resample_curves(self.curves, view_xmin, view_xmax, self.num_samples)
+        enforce_memory_budget(self.curves, self.memory_budget_bytes)
+        for overlay in self.overlays:
+            overlay.update()
+        for implicit_curve in self.implicit_curves:
+            implicit_curve.set_view(view_xmin, view_xmax, *self.ax.get_ylim())
+        for surface in self.surfaces:
+            surface.set_view(view_xmin, view_xmax, *self.ax.get_ylim(), self.ax.bbox.width, self.ax.bbox.height)
+
+    def on_resize_canvas(self, event):
+        """When the canvas is resized, decimate every curve for the new width"""
+        if not self.ax:
+            return
+        view_xmin, view_xmax = self.ax.get_xlim()
+        for curve in self.curves:
+            curve.set_view(view_xmin, view_xmax, self.ax.bbox.width)
+        for surface in self.surfaces:
+            surface.set_view(view_xmin, view_xmax, *self.ax.get_ylim(), self.ax.bbox.width, self.ax.bbox.height)
+        for overlay in self.overlays:
+            overlay.update()
+
+    def schedule_preview(self):
+        """Restart the live preview debounce timer when live preview is enabled"""
+        if self.live_preview_checkbox.isChecked():
+            self.preview_timer.start()
+
+    def update_preview(self):
+        """Plot the current inputs in place if they changed since the last preview"""
+        preview_key = (
+            helpers.normalize_function(self.function_input.text()),
+            self.xmin_input.text().strip(),
+            self.xmax_input.text().strip(),
+        )
+        if preview_key == self.preview_key:
+            return
+        self.preview_key = preview_key
+        self.plot(is_preview=True)
+
+    @property
+    def surface_style(self):
+        """How functions of x and y are plotted, None for implicit curves"""
+        return SURFACE_STYLES[self.surface_style_combo_box.currentText()]
+
+    def plot(self, message_timeout_seconds=0, is_another_function=False, is_preview=False):
         """Plot the function"""
-        function_input_text = self.function_input.text()
-        xmin_input, xmax_input = self.xmin_input.text(), self.xmax_input.text()
-        try:
-            function_parsed: sympy.core = helpers.parse_function_string(function_input_text)
-            xmin, xmax = helpers.get_x_range(xmin_input, xmax_input)
-            x_data, y_data = helpers.get_xy_data(function_parsed, xmin, xmax)
-        except ValidationError as validation_error:
-            validation_error_message = str(validation_error)
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title="Error", message=validation_error_message, message_type=MessageType.ERROR)
+        if not is_preview:
+            self.preview_timer.stop()
+        self.cancel_evaluation()
+        self.evaluation_job_id += 1
+        self.plot_options = (message_timeout_seconds, is_another_function, is_preview)
+        self.evaluation_job = EvaluationJob(
+            self.evaluation_job_id,
+            self.function_input.text(),
+            self.xmin_input.text(),
+            self.xmax_input.text(),
+            self.num_samples,
+            self.sampling_mode,
+            self.surface_style,
+        )
+        self.evaluation_job.signals.finished.connect(self.on_evaluation_finished)
+        self.evaluation_job.signals.failed.connect(self.on_evaluation_failed)
+        self.set_busy(True)
+        if self.background_evaluation:
+            self.thread_pool.start(self.evaluation_job)
+        else:
+            self.evaluation_job.run()
+
+    def cancel_evaluation(self):
+        """Cancel the in-flight evaluation job, if any"""
+        if self.evaluation_job:
+            self.evaluation_job.cancel()
+            self.evaluation_job = None
+        self.set_busy(False)
+
+    def set_busy(self, busy):
+        """Show or hide the busy indicator"""
+        self.busy_indicator.setVisible(busy)
+        if busy:
+            self.statusBar().showMessage("Evaluating...")
+        else:
+            self.statusBar().clearMessage()
+
+    def on_evaluation_finished(self, job_id, result):
+        """When the current evaluation job finishes, draw its result"""
+        if job_id != self.evaluation_job_id:
+            return
+        self.evaluation_job = None
+        self.set_busy(False)
+        message_timeout_seconds, is_another_function, is_preview = self.plot_options
+        if is_preview and self.last_function_curve is not None and not (result.is_implicit or result.is_surface):
+            self.update_curve_in_place(result)
+        else:
+            self.draw_plot_result(result, message_timeout_seconds, is_another_function)
+        self.update_timings()
+        self.plot_finished.emit()
+
+    def on_evaluation_failed(self, job_id, validation_error_message):
+        """When the current evaluation job fails, show the validation error"""
+        if job_id != self.evaluation_job_id:
             return
+        self.evaluation_job = None
+        self.set_busy(False)
+        message_timeout_seconds, _, is_preview = self.plot_options
+        if not is_preview:
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title="Error", message=validation_error_message, message_type=MessageType.ERROR)
+        self.plot_finished.emit()
+
+    def update_curve_in_place(self, result):
+        """Replace the data of the most recently plotted curve without rebuilding the figure"""
+        curve = self.last_function_curve
+        curve.replace(result.cached_expression.kernel, result.x_data, result.y_data)
+        curve.line.set_label(str(result.cached_expression.tree))
+        curve.function_string = str(result.cached_expression.tree)
+        for overlay in self.overlays:
+            overlay.update()
+        self.ax.relim()
+        self.ax.autoscale(True)
+        self.ax.autoscale_view()
+        if self.legend_visible:
+            self.legend = self.ax.legend()
+        self.canvas.draw_idle()
+
+    def draw_plot_result(self, result, message_timeout_seconds=0, is_another_function=False):
+        """Draw an evaluated plot request"""
         try:
             if not is_another_function:
-                self.figure.clear()
-                self.ax = self.figure.add_subplot(111)
-            self.ax.plot(x_data, y_data, label=function_parsed)
-            self.canvas.draw()
+                self.clear_curves()
+            if result.is_surface:
+                curve = surfaces.Surface(self.ax, result.cached_expression.kernel, str(result.cached_expression.tree), result.surface_style, result.xmin, result.xmax, self.mesh_cache)
+                self.surfaces.append(curve)
+                curve.reset(self.ax.bbox.width, self.ax.bbox.height)
+                self.ax.set_xlim(result.xmin, result.xmax)
+                self.ax.set_ylim(result.xmin, result.xmax)
+                self.canvas.draw_idle()
+                return curve
+            line, = self.ax.plot([], [], label=helpers.get_label(result.cached_expression.tree))
+            if result.is_implicit:
+                curve = ImplicitCurve(line, result.cached_expression.kernel, result.x_data, result.y_data, result.xmin, result.xmax, str(result.cached_expression.tree))
+                self.implicit_curves.append(curve)
+            else:
+                curve = Curve(line, result.cached_expression.kernel, result.x_data, result.y_data, self.sampling_mode, self.ax.bbox.width, str(result.cached_expression.tree), self.curve_dtype)
+                self.curves.append(curve)
+                self.enforce_memory_budget()
+            self.ax.relim()
+            self.ax.autoscale_view()
+            if self.legend_visible:
+                self.legend = self.ax.legend()
+            self.canvas.draw_idle()
+            return curve
         except TypeError as type_error:
             type_error_message = "Please enter a valid function" + "-" + str(type_error)
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title="Error", message=type_error_message, message_type=MessageType.ERROR)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title="Error", message=type_error_message, message_type=MessageType.ERROR)
             return
 
+    def enforce_memory_budget(self):
+        """Evict the samples of hidden and least recently used curves while they exceed the memory budget"""
+        if enforce_memory_budget(self.curves, self.memory_budget_bytes):
+            for overlay in self.overlays:
+                overlay.update()
+
+    def clear_curves(self):
+        """Remove every curve from the axes, creating the axes on the first plot"""
+        if not self.ax:
+            self.ax = self.figure.add_subplot(111)
+            self.interaction.attach(self.ax)
+        for curve in self.curves + self.implicit_curves + self.overlays:
+            curve.line.remove()
+        for surface in self.surfaces:
+            surface.remove()
+        self.curves = []
+        self.implicit_curves = []
+        self.surfaces = []
+        self.overlays = []
+        self.ax.relim()
+        self.ax.autoscale(True)
+
+    def closeEvent(self, event):
+        """Cancel pending evaluation, wait for the workers and save the session before closing"""
+        self.cancel_evaluation()
+        self.cancel_export()
+        self.thread_pool.waitForDone()
+        if self.session_path:
+            self.save_session(file_name=self.session_path)
+        super().closeEvent(event)
+
 
     def zoom_in(self, message_timeout_seconds=0):
         """Zoom in"""
         if not self.ax:
             message = "You need to plot a function first to zoom in"
             title = "Zoom in"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return 
-        xlim = self.ax.get_xlim()
-        ylim = self.ax.get_ylim()
-        self.ax.set_xlim(xlim[0] * 0.9, xlim[1] * 0.9)
-        self.ax.set_ylim(ylim[0] * 0.9, ylim[1] * 0.9)
-        self.canvas.draw()
+        self.ax.set_xlim(viewport.zoom_about_center(self.ax.get_xlim(), viewport.ZOOM_IN_FACTOR))
+        self.ax.set_ylim(viewport.zoom_about_center(self.ax.get_ylim(), viewport.ZOOM_IN_FACTOR))
+        self.refresh_curves()
+        self.canvas.draw_idle()
 
     def zoom_out(self, message_timeout_seconds=0):
         """Zoom out"""
         if not self.ax:
             message = "You need to plot a function first to zoom out"
             title = "Zoom out"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return 
-        xlim = self.ax.get_xlim()
-        ylim = self.ax.get_ylim()
-        self.ax.set_xlim(xlim[0] * 1.1, xlim[1] * 1.1)
-        self.ax.set_ylim(ylim[0] * 1.1, ylim[1] * 1.1)
-        self.canvas.draw()
+        self.ax.set_xlim(viewport.zoom_about_center(self.ax.get_xlim(), viewport.ZOOM_OUT_FACTOR))
+        self.ax.set_ylim(viewport.zoom_about_center(self.ax.get_ylim(), viewport.ZOOM_OUT_FACTOR))
+        self.refresh_curves()
+        self.canvas.draw_idle()
 
     def save_image(self, file_name=None, path="figures/"):
         """Save the image"""
@@ -216,63 +489,376 @@ class FunctionPlotter(QMainWindow):
             options=options,
         ) if not file_name else (file_name, None)
         if file_name:
-            self.figure.savefig(file_name)
+            with instrumentation.span("export"):
+                self.figure.savefig(file_name)
+            self.update_timings()
+
+    def export_data(self, message_timeout_seconds=0, file_name=None, num_samples=None, path="data/"):
+        """Export the sampled data of every plotted function"""
+        if not self.curves:
+            message = "Please plot the function first before exporting its data."
+            title = "Export Data"
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            return
+        if not num_samples:
+            num_samples, ok = QInputDialog.getInt(self, "Export Data", "Number of samples:", self.num_samples, 2, export.MAX_EXPORT_SAMPLES)
+            if not ok:
+                return
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Data",
+            path,
+            "NumPy (*.npy);;CSV (*.csv)",
+        ) if not file_name else (file_name, None)
+        if file_name:
+            xmin = min(curve.xmin for curve in self.curves)
+            xmax = max(curve.xmax for curve in self.curves)
+            kernels = [curve.kernel for curve in self.curves]
+            labels = [curve.line.get_label() for curve in self.curves]
+            self.cancel_export()
+            self.export_job_id += 1
+            self.export_message_timeout_seconds = message_timeout_seconds
+            self.export_job = ExportJob(self.export_job_id, file_name, kernels, labels, xmin, xmax, num_samples)
+            self.export_job.signals.progress.connect(self.on_export_progress)
+            self.export_job.signals.finished.connect(self.on_export_done)
+            self.export_job.signals.cancelled.connect(self.on_export_done)
+            self.export_job.signals.failed.connect(self.on_export_failed)
+            self.set_exporting(True)
+            if self.background_evaluation:
+                self.thread_pool.start(self.export_job)
+            else:
+                self.export_job.run()
+
+    def cancel_export(self):
+        """Cancel the in-flight export job, if any, removing its partially written file"""
+        if self.export_job:
+            self.export_job.cancel()
+            self.export_job = None
+        self.set_exporting(False)
+
+    def set_exporting(self, exporting):
+        """Show or hide the export progress and its cancel button"""
+        self.export_progress_bar.setValue(0)
+        self.export_progress_bar.setVisible(exporting)
+        self.cancel_export_button.setVisible(exporting)
+        if exporting:
+            self.statusBar().showMessage("Exporting...")
+        else:
+            self.statusBar().clearMessage()
+
+    def on_export_progress(self, job_id, percent):
+        """Show the progress of the current export job"""
+        if job_id == self.export_job_id and self.export_job:
+            self.export_progress_bar.setValue(percent)
+
+    def on_export_done(self, job_id):
+        """When the current export job finishes or stops, hide its progress"""
+        if job_id != self.export_job_id:
+            return
+        self.export_job = None
+        self.set_exporting(False)
+        self.update_timings()
+
+    def on_export_failed(self, job_id, message):
+        """When the current export job fails, show why"""
+        if job_id != self.export_job_id:
+            return
+        self.on_export_done(job_id)
+        widgets.show_message(timeout_seconds=self.export_message_timeout_seconds, title="Error", message=message, message_type=MessageType.ERROR)
+
+    def get_session_state(self):
+        """Get the plotted functions, their styles, the axes styling and the view as a dictionary"""
+        state = {
+            "inputs": {
+                "function": self.function_input.text(),
+                "xmin": self.xmin_input.text(),
+                "xmax": self.xmax_input.text(),
+            },
+            "curves": [],
+            "overlays": [],
+        }
+        if not self.ax:
+            return state
+        state["curves"] = [
+            {
+                "function": curve.function_string,
+                "xmin": curve.xmin,
+                "xmax": curve.xmax,
+                "color": to_hex(curve.line.get_color()),
+                "linestyle": curve.line.get_linestyle(),
+            }
+            for curve in self.curves + self.implicit_curves
+        ]
+        state["surfaces"] = [
+            {"function": surface.function_string, "xmin": surface.xmin, "xmax": surface.xmax, "style": surface.style.name}
+            for surface in self.surfaces
+        ]
+        state["overlays"] = [{"curve": self.curves.index(overlay.source), "kind": overlay.kind.name} for overlay in self.overlays]
+        state.update({
+            "title": self.ax.get_title(),
+            "xlabel": self.ax.get_xlabel(),
+            "ylabel": self.ax.get_ylabel(),
+            "xlim": list(self.ax.get_xlim()),
+            "ylim": list(self.ax.get_ylim()),
+            "grid_visible": self.grid_visible,
+            "legend_visible": self.legend_visible,
+        })
+        return state
+
+    def restore_session_state(self, state, message_timeout_seconds=0):
+        """Replot the functions of a session state and restore their styles, the axes styling and the view, skipping and reporting entries that can no longer be plotted"""
+        self.function_input.setText(state["inputs"]["function"])
+        self.xmin_input.setText(state["inputs"]["xmin"])
+        self.xmax_input.setText(state["inputs"]["xmax"])
+        restored_curves = {}
+        restored_surfaces = []
+        skipped = []
+        for index, curve_state in enumerate(state["curves"]):
+            try:
+                result = evaluate_plot_request(curve_state["function"], str(curve_state["xmin"]), str(curve_state["xmax"]), self.num_samples, self.sampling_mode)
+                curve = self.draw_plot_result(result, message_timeout_seconds, is_another_function=bool(restored_curves))
+                if curve is None:
+                    raise ValidationError("function can not be plotted.")
+                curve.line.set_color(curve_state["color"])
+                curve.line.set_linestyle(curve_state["linestyle"])
+            except (ValidationError, KeyError, TypeError, ValueError) as error:
+                skipped.append(f"{curve_state.get('function', '')!r}: {error}")
+                continue
+            restored_curves[index] = curve
+        for surface_state in state.get("surfaces", []):
+            try:
+                result = evaluate_plot_request(surface_state["function"], str(surface_state["xmin"]), str(surface_state["xmax"]), self.num_samples, self.sampling_mode, surface_style=SurfaceStyle[surface_state["style"]])
+                surface = self.draw_plot_result(result, message_timeout_seconds, is_another_function=bool(restored_curves or restored_surfaces))
+                if surface is None:
+                    raise ValidationError("function can not be plotted.")
+            except (ValidationError, KeyError, TypeError, ValueError) as error:
+                skipped.append(f"{surface_state.get('function', '')!r}: {error}")
+                continue
+            restored_surfaces.append(surface)
+        if skipped:
+            message = "Some plots of the session could not be restored." + "-" + "; ".join(skipped)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title="Open Session", message=message, message_type=MessageType.WARNING)
+        if not restored_curves and not restored_surfaces:
+            return
+        for overlay_state in state["overlays"]:
+            source = restored_curves.get(overlay_state["curve"])
+            if not isinstance(source, Curve):
+                continue
+            kind = OverlayKind[overlay_state["kind"]]
+            label_format = "d/dx {}" if kind == OverlayKind.DERIVATIVE else "∫ {} dx"
+            self.add_overlay(kind, label_format, source)
+        self.ax.set_title(state["title"])
+        self.ax.set_xlabel(state["xlabel"])
+        self.ax.set_ylabel(state["ylabel"])
+        self.ax.set_xlim(state["xlim"])
+        self.ax.set_ylim(state["ylim"])
+        self.grid_visible = state["grid_visible"]
+        self.ax.grid(self.grid_visible)
+        if self.legend_visible and not state["legend_visible"]:
+            self.legend.remove()
+        elif state["legend_visible"]:
+            self.legend = self.ax.legend()
+        self.legend_visible = state["legend_visible"]
+        self.refresh_curves()
+        self.canvas.draw_idle()
+
+    def save_session(self, file_name=None, path="sessions/"):
+        """Save the session and the parsed expressions for a warm start"""
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Session",
+            path,
+            "Session (*.json);;All Files (*)",
+        ) if not file_name else (file_name, None)
+        if file_name:
+            session.save_session(file_name, self.get_session_state())
+            session.ExpressionStore(session.get_expression_store_path(file_name)).save(helpers.get_cached_trees())
+
+    def open_session(self, message_timeout_seconds=0, file_name=None, path="sessions/"):
+        """Open a saved session, reusing the stored parsed expressions"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open Session",
+            path,
+            "Session (*.json);;All Files (*)",
+        ) if not file_name else (file_name, None)
+        if not file_name:
+            return
+        try:
+            helpers.preload_expressions(session.ExpressionStore(session.get_expression_store_path(file_name)).load())
+            self.restore_session_state(session.load_session(file_name), message_timeout_seconds)
+        except (ValidationError, OSError, KeyError, TypeError, ValueError) as error:
+            message = "The session could not be opened." + "-" + str(error)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title="Open Session", message=message, message_type=MessageType.ERROR)
+        self.update_timings()
+
+    def update_timings(self):
+        """Show the latest duration of every pipeline stage in the status bar"""
+        self.timings_label.setText(instrumentation.summary())
+
+    def save_timings(self, file_name=None, path="logs/"):
+        """Save the per-stage latency histograms as JSON"""
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Timings",
+            path,
+            "JSON (*.json);;All Files (*)",
+        ) if not file_name else (file_name, None)
+        if file_name:
+            instrumentation.dump(file_name)
 
     def reset_plot(self, message_timeout_seconds=0):
-        """Reset the plot"""
+        """Restore the original limits and samples of the plot"""
         if not self.ax:
             message = "You need to plot a function first to reset the plot"
             title = "Reset plot"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
-        self.figure.clear()
-        self.plot()
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            return
+        for curve in self.curves + self.implicit_curves:
+            curve.reset()
+        for surface in self.surfaces:
+            surface.reset(self.ax.bbox.width, self.ax.bbox.height)
+        for overlay in self.overlays:
+            overlay.update()
+        self.ax.relim()
+        self.ax.autoscale(True)
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
 
     def get_derivative(self, message_timeout_seconds=0):
         """Get the derivative of the function"""
         if not self.ax:
             message = "Please plot the function first before finding the derivative."
             title = "No function plotted"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         function_str = self.function_input.text()
         function_parsed = helpers.parse_function_string(function_str)
-        x = sympy.Symbol("x")
-        derivative = str(function_parsed.diff(x))
-        helpers.show_message(timeout_seconds=message_timeout_seconds, title="Derivative", message=f"The derivative of the function is: {derivative}", message_type=MessageType.INFORMATION)
+        derivative = str(helpers.symbolic_service.derivative(function_parsed))
+        widgets.show_message(timeout_seconds=message_timeout_seconds, title="Derivative", message=f"The derivative of the function is: {derivative}", message_type=MessageType.INFORMATION)
+        try:
+            function_string = str(helpers.get_cached_expression(function_str).tree)
+        except ValidationError:
+            return derivative
+        source = next((curve for curve in self.curves if curve.function_string == function_string), None)
+        if source is not None:
+            self.plot_symbolic_derivative(source, derivative, message_timeout_seconds)
         return derivative
 
+    def plot_symbolic_derivative(self, source, derivative, message_timeout_seconds=0):
+        """Plot the symbolic derivative of a plotted function as a curve, unless it is plotted already"""
+        try:
+            cached_expression = helpers.get_cached_expression(derivative)
+            if any(curve.function_string == str(cached_expression.tree) for curve in self.curves):
+                return
+            x_data, y_data = helpers.evaluate_function(cached_expression.kernel, source.xmin, source.xmax, self.num_samples, self.sampling_mode)
+        except ValidationError as validation_error:
+            message = "The derivative can not be plotted" + "-" + str(validation_error)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title="Derivative", message=message, message_type=MessageType.WARNING)
+            return
+        result = PlotResult(cached_expression, source.xmin, source.xmax, x_data, y_data)
+        curve = self.draw_plot_result(result, message_timeout_seconds, is_another_function=True)
+        if curve is not None:
+            curve.derived_from = source
+        return curve
+
+    @property
+    def last_function_curve(self):
+        """The most recently plotted curve of a function entered by the user, skipping derived curves"""
+        return next((curve for curve in reversed(self.curves) if curve.derived_from is None), None)
+
     def get_integral(self, message_timeout_seconds=0):
-        """Get the integral of the function"""
+        """Get the integral of the function on a worker, showing it when it arrives"""
         if not self.ax:
             message = "Please plot the function first before finding the integral."
             title = "No function plotted"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         function_str = self.function_input.text()
         function_parsed = helpers.parse_function_string(function_str)
-        x = sympy.Symbol("x")
-        integral = str(function_parsed.integrate(x)) + " + C"
-        helpers.show_message(timeout_seconds=message_timeout_seconds, title="Integral", message=f"The integral of the function is: {integral}", message_type=MessageType.INFORMATION)
-        return integral
+        self.integral_job_id += 1
+        self.integral_message_timeout_seconds = message_timeout_seconds
+        self.integral_job = IntegralJob(self.integral_job_id, function_parsed)
+        self.integral_job.signals.finished.connect(self.on_integral_finished)
+        self.integral_job.signals.failed.connect(self.on_integral_failed)
+        self.statusBar().showMessage("Integrating...")
+        if self.background_evaluation:
+            self.thread_pool.start(self.integral_job)
+        else:
+            self.integral_job.run()
+
+    def on_integral_finished(self, job_id, result):
+        """When the current integral job finishes, show the integral or why there is none"""
+        if job_id != self.integral_job_id:
+            return
+        self.integral_job = None
+        self.statusBar().clearMessage()
+        if not result.ok:
+            message = f"The integral of the function has {result.message} of {helpers.symbolic_service.timeout_seconds:g} seconds."
+            widgets.show_message(timeout_seconds=self.integral_message_timeout_seconds, title="Integral", message=message, message_type=MessageType.INFORMATION)
+            self.integral_finished.emit(result.message)
+            return
+        integral = str(result) + " + C"
+        widgets.show_message(timeout_seconds=self.integral_message_timeout_seconds, title="Integral", message=f"The integral of the function is: {integral}", message_type=MessageType.INFORMATION)
+        self.integral_finished.emit(integral)
+
+    def on_integral_failed(self, job_id, message):
+        """When the current integral job fails, show why"""
+        if job_id != self.integral_job_id:
+            return
+        self.integral_job = None
+        self.statusBar().clearMessage()
+        widgets.show_message(timeout_seconds=self.integral_message_timeout_seconds, title="Error", message=message, message_type=MessageType.ERROR)
+
+    def plot_derivative_curve(self, message_timeout_seconds=0):
+        """Plot the numerical derivative of the last plotted function as an overlay"""
+        if not self.curves:
+            message = "Please plot the function first before plotting its derivative."
+            title = "No function plotted"
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            return
+        return self.add_overlay(OverlayKind.DERIVATIVE, "d/dx {}")
+
+    def plot_integral_curve(self, message_timeout_seconds=0):
+        """Plot the running integral of the last plotted function from xmin as an overlay"""
+        if not self.curves:
+            message = "Please plot the function first before plotting its integral."
+            title = "No function plotted"
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            return
+        return self.add_overlay(OverlayKind.INTEGRAL, "∫ {} dx")
+
+    def add_overlay(self, kind, label_format, source=None):
+        """Add an overlay curve derived from a plotted function, the last one by default"""
+        source = source or self.last_function_curve
+        line, = self.ax.plot([], [], linestyle="--", label=label_format.format(source.line.get_label()))
+        overlay = OverlayCurve(line, source, kind)
+        self.overlays.append(overlay)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        if self.legend_visible:
+            self.legend = self.ax.legend()
+        self.canvas.draw_idle()
+        return overlay
 
     def change_color(self, message_timeout_seconds=0, color_input=None):
         """Change the color of the function"""
         if not self.ax:
             message = "Please plot the function first before changing the color."
             title = "Change Color"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         color = QColorDialog.getColor() if not color_input else color_input
         for line in self.ax.lines:
             line.set_color(color.name())
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     def toggle_grid(self, message_timeout_seconds=0):
         """Toggle the grid"""
         if not self.ax:
             message = "Please plot the function first before toggling the grid."
             title = "Toggle Grid"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         if self.grid_visible:
             self.ax.grid(False)
@@ -280,14 +866,14 @@ class FunctionPlotter(QMainWindow):
         else:
             self.ax.grid(True)
             self.grid_visible = True
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     def toggle_legend(self, message_timeout_seconds=0):
         """Toggle the legend"""
         if not self.ax:
             message = "Please plot the function first before toggling the legend."
             title = "Toggle Legend"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         if self.legend_visible:
             self.legend.remove()
@@ -295,14 +881,14 @@ class FunctionPlotter(QMainWindow):
         else:
             self.legend = self.ax.legend()
             self.legend_visible = True
-        self.canvas.draw()
+        self.canvas.draw_idle()
         
     def plot_another_function(self, message_timeout_seconds=0):
         """Plot another function"""
         if not self.ax:
             message = "Please plot the first function first before adding another function."
             title = "Add Another Function"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         self.plot(is_another_function=True)
 
@@ -311,33 +897,33 @@ class FunctionPlotter(QMainWindow):
         if not self.ax:
             message = "Please plot the function first before changing the x label."
             title = "Change x-axis label"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         label, ok = QInputDialog.getText(self, "Change x-axis label", "Enter new label:" ) if not (label and ok) else (label,ok)
         if ok:
             self.ax.set_xlabel(label)
-            self.canvas.draw()
+            self.canvas.draw_idle()
 
     def change_y_label(self, message_timeout_seconds=0, label=None, ok=None):
         """Change the y label"""
         if not self.ax:
             message = "Please plot the function first before changing the y label."
             title = "Change y-axis label"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         label, ok = QInputDialog.getText(self, "Change y-axis label", "Enter new label:" ) if not (label and ok) else (label,ok)
         if ok:
             self.ax.set_ylabel(label)
-            self.canvas.draw()
+            self.canvas.draw_idle()
 
     def change_title(self, message_timeout_seconds=0):
         """Change the title"""
         if not self.ax:
             message = "Please plot the function first before changing the title."
             title = "Change Title"
-            helpers.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
+            widgets.show_message(timeout_seconds=message_timeout_seconds, title=title, message=message, message_type=MessageType.WARNING)
             return
         title, ok = QInputDialog.getText(self, "Change title", "Enter new title:")
         if ok:
             self.ax.set_title(title)
-            self.canvas.draw()
+            self.canvas.draw_idle()
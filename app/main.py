@@ -1,10 +1,44 @@
+import time
+START_TIME = time.perf_counter()
+import os
 import sys
 from PySide6.QtWidgets import QApplication
-from function_plotter import FunctionPlotter
+from utils.startup import FirstPaintWatcher, StartupTimer, start_warm_up
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+STARTUP_TIMING_FLAG = "--startup-timing"
+FLOAT32_FLAG = "--float32"
+DEFAULT_SESSION_PATH = "sessions/session.json"
+
+def main() -> int:
+    """Show the window first, then warm up sympy and the evaluation stack in the background."""
+    startup_timer = StartupTimer(START_TIME)
+    startup_timing = STARTUP_TIMING_FLAG in sys.argv
+    app = QApplication([argument for argument in sys.argv if argument not in (STARTUP_TIMING_FLAG, FLOAT32_FLAG)])
+    startup_timer.mark("qt ready")
+    from function_plotter import FunctionPlotter
+    startup_timer.mark("plotter imported")
     plotter = FunctionPlotter()
     plotter.setWindowTitle("Function Plotter")
+    plotter.session_path = DEFAULT_SESSION_PATH
+    if FLOAT32_FLAG in sys.argv:
+        import numpy as np
+        plotter.curve_dtype = np.float32
+    startup_timer.mark("window created")
+
+    def on_first_paint():
+        startup_timer.mark("first paint")
+        if os.path.exists(plotter.session_path):
+            plotter.open_session(file_name=plotter.session_path)
+            startup_timer.mark("session restored")
+        warm_up_thread = start_warm_up(lambda: startup_timer.mark("warm-up done"))
+        if startup_timing:
+            warm_up_thread.join()
+            print(startup_timer.report())
+            app.quit()
+
+    FirstPaintWatcher(plotter, on_first_paint)
     plotter.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,13 @@ from utils.widgets import CustomMessageBox
 
 @pytest.fixture
 def function_plotter(qtbot):
+    plotter = FunctionPlotter()
+    plotter.background_evaluation = False
+    qtbot.addWidget(plotter)
+    return plotter
+
+@pytest.fixture
+def background_function_plotter(qtbot):
     plotter = FunctionPlotter()
     qtbot.addWidget(plotter)
     return plotter
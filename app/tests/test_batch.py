@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import batch
+from utils.exceptions import ValidationError
+
+def write_csv_manifest(tmp_path, rows):
+    """Write a CSV manifest and return its path."""
+    manifest_path = tmp_path / "manifest.csv"
+    lines = [",".join(batch.MANIFEST_FIELDS)] + [",".join(row) for row in rows]
+    manifest_path.write_text("\n".join(lines) + "\n")
+    return str(manifest_path)
+
+def test_load_manifest_csv(tmp_path):
+    """Test the load_manifest function with a CSV manifest."""
+    manifest_path = write_csv_manifest(tmp_path, [("x^2", "0", "1", "r--", "a.png"), ("sin(x)", "-1", "1", "", "b.png")])
+    items = batch.load_manifest(manifest_path)
+    assert [item.function for item in items] == ["x^2", "sin(x)"]
+    assert items[0].style == "r--" and items[1].style == ""
+
+def test_load_manifest_json(tmp_path):
+    """Test the load_manifest function with a JSON manifest."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps([{"function": "x", "xmin": 0, "xmax": 1, "output": "a.png"}]))
+    items = batch.load_manifest(str(manifest_path))
+    assert items[0].xmin == "0" and items[0].xmax == "1" and items[0].style == ""
+
+def test_load_manifest_missing_field(tmp_path):
+    """Test the load_manifest function rejects entries without an output path."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps([{"function": "x", "xmin": 0, "xmax": 1}]))
+    with pytest.raises(ValidationError, match="manifest entry 1 is missing output."):
+        batch.load_manifest(str(manifest_path))
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch(tmp_path, workers):
+    """Test the run_batch function renders valid items and reports failed ones."""
+    items = [
+        batch.BatchItem("x^2", "0", "1", "g-", str(tmp_path / "out" / "square.png")),
+        batch.BatchItem("", "0", "1", "", str(tmp_path / "empty.png")),
+        batch.BatchItem("x", "1", "0", "", str(tmp_path / "range.png")),
+    ]
+    results = batch.run_batch(items, workers=workers, num_samples=101)
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[0].ok and os.path.exists(items[0].output)
+    assert results[1].error == "function is empty"
+    assert results[2].error == "xmin must be less than xmax."
+
+def test_run_batch_reports_unexpected_errors(tmp_path, monkeypatch):
+    """Test the run_batch function reports an unexpected error for its own item and renders the rest."""
+    def render_item(item, num_samples):
+        if item.function == "boom":
+            raise RuntimeError("renderer crashed")
+    monkeypatch.setattr(batch, "render_item", render_item)
+    items = [batch.BatchItem("boom", "0", "1", "", str(tmp_path / "a.png")), batch.BatchItem("x", "0", "1", "", str(tmp_path / "b.png"))]
+    results = batch.run_batch(items, workers=1, num_samples=101)
+    assert results[0].error == "renderer crashed" and results[1].ok
+
+def test_batch_does_not_import_qt():
+    """Test the batch module runs without the Qt GUI libraries."""
+    code = "import sys, batch; sys.exit(any(name.split('.')[0] == 'PySide6' for name in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(batch.__file__) or ".").returncode == 0
+
+def test_main_does_not_log_to_stderr(tmp_path):
+    """Test the batch command line leaves stderr free of timing logs when logging is not configured."""
+    manifest_path = write_csv_manifest(tmp_path, [("x^2", "0", "1", "", str(tmp_path / "plot.png"))])
+    command = [sys.executable, "batch.py", manifest_path, "--workers", "1", "--samples", "101"]
+    completed = subprocess.run(command, cwd=os.path.dirname(batch.__file__) or ".", capture_output=True, text=True)
+    assert completed.returncode == 0 and completed.stderr == ""
+
+def test_main(tmp_path, capsys):
+    """Test the main function prints progress and a summary and returns a failure code."""
+    output_path = str(tmp_path / "plot.png")
+    manifest_path = write_csv_manifest(tmp_path, [("x^3", "-1", "1", "", output_path), ("x", "a", "1", "", output_path)])
+    exit_code = batch.main([manifest_path, "--workers", "1", "--samples", "101"])
+    output = capsys.readouterr().out
+    assert exit_code == 1
+    assert "[1/2] ok" in output and "[2/2] failed" in output
+    assert "Rendered 1 of 2 plots" in output
+    assert os.path.exists(output_path)
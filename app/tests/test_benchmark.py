@@ -0,0 +1,42 @@
+import json
+import benchmark
+
+CORPUS = {"polynomial": "x^2 + 1"}
+
+def test_run_benchmarks():
+    """Test the run_benchmarks function measures every stage of every corpus expression."""
+    results = benchmark.run_benchmarks(CORPUS, sample_counts=(100, 1000), repeat=1)
+    assert set(results["results"]) == {
+        "polynomial/parse",
+        "polynomial/compile",
+        "polynomial/evaluate/100",
+        "polynomial/draw/100",
+        "polynomial/fused/100",
+        "polynomial/separate/100",
+        "polynomial/evaluate/1000",
+        "polynomial/draw/1000",
+        "polynomial/fused/1000",
+        "polynomial/separate/1000",
+    }
+    evaluate = results["results"]["polynomial/evaluate/1000"]
+    assert evaluate["seconds"] > 0 and evaluate["peak_bytes"] >= 2 * 1000 * 8
+    assert results["metadata"]["repeat"] == 1
+
+def test_compare_results():
+    """Test the compare_results function flags slowdowns above the threshold only."""
+    baseline = {"results": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "c": {"seconds": 1e-6}}}
+    results = {"results": {"a": {"seconds": 1.1}, "b": {"seconds": 1.5}, "c": {"seconds": 5e-6}, "d": {"seconds": 9.0}}}
+    regressions = benchmark.compare_results(results, baseline, threshold=0.2)
+    assert [regression["key"] for regression in regressions] == ["b"]
+    assert regressions[0]["ratio"] == 1.5
+
+def test_main_with_baseline(tmp_path, monkeypatch, capsys):
+    """Test the main function saves a baseline and then compares against it."""
+    monkeypatch.setattr(benchmark, "CORPUS", CORPUS)
+    output, baseline = str(tmp_path / "results.json"), str(tmp_path / "baseline.json")
+    arguments = ["--samples", "100", "--repeat", "1", "--output", output, "--baseline", baseline]
+    assert benchmark.main(arguments + ["--save-baseline"]) == 0
+    assert json.load(open(baseline))["results"].keys() == json.load(open(output))["results"].keys()
+    assert {key.split("/")[0] for key in json.load(open(output))["results"]} == set(CORPUS)
+    assert benchmark.main(arguments + ["--threshold", "1000"]) == 0
+    assert "0 regressions" in capsys.readouterr().out
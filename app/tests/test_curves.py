@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from matplotlib.lines import Line2D
+from utils import curves, helpers
+
+def make_curve(num_samples=100_000, dtype=np.float64):
+    kernel = helpers.get_cached_expression("sin(x)").kernel
+    x_data, y_data = helpers.evaluate_function(kernel, -10, 10, num_samples)
+    return curves.Curve(Line2D([], []), kernel, x_data, y_data, width_pixels=200, dtype=dtype)
+
+def test_curve_has_no_instance_dict():
+    """Test the Curve class stores its fields in slots."""
+    curve = make_curve(1_000)
+    with pytest.raises(AttributeError):
+        curve.unknown = 1
+
+def test_curve_float32_halves_memory():
+    """Test the Curve class stores float32 samples in half the memory of float64 ones."""
+    curve64, curve32 = make_curve(), make_curve(dtype=np.float32)
+    assert curve32.x_data.dtype == np.float32 and curve32.y_data.dtype == np.float32
+    assert curve32.nbytes < 0.6 * curve64.nbytes
+    assert np.allclose(curve32.y_data, curve64.y_data, atol=1e-6)
+
+def test_enforce_memory_budget_evicts_hidden_then_oldest():
+    """Test the enforce_memory_budget function evicts hidden curves before the least recently used visible ones."""
+    hidden, oldest, newest = make_curve(), make_curve(), make_curve()
+    hidden.line.set_visible(False)
+    hidden.set_view(-10, 10)
+    budget_bytes = hidden.nbytes * 2
+    assert curves.enforce_memory_budget([hidden, oldest, newest], budget_bytes)
+    assert hidden.evicted and oldest.evicted and not newest.evicted
+    assert hidden.x_data.size <= 4 * 200 + 2
+    assert not curves.enforce_memory_budget([hidden, oldest, newest], budget_bytes)
+
+def test_evicted_curve_resamples_from_scratch():
+    """Test the Curve class evaluates an evicted curve again at full resolution on resample."""
+    curve = make_curve()
+    curve.evict()
+    curve.resample(-5, 5, 10_000)
+    assert not curve.evicted
+    assert curve.x_data.size == 10_000
+    assert np.allclose(curve.y_data, np.sin(curve.x_data))
+
+def test_resample_curves_fuses_tiled_curves(monkeypatch):
+    """Test the resample_curves function evaluates every tiled curve with one fused kernel call."""
+    function_strings = ("exp(-x**2)*sin(3*x)", "-2*x*exp(-x**2)*sin(3*x)+3*exp(-x**2)*cos(3*x)")
+    plotted = []
+    for function_string in function_strings:
+        kernel = helpers.get_cached_expression(function_string).kernel
+        plotted.append(curves.Curve(Line2D([], []), kernel, *helpers.evaluate_function(kernel, -3, 3, 1_000), width_pixels=200, function_string=function_string))
+    calls = []
+    evaluate_fused_at = helpers.evaluate_fused_at
+    monkeypatch.setattr(helpers, "evaluate_fused_at", lambda *args: calls.append(args) or evaluate_fused_at(*args))
+    monkeypatch.setattr(curves.tiles, "tile_cache", curves.tiles.TileCache())
+    curves.resample_curves(plotted, -1.7, 1.3, 2_000)
+    assert len(calls) == 1
+    for curve in plotted:
+        assert np.allclose(curve.y_data, helpers.evaluate_at(curve.kernel, curve.x_data))
@@ -0,0 +1,36 @@
+import numpy as np
+from utils import decimation
+
+def test_decimate_keeps_small_data():
+    """Test the decimate function returns data that already fits the width unchanged."""
+    x_data = np.linspace(0, 1, 100)
+    x_decimated, y_decimated = decimation.decimate(x_data, x_data**2, 0, 1, 800)
+    assert np.array_equal(x_decimated, x_data) and np.array_equal(y_decimated, x_data**2)
+
+def test_decimate_bounds_points_per_pixel():
+    """Test the decimate function keeps at most four points per pixel column and the extremes."""
+    x_data = np.linspace(-10, 10, 1_000_001)
+    y_data = np.sin(x_data)
+    y_data[123_457] = 50.0
+    x_decimated, y_decimated = decimation.decimate(x_data, y_data, -10, 10, 500)
+    assert x_decimated.size <= 4 * 500 + 2
+    assert np.all(np.diff(x_decimated) > 0)
+    assert y_decimated.max() == 50.0 and y_decimated.min() == y_data.min()
+    assert x_decimated[0] == -10 and x_decimated[-1] == 10
+
+def test_decimate_restricts_to_view():
+    """Test the decimate function keeps one sample beyond each side of the view."""
+    x_data = np.linspace(0, 100, 100_001)
+    x_decimated, _ = decimation.decimate(x_data, x_data, 40, 60, 100)
+    assert x_decimated[0] < 40 <= x_decimated[1]
+    assert x_decimated[-2] <= 60 < x_decimated[-1]
+
+def test_decimate_keeps_gaps():
+    """Test the decimate function keeps undefined samples so gaps are not bridged."""
+    x_data = np.linspace(-1, 1, 100_001)
+    with np.errstate(all="ignore"):
+        y_data = np.sqrt(x_data)
+    y_data[80_000:80_010] = np.nan
+    x_decimated, y_decimated = decimation.decimate(x_data, y_data, -1, 1, 100)
+    assert np.isnan(y_decimated[x_decimated < 0]).all()
+    assert np.isnan(y_decimated[x_decimated > 0.5]).sum() == 1
@@ -0,0 +1,53 @@
+import tracemalloc
+from threading import Event
+import numpy as np
+import pytest
+from utils import export, helpers
+from utils.exceptions import EvaluationCancelled, ValidationError
+
+def get_kernel(function_string: str):
+    """Get the compiled kernel of a function string."""
+    return helpers.get_cached_expression(function_string).kernel
+
+def test_export_samples_npy(tmp_path):
+    """Test the export_samples function writes an x column and one column per kernel to .npy."""
+    file_name = str(tmp_path / "data.npy")
+    export.export_samples(file_name, [get_kernel("x^2"), get_kernel("1/x")], ["x**2", "1/x"], -1, 1, 1001, memory_budget_bytes=4096)
+    table = np.load(file_name)
+    assert table.shape == (1001, 3)
+    assert np.array_equal(table[:, 0], np.linspace(-1, 1, 1001))
+    assert np.allclose(table[:, 1], table[:, 0] ** 2)
+    assert np.isnan(table[500, 2])
+
+def test_export_samples_csv(tmp_path):
+    """Test the export_samples function writes a CSV table with a header of labels."""
+    file_name = tmp_path / "data.csv"
+    export.export_samples(str(file_name), [get_kernel("log(x, 2)")], ["log(x, 2)"], 1, 8, 8, memory_budget_bytes=64)
+    lines = file_name.read_text().splitlines()
+    assert lines[0] == 'x,"log(x, 2)"'
+    assert len(lines) == 9
+    assert np.allclose(np.loadtxt(str(file_name), delimiter=",", skiprows=1), np.column_stack([np.arange(1, 9), np.log2(np.arange(1, 9))]))
+
+def test_export_samples_fixed_memory(tmp_path):
+    """Test the export_samples function streams large tables within its memory budget."""
+    file_name = str(tmp_path / "large.npy")
+    tracemalloc.start()
+    try:
+        export.export_samples(file_name, [get_kernel("sin(x)")], ["sin(x)"], 0, 100, 4_000_000, memory_budget_bytes=1024 * 1024)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak_bytes < 4 * 1024 * 1024
+    table = np.load(file_name, mmap_mode="r")
+    assert table.shape == (4_000_000, 2) and table[-1, 0] == 100
+
+def test_export_samples_invalid_or_cancelled(tmp_path):
+    """Test the export_samples function rejects unknown formats and removes cancelled exports."""
+    with pytest.raises(ValidationError, match="Please choose a .npy or .csv file"):
+        export.export_samples(str(tmp_path / "data.txt"), [get_kernel("x")], ["x"], 0, 1, 10)
+    cancelled = Event()
+    cancelled.set()
+    file_name = tmp_path / "cancelled.npy"
+    with pytest.raises(EvaluationCancelled):
+        export.export_samples(str(file_name), [get_kernel("x")], ["x"], 0, 1, 10, cancelled=cancelled)
+    assert not file_name.exists()
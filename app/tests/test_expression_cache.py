@@ -0,0 +1,54 @@
+import pytest
+import sympy
+from utils.expression_cache import CachedExpression, ExpressionCache
+from utils import helpers
+
+def make_entry(function_string: str) -> CachedExpression:
+    """Create a cache entry for a function string."""
+    return CachedExpression(helpers.parse_function_string_to_tree(function_string), helpers.compile_function)
+
+def test_cached_expression():
+    """Test the CachedExpression class."""
+    entry = make_entry("x**2")
+    assert entry.free_symbols == {"x"}
+    assert entry.expression == sympy.Symbol("x")**2
+    assert entry.kernel is entry.kernel
+    assert entry.kernel(3.0) == 9.0
+
+def test_expression_cache_hits_and_misses():
+    """Test the hit and miss counters of the ExpressionCache class."""
+    cache = ExpressionCache(maxsize=2)
+    assert cache.get("x") is None
+    entry = cache.get_or_create("x", lambda: make_entry("x"))
+    assert cache.get_or_create("x", lambda: make_entry("x")) is entry
+    assert cache.hits == 1 and cache.misses == 2
+
+def test_expression_cache_lru_eviction():
+    """Test the least recently used entry is evicted first."""
+    cache = ExpressionCache(maxsize=2)
+    cache.put("x", make_entry("x"))
+    cache.put("x**2", make_entry("x**2"))
+    cache.get("x")
+    cache.put("x**3", make_entry("x**3"))
+    assert "x" in cache and "x**3" in cache
+    assert "x**2" not in cache
+
+def test_expression_cache_resize_and_clear():
+    """Test the resize and clear methods of the ExpressionCache class."""
+    cache = ExpressionCache(maxsize=3)
+    for function_string in ("x", "x**2", "x**3"):
+        cache.put(function_string, make_entry(function_string))
+    cache.resize(1)
+    assert len(cache) == 1 and "x**3" in cache
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == 0 and cache.misses == 0
+    with pytest.raises(ValueError, match="maxsize must be at least 1"):
+        cache.resize(0)
+
+def test_parse_function_string_uses_cache():
+    """Test the parse_function_string function reuses cached expressions for normalized input."""
+    helpers.expression_cache.clear()
+    first = helpers.get_cached_expression("x^2 + 1")
+    second = helpers.get_cached_expression("x**2+1")
+    assert first is second
+    assert helpers.expression_cache.hits == 1 and helpers.expression_cache.misses == 1
@@ -0,0 +1,109 @@
+import pytest
+import sympy
+import numpy as np
+from utils import expressions
+from utils.exceptions import ValidationError
+
+CORPUS = [
+    "x**2+3*x-1",
+    "-x**2",
+    "2**-x",
+    "x**2**3",
+    "(x-1)*(x+1)/x",
+    "sin(x)+cos(2*x)",
+    "exp(sin(x**2))*log(1+cos(x)**2)",
+    "abs(x)+sign(x)*sqrt(abs(x))",
+    "log(x, 2) + pi*E",
+    "1.5e-3*x - .5",
+]
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_parse_expression_matches_sympy(text):
+    """Test the parse_expression function agrees with sympy on the plotter grammar."""
+    tree = expressions.parse_expression(text)
+    assert sympy.simplify(expressions.to_sympy(tree) - sympy.parse_expr(text)) == 0
+    assert expressions.parse_expression(str(tree)) == tree
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_compile_expression_matches_numpy(text):
+    """Test the compile_expression function evaluates like a sympy lambdified kernel."""
+    x_data = np.linspace(0.1, 3, 50)
+    kernel = expressions.compile_expression(expressions.parse_expression(text))
+    expected = sympy.lambdify(sympy.Symbol("x"), sympy.parse_expr(text), modules="numpy")(x_data)
+    assert np.allclose(kernel(x_data), expected)
+
+def test_parse_expression_structure():
+    """Test the parse_expression function builds the tree with Python precedence."""
+    tree = expressions.parse_expression("-x^2 + 1")
+    assert tree == expressions.BinaryOp(
+        "+",
+        expressions.UnaryOp(expressions.BinaryOp("**", expressions.Symbol("x"), expressions.Number("2"))),
+        expressions.Number("1"),
+    )
+    assert str(tree) == "-x**2 + 1"
+    assert tree.free_symbols == {"x"}
+    assert expressions.parse_expression("x + y*t").free_symbols == {"x", "y", "t"}
+
+def test_parse_expression_equation():
+    """Test the parse_expression function keeps an equation apart from the difference of its sides."""
+    tree = expressions.parse_expression("x^2 + y^2 = 1 + x")
+    assert isinstance(tree, expressions.Equation) and str(tree) == "x**2 + y**2 = 1 + x"
+    assert tree.free_symbols == {"x", "y"}
+    assert tree != expressions.parse_expression("x^2 + y^2 - (1 + x)")
+    assert expressions.parse_expression(str(tree)) == tree and expressions.from_data(expressions.to_data(tree)) == tree
+    assert expressions.compile_expression(tree, ("x", "y"))(2.0, 1.0) == 2.0
+
+@pytest.mark.parametrize("text", [
+    "__import__('os').system('ls')",
+    "x.real",
+    "lambda: 1",
+    "2x",
+    "sin",
+    "f(x)",
+    "log(x, 2, 3)",
+    "(x + 1",
+    "x +",
+    "x = 1 = 2",
+    "sin(x = 1)",
+    "(" * 5000 + "x" + ")" * 5000,
+])
+def test_parse_expression_rejects_invalid_input(text):
+    """Test the parse_expression function rejects anything outside the grammar without evaluating it."""
+    with pytest.raises(ValidationError, match="function is not valid"):
+        expressions.parse_expression(text)
+
+def test_compile_expression_constant_and_variables():
+    """Test the compile_expression function folds constants and takes one array per variable."""
+    assert expressions.compile_expression(expressions.parse_expression("2*pi"))(np.zeros(3)) == pytest.approx(2 * np.pi)
+    kernel = expressions.compile_expression(expressions.parse_expression("x**2 + y**2 - 1"), ("x", "y"))
+    assert np.array_equal(kernel(np.array([1.0, 0.0]), np.array([1.0, 2.0])), [1.0, 3.0])
+
+def test_compile_expression_long_sum():
+    """Test the compile_expression function compiles a long flat sum, while hashing or fusing it too deeply is rejected."""
+    tree = expressions.parse_expression("+".join(["x"] * 500))
+    assert np.array_equal(expressions.compile_expression(tree)(np.arange(3.0)), [0.0, 500.0, 1000.0])
+    assert str(tree) == " + ".join(["x"] * 500)
+    with pytest.raises(ValidationError, match="nested too deeply"):
+        hash(tree)
+    with pytest.raises(ValidationError, match="nested too deeply"):
+        expressions.compile_fused([tree])
+
+def test_compile_fused_matches_separate_kernels():
+    """Test the compile_fused function stacks the values of every tree, as their own kernels evaluate them."""
+    trees = [expressions.parse_expression(text) for text in CORPUS + ["2*pi", "x", "x**2+3*x-1"]]
+    x_data = np.linspace(0.1, 3, 50)
+    with np.errstate(all="ignore"):
+        values = expressions.compile_fused(trees)(x_data)
+    assert values.shape == (len(trees), x_data.size)
+    for tree, row in zip(trees, values):
+        assert np.allclose(row, expressions.compile_expression(tree)(x_data))
+
+def test_compile_fused_shares_subexpressions(monkeypatch):
+    """Test the compile_fused function evaluates a subexpression common to several trees once per call."""
+    calls = []
+    monkeypatch.setitem(expressions.FUNCTIONS, "exp", (lambda value: calls.append(value) or np.exp(value), "exp", (1,)))
+    trees = [expressions.parse_expression(text) for text in ("exp(-x**2)*sin(3*x)", "-2*x*exp(-x**2)*sin(3*x) + 3*exp(-x**2)*cos(3*x)")]
+    values = expressions.compile_fused(trees)(np.linspace(-1, 1, 5))
+    assert len(calls) == 1
+    x_data = np.linspace(-1, 1, 5)
+    assert np.allclose(values[1], np.exp(-x_data**2) * (3 * np.cos(3 * x_data) - 2 * x_data * np.sin(3 * x_data)))
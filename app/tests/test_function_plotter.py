@@ -17,6 +17,7 @@ def test_create_widgets(function_plotter: FunctionPlotter):
     assert function_plotter.xmin_input is not None, "The xmin input should not be None"
     assert function_plotter.xmax_label is not None, "The xmax label should not be None"
     assert function_plotter.xmax_input is not None, "The xmax input should not be None"
+    assert function_plotter.live_preview_checkbox is not None, "The live preview checkbox should not be None"
     assert function_plotter.plot_button is not None, "The plot button should not be None"
     assert function_plotter.zoom_in_button is not None, "The zoom in button should not be None"
     assert function_plotter.zoom_out_button is not None, "The zoom out button should not be None"
@@ -24,6 +25,8 @@ def test_create_widgets(function_plotter: FunctionPlotter):
     assert function_plotter.save_image_button is not None, "The save image button should not be None"
     assert function_plotter.derivative_button is not None, "The derivative button should not be None"
     assert function_plotter.integral_button is not None, "The integral button should not be None"
+    assert function_plotter.derivative_curve_button is not None, "The derivative curve button should not be None"
+    assert function_plotter.integral_curve_button is not None, "The integral curve button should not be None"
     assert function_plotter.change_color_button is not None, "The change color button should not be None"
     assert function_plotter.toggle_grid_button is not None, "The toggle grid button should not be None"
     assert function_plotter.toggle_legend_button is not None, "The toggle legend button should not be None"
@@ -31,6 +34,7 @@ def test_create_widgets(function_plotter: FunctionPlotter):
     assert function_plotter.x_label_button is not None, "The x label button should not be None"
     assert function_plotter.y_label_button is not None, "The y label button should not be None"
     assert function_plotter.title_button is not None, "The title button should not be None"
+    assert function_plotter.save_timings_button is not None, "The save timings button should not be None"
     assert function_plotter.cursor_label is not None, "The cursor label should not be None"
     assert function_plotter.figure is not None, "The figure should not be None"
     assert function_plotter.canvas is not None, "The canvas should not be None"
@@ -41,7 +45,7 @@ def test_create_widgets(function_plotter: FunctionPlotter):
 def test_create_layout(function_plotter: FunctionPlotter):
     """Test the creation of the layout"""
     assert function_plotter.layout is not None, "The layout should not be None"
-    assert function_plotter.layout.count() == 22, "The layout should have 22 widgets"
+    assert function_plotter.layout.count() == 30, "The layout should have 30 widgets"
 
 @pytest.mark.qt
 def test_connect_signals(function_plotter: FunctionPlotter):
@@ -53,6 +57,8 @@ def test_connect_signals(function_plotter: FunctionPlotter):
     assert function_plotter.save_image_button.clicked is not None, "The save image button should have a clicked signal"
     assert function_plotter.derivative_button.clicked is not None, "The derivative button should have a clicked signal"
     assert function_plotter.integral_button.clicked is not None, "The integral button should have a clicked signal"
+    assert function_plotter.derivative_curve_button.clicked is not None, "The derivative curve button should have a clicked signal"
+    assert function_plotter.integral_curve_button.clicked is not None, "The integral curve button should have a clicked signal"
     assert function_plotter.change_color_button.clicked is not None, "The change color button should have a clicked signal"
     assert function_plotter.toggle_grid_button.clicked is not None, "The toggle grid button should have a clicked signal"
     assert function_plotter.toggle_legend_button.clicked is not None, "The toggle legend button should have a clicked signal"
@@ -60,4 +66,5 @@ def test_connect_signals(function_plotter: FunctionPlotter):
     assert function_plotter.x_label_button.clicked is not None, "The x label button should have a clicked signal"
     assert function_plotter.y_label_button.clicked is not None, "The y label button should have a clicked signal"
     assert function_plotter.title_button.clicked is not None, "The title button should have a clicked signal"
+    assert function_plotter.save_timings_button.clicked is not None, "The save timings button should have a clicked signal"
     assert function_plotter.canvas.mpl_connect is not None, "The canvas should have a mpl_connect signal"
@@ -1,9 +1,7 @@
 import pytest
 import sympy
-from PySide6.QtWidgets import QMessageBox
+import numpy as np
 from utils.exceptions import ValidationError
-from utils.enums import MessageType
-from unittest import mock
 from utils import helpers
 def test_parse_function_string():
     """Test the parse_function_string function."""
@@ -65,13 +63,31 @@ def test_get_xy_data():
     assert len(x_data) == 101
     assert len(y_data) == 101
 
-def test_show_message():
-    """Test the show_message function."""
-    timeout_seconds = 2
-    title = "Test"
-    message = "Test message"
-    message_type = MessageType.INFORMATION
+def test_get_xy_data_vectorized():
+    """Test the get_xy_data function returns float64 arrays for a configurable sample count."""
+    function_parsed = helpers.parse_function_string("x^2+3*x-1")
+    x_data, y_data = helpers.get_xy_data(function_parsed, -1, 1, num_samples=100_000)
+    assert isinstance(x_data, np.ndarray) and x_data.dtype == np.float64
+    assert isinstance(y_data, np.ndarray) and y_data.dtype == np.float64
+    assert len(x_data) == 100_000
+    assert np.allclose(y_data, x_data**2 + 3 * x_data - 1)
 
-    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout") as mock_show_with_timeout:
-        helpers.show_message(timeout_seconds, title, message, message_type)
-        mock_show_with_timeout.assert_called_once_with(timeout_seconds=timeout_seconds, title=title, message=message, icon=QMessageBox.Information)
+def test_get_xy_data_constant_function():
+    """Test the get_xy_data function with a constant function."""
+    function_parsed = helpers.parse_function_string("5")
+    x_data, y_data = helpers.get_xy_data(function_parsed, 0, 1, num_samples=11)
+    assert y_data.shape == x_data.shape
+    assert np.all(y_data == 5)
+
+def test_get_xy_data_undefined_values():
+    """Test the get_xy_data function maps undefined and non-real values to NaN."""
+    function_parsed = helpers.parse_function_string("1/x + sqrt(x)")
+    x_data, y_data = helpers.get_xy_data(function_parsed, -1, 1, num_samples=3)
+    assert np.isnan(y_data[0]) and np.isnan(y_data[1])
+    assert y_data[2] == 2
+
+def test_compile_function_unknown_symbol():
+    """Test the compile_function function with a symbol other than x."""
+    function_parsed = helpers.parse_function_string("x+y")
+    with pytest.raises(ValidationError, match="function must only depend on x."):
+        helpers.compile_function(function_parsed)
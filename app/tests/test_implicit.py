@@ -0,0 +1,52 @@
+import numpy as np
+from utils import helpers, implicit, workers
+from utils.enums import SamplingMode
+
+def count_evaluations(kernel):
+    """Wrap a kernel to count the points it is evaluated at."""
+    def counted(x_data, y_data):
+        counted.points += np.size(x_data)
+        return kernel(x_data, y_data)
+    counted.points = 0
+    return counted
+
+def test_contour_traces_circle():
+    """Test the contour function traces x^2 + y^2 = 1 closely with fewer evaluations than a uniform fine grid."""
+    kernel = count_evaluations(helpers.get_cached_expression("x^2 + y^2 = 1").kernel)
+    x_data, y_data = implicit.contour(kernel, -2, 2, -2, 2, num_cells=32, levels=4)
+    defined = np.isfinite(x_data)
+    assert np.allclose(np.hypot(x_data[defined], y_data[defined]), 1, atol=1e-3)
+    angles = np.sort(np.arctan2(y_data[defined], x_data[defined]))
+    assert np.diff(angles).max() < 0.05
+    assert kernel.points < (32 * 2**4 + 1) ** 2 / 10
+
+def test_contour_separates_segments():
+    """Test the contour function separates its segments with NaN so they are not joined."""
+    x_data, y_data = implicit.contour(helpers.get_cached_expression("x*y = 0").kernel, -1, 1, -1, 1, num_cells=7, levels=1)
+    assert x_data.size % 3 == 0 and np.isnan(x_data[2::3]).all() and np.isnan(y_data[2::3]).all()
+
+def test_contour_drops_poles():
+    """Test the contour function does not draw the sign changes of tan(x*y) at its poles."""
+    kernel = helpers.get_cached_expression("tan(x*y) = 0").kernel
+    x_data, y_data = implicit.contour(kernel, -3, 3, -3, 3)
+    defined = np.isfinite(x_data)
+    assert defined.any()
+    assert np.abs(kernel(x_data[defined], y_data[defined])).max() < 1e-3
+
+def test_contour_without_crossing():
+    """Test the contour function returns no data when the curve is outside the rectangle."""
+    x_data, y_data = implicit.contour(helpers.get_cached_expression("x^2 + y^2 = -1").kernel, -1, 1, -1, 1)
+    assert x_data.size == 0 and y_data.size == 0
+
+def test_equations_without_y_are_implicit():
+    """Test equations of x alone, such as x = 1 and sin(x) = 0.5, are traced as vertical lines rather than plotted as y = lhs - rhs."""
+    result = workers.evaluate_plot_request("x = 1", "-2", "2", 101, SamplingMode.UNIFORM)
+    defined = np.isfinite(result.x_data)
+    assert result.is_implicit and helpers.get_label(result.cached_expression.tree) == "x = 1"
+    assert np.allclose(result.x_data[defined], 1) and np.ptp(result.y_data[defined]) > 3.9
+    result = workers.evaluate_plot_request("sin(x) = 0.5", "-4", "4", 101, SamplingMode.UNIFORM)
+    defined = np.isfinite(result.x_data)
+    roots = np.array([np.pi / 6, 5 * np.pi / 6, 5 * np.pi / 6 - 2 * np.pi])
+    assert result.is_implicit
+    assert np.abs(result.x_data[defined][:, None] - roots).min(axis=1).max() < 1e-3
+    assert set(np.round(result.x_data[defined], 2)) == set(np.round(roots, 2))
@@ -0,0 +1,72 @@
+import json
+import pytest
+from unittest import mock
+from PySide6.QtCore import Qt
+from function_plotter import FunctionPlotter
+from utils import helpers, widgets
+from utils.enums import MessageType
+from utils.instrumentation import Instrumentation, HISTOGRAM_BUCKETS_MILLISECONDS
+
+def test_span_records_duration():
+    """Test the span context manager records one span of its stage."""
+    instrumentation = Instrumentation()
+    assert instrumentation.last("parse") is None
+    with instrumentation.span("parse"):
+        pass
+    assert instrumentation.last("parse") >= 0
+    assert instrumentation.histograms()["parse"]["count"] == 1
+
+def test_summary():
+    """Test the summary method lists the stages that have run, in pipeline order."""
+    instrumentation = Instrumentation()
+    instrumentation.record("draw", 0.02)
+    instrumentation.record("parse", 0.001)
+    assert instrumentation.summary() == "parse 1.0 ms | draw 20.0 ms"
+
+def test_histograms_and_dump(tmp_path):
+    """Test the histograms are bucketed by latency and written as JSON."""
+    instrumentation = Instrumentation()
+    for seconds in (0.0005, 0.003, 0.003, 10):
+        instrumentation.record("evaluate", seconds)
+    histogram = instrumentation.histograms()["evaluate"]
+    assert histogram["count"] == 4 and histogram["max_ms"] == 10_000
+    counts = {bucket["le_ms"]: bucket["count"] for bucket in histogram["buckets"]}
+    assert counts[0.5] == 1 and counts[5] == 2 and counts["inf"] == 1
+    assert len(histogram["buckets"]) == len(HISTOGRAM_BUCKETS_MILLISECONDS)
+    file_name = tmp_path / "timings.json"
+    instrumentation.dump(str(file_name))
+    assert json.loads(file_name.read_text())["evaluate"]["count"] == 4
+
+def test_spans_are_logged_once_a_logger_is_attached():
+    """Test the Instrumentation class keeps span log lines until a logger is attached, then logs them in order."""
+    instrumentation = Instrumentation()
+    instrumentation.record("parse", 0.001)
+    logger = mock.Mock()
+    instrumentation.attach_logger(logger)
+    instrumentation.record("draw", 0.002)
+    assert [call.args[0] for call in logger.debug.call_args_list] == ["parse took 1.00 ms", "draw took 2.00 ms"]
+
+def test_configure_logging_adds_a_single_sink():
+    """Test show_message reuses one logging sink instead of adding one per message."""
+    sink_id = helpers.configure_logging()
+    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout"), mock.patch("loguru.logger.add") as mock_add:
+        for _ in range(3):
+            widgets.show_message(0, "Test", "Test message", MessageType.INFORMATION)
+        mock_add.assert_not_called()
+    assert helpers.configure_logging() == sink_id
+
+@pytest.mark.qt
+def test_plot_cycle_timings(qtbot, function_plotter: FunctionPlotter, tmp_path):
+    """Test a plot cycle shows its stage timings and they can be saved"""
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    qtbot.keyClicks(function_plotter.xmin_input, "1")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    qtbot.waitUntil(lambda: "draw" in function_plotter.timings_label.text(), timeout=2000)
+    for stage in ("parse", "compile", "evaluate", "draw"):
+        assert stage in function_plotter.timings_label.text()
+    function_plotter.save_image(str(tmp_path / "plot.png"))
+    assert "export" in function_plotter.timings_label.text()
+    file_name = tmp_path / "timings.json"
+    function_plotter.save_timings(str(file_name))
+    assert json.loads(file_name.read_text())["export"]["count"] >= 1
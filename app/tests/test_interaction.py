@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from PySide6.QtCore import Qt
+from function_plotter import FunctionPlotter
+
+def plot_square(qtbot, function_plotter: FunctionPlotter):
+    """Plot x^2 between 1 and 10"""
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    qtbot.keyClicks(function_plotter.xmin_input, "1")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    qtbot.waitUntil(lambda: function_plotter.interaction.background is not None, timeout=2000)
+
+@pytest.mark.qt
+def test_crosshair_is_not_a_plotted_line(qtbot, function_plotter: FunctionPlotter):
+    """Test the crosshair is animated and kept out of the axes lines"""
+    plot_square(qtbot, function_plotter)
+    assert len(function_plotter.interaction.crosshair) == 2
+    assert len(function_plotter.ax.get_lines()) == 1
+    assert all(line.get_animated() for line in function_plotter.interaction.crosshair)
+    assert function_plotter.interaction.background is not None
+
+@pytest.mark.qt
+def test_motion_moves_crosshair(qtbot, function_plotter: FunctionPlotter):
+    """Test moving the mouse blits the crosshair to the cursor"""
+    plot_square(qtbot, function_plotter)
+    function_plotter.canvas.blit = MagicMock()
+    event = MagicMock()
+    event.inaxes = function_plotter.ax
+    event.xdata, event.ydata = 3, 9
+    function_plotter.on_motion_canvas(event)
+    vertical, horizontal = function_plotter.interaction.crosshair
+    assert list(vertical.get_xdata()) == [3, 3] and list(horizontal.get_ydata()) == [9, 9]
+    assert vertical.get_visible() and horizontal.get_visible()
+    function_plotter.canvas.blit.assert_called_once()
+
+@pytest.mark.qt
+def test_live_pan_offsets_lines(qtbot, function_plotter: FunctionPlotter):
+    """Test dragging blits the lines at the pan offset and restores them on release"""
+    plot_square(qtbot, function_plotter)
+    line = function_plotter.ax.get_lines()[0]
+    xlim_before = function_plotter.ax.get_xlim()
+    event = MagicMock()
+    event.inaxes = function_plotter.ax
+    event.xdata, event.ydata = 5, 50
+    function_plotter.on_press_canvas(event)
+    assert function_plotter.interaction.panning and line.get_animated()
+    event.xdata, event.ydata = 6, 50
+    function_plotter.on_motion_canvas(event)
+    expected_dx = function_plotter.ax.transData.transform((6, 50))[0] - function_plotter.ax.transData.transform((5, 50))[0]
+    point = line.get_transform().transform((5, 50))
+    assert point[0] == pytest.approx(function_plotter.ax.transData.transform((5, 50))[0] + expected_dx)
+    assert xlim_before == function_plotter.ax.get_xlim(), "Live panning should not change the limits"
+    function_plotter.on_release_canvas(event)
+    assert not function_plotter.interaction.panning and not line.get_animated()
+    assert line.get_transform() == function_plotter.ax.transData
+    assert np.allclose(function_plotter.ax.get_xlim(), (xlim_before[0] - 1, xlim_before[1] - 1))
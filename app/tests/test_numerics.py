@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from utils import numerics
+from utils.enums import IntegrationMethod
+
+def test_numerical_derivative():
+    """Test the numerical_derivative function on evenly and unevenly spaced samples."""
+    x_data = np.linspace(0, 1, 101)
+    assert np.allclose(numerics.numerical_derivative(x_data, x_data**2)[1:-1], 2 * x_data[1:-1])
+    x_data = np.sort(np.random.default_rng(0).uniform(0, 1, 200))
+    assert np.allclose(numerics.numerical_derivative(x_data, 3 * x_data + 1), 3)
+
+@pytest.mark.parametrize("method", [IntegrationMethod.TRAPEZOID, IntegrationMethod.SIMPSON])
+def test_cumulative_integral(method):
+    """Test the cumulative_integral function starts at initial and integrates from the first sample."""
+    x_data = np.linspace(0, 2, 201)
+    integral = numerics.cumulative_integral(x_data, x_data**2, initial=1.0, method=method)
+    assert integral[0] == 1.0
+    assert np.allclose(integral, x_data**3 / 3 + 1, atol=1e-4)
+
+def test_cumulative_integral_simpson_uneven_samples():
+    """Test the Simpson rule is exact for quadratics on unevenly spaced samples."""
+    x_data = np.concatenate([[0.0], np.sort(np.random.default_rng(1).uniform(0, 2, 50)), [2.0]])
+    integral = numerics.cumulative_integral(x_data, x_data**2 - x_data, method=IntegrationMethod.SIMPSON)
+    assert np.allclose(integral, x_data**3 / 3 - x_data**2 / 2)
+
+def test_cumulative_integral_undefined_samples():
+    """Test the cumulative_integral function skips over undefined samples."""
+    x_data = np.linspace(0, 4, 5)
+    y_data = np.array([1.0, 1.0, np.nan, 1.0, 1.0])
+    integral = numerics.cumulative_integral(x_data, y_data)
+    assert np.isnan(integral[2])
+    assert integral.tolist()[:2] == [0.0, 1.0] and integral.tolist()[3:] == [1.0, 2.0]
+
+def test_definite_integral():
+    """Test the definite_integral function."""
+    x_data = np.linspace(-1, 1, 11)
+    assert numerics.definite_integral(x_data, np.ones_like(x_data)) == pytest.approx(2)
+    assert numerics.definite_integral(x_data[:1], x_data[:1]) == 0.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from functools import partial
+from threading import Event
+from utils import helpers, parallel
+from utils.exceptions import EvaluationCancelled
+
+def get_evaluate(function_string: str):
+    """Get a vectorized evaluator for a function string."""
+    return partial(helpers.evaluate_at, helpers.get_cached_expression(function_string).kernel)
+
+@pytest.mark.parametrize("num_samples, chunk_size", [(101, 10), (1000, 1000), (1001, 64), (2, 1)])
+def test_evaluate_chunked_matches_serial(num_samples, chunk_size):
+    """Test the evaluate_chunked function matches a serial linspace evaluation."""
+    x_data, y_data = parallel.evaluate_chunked(get_evaluate("sin(x)*exp(-x^2)"), -3, 5, num_samples, chunk_size=chunk_size, max_workers=4, parallel_threshold=0)
+    x_expected = np.linspace(-3, 5, num_samples)
+    assert np.allclose(x_data, x_expected, rtol=0, atol=1e-12)
+    assert x_data[0] == -3 and x_data[-1] == 5
+    assert np.allclose(y_data, np.sin(x_expected) * np.exp(-x_expected**2))
+
+def test_evaluate_chunked_uses_threads_for_large_jobs(monkeypatch):
+    """Test the evaluate_chunked function only starts a thread pool above the threshold."""
+    created = []
+    class RecordingExecutor(parallel.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(parallel, "ThreadPoolExecutor", RecordingExecutor)
+    parallel.evaluate_chunked(get_evaluate("x"), 0, 1, 1000, chunk_size=100, max_workers=3, parallel_threshold=10_000)
+    assert created == []
+    parallel.evaluate_chunked(get_evaluate("x"), 0, 1, 1000, chunk_size=100, max_workers=3, parallel_threshold=1000)
+    assert created == [3]
+
+def test_evaluate_chunked_cancelled():
+    """Test the evaluate_chunked function stops between chunks when cancelled."""
+    cancelled = Event()
+    cancelled.set()
+    with pytest.raises(EvaluationCancelled):
+        parallel.evaluate_chunked(get_evaluate("x"), 0, 1, 1000, chunk_size=100, cancelled=cancelled)
+
+def test_evaluate_function_large_sample_count():
+    """Test the evaluate_function function with a sample count above the parallel threshold."""
+    function_compiled = helpers.get_cached_expression("x^2").kernel
+    x_data, y_data = helpers.evaluate_function(function_compiled, 0, 1, parallel.PARALLEL_THRESHOLD + 1)
+    assert len(y_data) == parallel.PARALLEL_THRESHOLD + 1
+    assert y_data[-1] == 1 and np.allclose(y_data, x_data**2)
@@ -2,10 +2,14 @@ import pytest
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtGui import QColor
 from PySide6.QtCore import Qt
+from unittest import mock
 from unittest.mock import MagicMock
 
 from function_plotter import FunctionPlotter
+from utils import helpers, tiles
+import json
 import os
+import numpy as np
 
 @pytest.mark.qt
 def test_on_press_canvas(qtbot, function_plotter: FunctionPlotter):
@@ -137,12 +141,11 @@ def test_zoom_in(qtbot, function_plotter: FunctionPlotter):
     function_plotter.zoom_in()
     xlim_after = function_plotter.ax.get_xlim()
     ylim_after = function_plotter.ax.get_ylim()
-    assert (
-        (xlim_after[0] == xlim_before[0] * 0.9)
-        and (xlim_after[1] == xlim_before[1] * 0.9)
-        and (ylim_after[0] == ylim_before[0] * 0.9)
-        and (ylim_after[1] == ylim_before[1] * 0.9)
-    ), "Zooming in did not work as expected"
+    for limits_before, limits_after in ((xlim_before, xlim_after), (ylim_before, ylim_after)):
+        assert (
+            np.isclose(sum(limits_after) / 2, sum(limits_before) / 2)
+            and np.isclose(limits_after[1] - limits_after[0], (limits_before[1] - limits_before[0]) * 0.9)
+        ), "Zooming in did not work as expected"
 
 
 @pytest.mark.qt
@@ -159,12 +162,113 @@ def test_zoom_out(qtbot, function_plotter: FunctionPlotter):
     function_plotter.zoom_out()
     xlim_after = function_plotter.ax.get_xlim()
     ylim_after = function_plotter.ax.get_ylim()
-    assert (
-        (xlim_after[0] == xlim_before[0] * 1.1)
-        and (xlim_after[1] == xlim_before[1] * 1.1)
-        and (ylim_after[0] == ylim_before[0] * 1.1)
-        and (ylim_after[1] == ylim_before[1] * 1.1)
-    ), "Zooming out did not work as expected"
+    for limits_before, limits_after in ((xlim_before, xlim_after), (ylim_before, ylim_after)):
+        assert (
+            np.isclose(sum(limits_after) / 2, sum(limits_before) / 2)
+            and np.isclose(limits_after[1] - limits_after[0], (limits_before[1] - limits_before[0]) * 1.1)
+        ), "Zooming out did not work as expected"
+
+
+@pytest.mark.qt
+def test_zoom_in_resamples_curve(qtbot, function_plotter: FunctionPlotter):
+    """Test the curve keeps its resolution after zooming in"""
+    function_input = "sin(x)"
+    xmin_input, xmax_input = "-100", "100"
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    for _ in range(30):
+        function_plotter.zoom_in()
+    xlim = function_plotter.ax.get_xlim()
+    x = function_plotter.curves[0].x_data
+    visible = (x >= xlim[0]) & (x <= xlim[1])
+    assert visible.sum() >= function_plotter.num_samples / 2, "Zooming in did not resample the curve"
+    x_line, _ = function_plotter.ax.get_lines()[0].get_data()
+    assert x_line.size <= 4 * function_plotter.ax.bbox.width + 2, "The drawn line was not decimated"
+
+
+@pytest.mark.qt
+def test_pan_past_range_resamples_curve(qtbot, function_plotter: FunctionPlotter):
+    """Test panning past xmax evaluates the newly exposed interval"""
+    function_input = "x^2"
+    xmin_input, xmax_input = "1", "10"
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    event = MagicMock()
+    event.inaxes = function_plotter.ax
+    event.xdata, event.ydata = 6, 0
+    function_plotter.on_press_canvas(event)
+    event.xdata, event.ydata = 1, 0
+    function_plotter.on_release_canvas(event)
+    x, y = function_plotter.ax.get_lines()[0].get_data()
+    assert x[-1] >= function_plotter.ax.get_xlim()[1], "Panning did not extend the curve"
+    assert np.allclose(y, x**2), "The extended curve is not as expected"
+
+
+@pytest.mark.qt
+def test_on_scroll_canvas(qtbot, function_plotter: FunctionPlotter):
+    """Test the scroll wheel zooms around the cursor position"""
+    function_input = "x^2"
+    xmin_input, xmax_input = "1", "10"
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    xlim_before = function_plotter.ax.get_xlim()
+    event = MagicMock()
+    event.inaxes = function_plotter.ax
+    event.xdata, event.ydata, event.button = 5, 50, "up"
+    function_plotter.on_scroll_canvas(event)
+    xlim_after = function_plotter.ax.get_xlim()
+    assert xlim_after[0] == pytest.approx(5 + (xlim_before[0] - 5) * 0.9), "Scrolling did not zoom around the cursor"
+    assert xlim_after[1] == pytest.approx(5 + (xlim_before[1] - 5) * 0.9), "Scrolling did not zoom around the cursor"
+    event.button = "down"
+    function_plotter.on_scroll_canvas(event)
+    assert function_plotter.ax.get_xlim()[1] > xlim_after[1], "Scrolling down did not zoom out"
+
+
+@pytest.mark.qt
+def test_live_preview_updates_line_in_place(qtbot, function_plotter: FunctionPlotter):
+    """Test the live preview plots after the debounce delay and then updates the same line"""
+    function_plotter.live_preview_checkbox.setChecked(True)
+    qtbot.keyClicks(function_plotter.xmin_input, "1")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    assert function_plotter.ax is None, "The preview should wait for the debounce delay"
+    qtbot.waitUntil(lambda: function_plotter.ax is not None, timeout=2000)
+    line = function_plotter.ax.get_lines()[0]
+    qtbot.keyClicks(function_plotter.function_input, "+1")
+    qtbot.waitUntil(lambda: line.get_label() == "x**2 + 1", timeout=2000)
+    assert function_plotter.ax.get_lines() == [line], "The preview should update the existing line"
+    x, y = line.get_data()
+    assert y[-1] == 101, "The previewed function is not as expected"
+
+
+@pytest.mark.qt
+def test_live_preview_skips_invalid_and_unchanged_input(qtbot, function_plotter: FunctionPlotter):
+    """Test the live preview ignores input that does not parse or did not change"""
+    function_plotter.live_preview_checkbox.setChecked(True)
+    qtbot.keyClicks(function_plotter.xmin_input, "1")
+    qtbot.keyClicks(function_plotter.xmax_input, "0")
+    qtbot.keyClicks(function_plotter.function_input, "x")
+    qtbot.wait(500)
+    assert function_plotter.ax is None, "Invalid input should not be previewed"
+    function_plotter.plot = MagicMock()
+    function_plotter.update_preview()
+    function_plotter.plot.assert_not_called()
+
+
+@pytest.mark.qt
+def test_live_preview_disabled(qtbot, function_plotter: FunctionPlotter):
+    """Test nothing is plotted while typing when live preview is disabled"""
+    qtbot.keyClicks(function_plotter.xmin_input, "1")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    qtbot.wait(500)
+    assert function_plotter.ax is None, "Nothing should be plotted without live preview"
 
 
 @pytest.mark.qt
@@ -201,6 +305,46 @@ def test_get_derivative(qtbot, function_plotter: FunctionPlotter):
     derivative = function_plotter.get_derivative(message_timeout_seconds=message_timeout_seconds)
     assert derivative == "2*x", "Getting the derivative did not work as expected."
 
+@pytest.mark.qt
+def test_get_derivative_plots_fused_curve(qtbot, function_plotter: FunctionPlotter):
+    """Test the getting of the derivative plots it once as a curve resampled in one fused pass with the function"""
+    function_input = "x^2"
+    xmin_input, xmax_input = "1", "10"
+    message_timeout_seconds=0.001
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    function_plotter.get_derivative(message_timeout_seconds=message_timeout_seconds)
+    function_plotter.get_derivative(message_timeout_seconds=message_timeout_seconds)
+    lines = function_plotter.ax.get_lines()
+    assert [line.get_label() for line in lines] == ["x**2", "2*x"], "The derivative curve was not plotted once"
+    x, y = lines[1].get_data()
+    assert np.allclose(y, 2 * x), "The derivative curve is not as expected"
+    assert function_plotter.last_function_curve is function_plotter.curves[0], "The derivative curve took the place of the last function"
+    with mock.patch("utils.helpers.evaluate_fused_at", wraps=helpers.evaluate_fused_at) as evaluate_fused_at:
+        tiles.tile_cache.clear()
+        function_plotter.ax.set_xlim(2, 3)
+        function_plotter.refresh_curves()
+    assert evaluate_fused_at.call_count == 1, "The function and its derivative were not resampled in one fused pass"
+    assert evaluate_fused_at.call_args.args[0] is helpers.get_fused_kernel(("x**2", "2*x")), "The derivative did not share the fused kernel of its function"
+    overlay = function_plotter.plot_derivative_curve()
+    assert overlay.line.get_label() == "d/dx x**2", "The derivative overlay was not added to the function"
+
+@pytest.mark.qt
+@pytest.mark.parametrize("function_input, derivative_label", [("sin(x)+x", "cos(x) + 1"), ("e^x", "exp(x)")])
+def test_get_derivative_plots_curve_of_printed_function(qtbot, function_plotter: FunctionPlotter, function_input, derivative_label):
+    """Test the getting of the derivative plots it for functions that sympy prints differently"""
+    xmin_input, xmax_input = "1", "10"
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    function_plotter.get_derivative(message_timeout_seconds=0.001)
+    lines = function_plotter.ax.get_lines()
+    assert len(lines) == 2, "The derivative curve was not plotted"
+    assert lines[1].get_label() == derivative_label, "The derivative curve label is not as expected"
+
 @pytest.mark.qt
 def test_get_integral(qtbot, function_plotter: FunctionPlotter):
     """Test the getting of the integral of the function plotter"""
@@ -211,8 +355,54 @@ def test_get_integral(qtbot, function_plotter: FunctionPlotter):
     qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
     qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
     qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
-    integral = function_plotter.get_integral(message_timeout_seconds)
-    assert integral == "x**3/3 + C", "Getting the integral did not work as expected."
+    with qtbot.waitSignal(function_plotter.integral_finished) as blocker:
+        function_plotter.get_integral(message_timeout_seconds)
+    assert blocker.args == ["x**3/3 + C"], "Getting the integral did not work as expected."
+
+@pytest.mark.qt
+def test_plot_derivative_curve(qtbot, function_plotter: FunctionPlotter):
+    """Test plotting the numerical derivative as an overlay"""
+    function_input = "x^2"
+    xmin_input, xmax_input = "1", "10"
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    qtbot.mouseClick(function_plotter.derivative_curve_button, Qt.LeftButton)
+    lines = function_plotter.ax.get_lines()
+    assert len(lines) == 2, "The derivative overlay was not plotted"
+    assert lines[1].get_label() == "d/dx x**2", "The derivative overlay label is not as expected"
+    x, y = lines[1].get_data()
+    assert np.allclose(y[1:-1], 2 * x[1:-1]), "The derivative overlay is not as expected"
+
+@pytest.mark.qt
+def test_plot_integral_curve_anchored_at_xmin(qtbot, function_plotter: FunctionPlotter):
+    """Test the integral overlay runs from xmin and stays anchored there after panning"""
+    function_input = "x^2"
+    xmin_input, xmax_input = "1", "10"
+    qtbot.keyClicks(function_plotter.function_input, function_input)
+    qtbot.keyClicks(function_plotter.xmin_input, xmin_input)
+    qtbot.keyClicks(function_plotter.xmax_input, xmax_input)
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    overlay = function_plotter.plot_integral_curve()
+    x, y = overlay.line.get_data()
+    assert np.allclose(y, (x**3 - 1) / 3), "The integral overlay is not as expected"
+    event = MagicMock()
+    event.inaxes = function_plotter.ax
+    event.xdata, event.ydata = 10, 0
+    function_plotter.on_press_canvas(event)
+    event.xdata, event.ydata = 1, 0
+    function_plotter.on_release_canvas(event)
+    x, y = overlay.line.get_data()
+    assert x[0] > 1, "Panning did not resample the overlay"
+    assert np.allclose(y, (x**3 - 1) / 3), "The integral overlay lost its anchor after panning"
+
+@pytest.mark.qt
+def test_plot_overlay_without_function(function_plotter: FunctionPlotter):
+    """Test plotting an overlay before any function only warns"""
+    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout"):
+        assert function_plotter.plot_derivative_curve() is None
+        assert function_plotter.plot_integral_curve() is None
 
 @pytest.mark.qt
 def test_change_color(qtbot, function_plotter: FunctionPlotter):
@@ -277,3 +467,166 @@ def test_add_another_function(qtbot, function_plotter: FunctionPlotter):
     assert (
         len(function_plotter.ax.get_lines()) == 2
     ), "Adding another function did not work as expected."
+
+
+@pytest.mark.qt
+def test_plot_reuses_axes(qtbot, function_plotter: FunctionPlotter):
+    """Test plotting a new function updates the existing axes instead of rebuilding them"""
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    qtbot.keyClicks(function_plotter.xmin_input, "1")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    ax = function_plotter.ax
+    ax.set_title("kept")
+    function_plotter.function_input.setText("x^3")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    assert function_plotter.ax is ax, "Plotting should keep the axes alive"
+    assert len(ax.get_lines()) == 1, "The previous curve should be removed"
+    assert ax.get_title() == "kept", "Plotting should keep the axes styling"
+    assert ax.get_ylim()[1] >= 1000, "The axes should autoscale to the new curve"
+
+
+@pytest.mark.qt
+def test_reset_restores_limits_without_evaluating(qtbot, function_plotter: FunctionPlotter):
+    """Test resetting restores the original view and samples without re-evaluating"""
+    qtbot.keyClicks(function_plotter.function_input, "sin(x)")
+    qtbot.keyClicks(function_plotter.xmin_input, "-10")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    xlim_before = function_plotter.ax.get_xlim()
+    x_before, _ = function_plotter.ax.get_lines()[0].get_data()
+    for _ in range(5):
+        function_plotter.zoom_in()
+    with mock.patch("utils.helpers.evaluate_function", side_effect=AssertionError("evaluated")):
+        function_plotter.reset_plot()
+        function_plotter.change_color(color_input=QColor.fromRgbF(1, 0.3, 0.5, 1))
+        function_plotter.toggle_grid()
+    assert function_plotter.ax.get_xlim() == xlim_before, "Resetting did not restore the limits"
+    x_after, _ = function_plotter.ax.get_lines()[0].get_data()
+    assert np.array_equal(x_after, x_before), "Resetting did not restore the original samples"
+
+
+@pytest.mark.qt
+def test_export_data(qtbot, function_plotter: FunctionPlotter, tmp_path):
+    """Test exporting the sampled data of every plotted function"""
+    qtbot.keyClicks(function_plotter.function_input, "x")
+    qtbot.keyClicks(function_plotter.xmin_input, "0")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    function_plotter.function_input.setText("-x")
+    function_plotter.plot_another_function()
+    file_name = str(tmp_path / "data.npy")
+    function_plotter.export_data(file_name=file_name, num_samples=11)
+    table = np.load(file_name)
+    assert np.array_equal(table, np.column_stack([np.arange(11), np.arange(11), -np.arange(11)])), "Exporting the data did not work as expected."
+
+
+@pytest.mark.qt
+def test_session_round_trip(qtbot, function_plotter: FunctionPlotter, tmp_path):
+    """Test a saved session restores the curves, styling and view without parsing again"""
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    qtbot.keyClicks(function_plotter.xmin_input, "-2")
+    qtbot.keyClicks(function_plotter.xmax_input, "2")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    function_plotter.function_input.setText("sin(x)")
+    function_plotter.plot_another_function()
+    function_plotter.change_color(color_input=QColor.fromRgbF(1, 0, 0, 1))
+    function_plotter.change_x_label(label="time", ok=True)
+    function_plotter.toggle_grid()
+    function_plotter.plot_derivative_curve()
+    function_plotter.zoom_in()
+    file_name = str(tmp_path / "session.json")
+    function_plotter.save_session(file_name=file_name)
+    state = function_plotter.get_session_state()
+
+    restored_plotter = FunctionPlotter()
+    restored_plotter.background_evaluation = False
+    qtbot.addWidget(restored_plotter)
+    helpers.expression_cache.clear()
+    restored_plotter.open_session(file_name=file_name)
+    assert helpers.expression_cache.misses == 0, "Opening the session parsed the functions again"
+    assert restored_plotter.get_session_state() == state, "Opening the session did not restore it"
+    assert [line.get_label() for line in restored_plotter.ax.get_lines()] == ["x**2", "sin(x)", "d/dx sin(x)"]
+
+
+@pytest.mark.qt
+def test_session_with_invalid_expression(qtbot, function_plotter: FunctionPlotter, tmp_path):
+    """Test opening a session skips and reports a stored expression that no longer plots, restoring the rest"""
+    qtbot.keyClicks(function_plotter.function_input, "x^2")
+    qtbot.keyClicks(function_plotter.xmin_input, "-2")
+    qtbot.keyClicks(function_plotter.xmax_input, "2")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    function_plotter.function_input.setText("sin(x)")
+    function_plotter.plot_another_function()
+    function_plotter.plot_derivative_curve()
+    file_name = tmp_path / "session.json"
+    function_plotter.save_session(file_name=str(file_name))
+    state = json.loads(file_name.read_text())
+    state["curves"][0]["function"] = "x +* 2"
+    file_name.write_text(json.dumps(state))
+
+    restored_plotter = FunctionPlotter()
+    restored_plotter.background_evaluation = False
+    qtbot.addWidget(restored_plotter)
+    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout") as mock_show_with_timeout:
+        restored_plotter.open_session(file_name=str(file_name))
+    mock_show_with_timeout.assert_called_once()
+    assert "could not be restored" in mock_show_with_timeout.call_args.kwargs["message"]
+    assert [line.get_label() for line in restored_plotter.ax.get_lines()] == ["sin(x)", "d/dx sin(x)"]
+
+
+@pytest.mark.qt
+def test_plot_implicit_curve(qtbot, function_plotter: FunctionPlotter):
+    """Test plotting an implicit equation traces its curve and retraces it on zoom"""
+    qtbot.keyClicks(function_plotter.function_input, "x^2 + y^2 = 1")
+    qtbot.keyClicks(function_plotter.xmin_input, "-2")
+    qtbot.keyClicks(function_plotter.xmax_input, "2")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    assert not function_plotter.curves and len(function_plotter.implicit_curves) == 1
+    line = function_plotter.implicit_curves[0].line
+    assert line.get_label() == "x**2 + y**2 = 1", "The implicit curve label is not as expected."
+    x_data, y_data = line.get_data()
+    defined = np.isfinite(x_data)
+    assert np.allclose(np.hypot(x_data[defined], y_data[defined]), 1, atol=1e-3), "The implicit curve is not on the circle."
+    function_plotter.ax.set_xlim(0.9, 1.1)
+    function_plotter.ax.set_ylim(-0.1, 0.1)
+    function_plotter.refresh_curves()
+    x_zoomed, _ = line.get_data()
+    assert np.nanmin(x_zoomed) >= 0.9 and np.sum(np.isfinite(x_zoomed)) > 100, "Zooming did not retrace the implicit curve."
+
+
+@pytest.mark.qt
+def test_plot_heatmap(qtbot, function_plotter: FunctionPlotter):
+    """Test plotting a function of x and y as a heatmap that is redrawn from the cached mesh on pan"""
+    function_plotter.surface_style_combo_box.setCurrentText("Heatmap z = f(x, y)")
+    qtbot.keyClicks(function_plotter.function_input, "sin(x)*cos(y)")
+    qtbot.keyClicks(function_plotter.xmin_input, "-3")
+    qtbot.keyClicks(function_plotter.xmax_input, "3")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    assert len(function_plotter.surfaces) == 1 and len(function_plotter.ax.images) == 1, "The heatmap was not drawn."
+    assert function_plotter.ax.get_xlim() == (-3, 3) and function_plotter.ax.get_ylim() == (-3, 3)
+    evaluated_points = function_plotter.mesh_cache.evaluated_points
+    function_plotter.ax.set_xlim(-2, 4)
+    function_plotter.refresh_curves()
+    assert function_plotter.mesh_cache.evaluated_points - evaluated_points < evaluated_points / 3, "Panning evaluated the whole mesh again."
+    function_plotter.surface_style_combo_box.setCurrentText("Implicit curve f(x, y) = 0")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    assert not function_plotter.surfaces and not function_plotter.ax.images and len(function_plotter.implicit_curves) == 1
+
+
+@pytest.mark.qt
+def test_return_to_view_uses_tile_cache(qtbot, function_plotter: FunctionPlotter):
+    """Test zooming back to a view already seen assembles the curve from cached tiles without evaluating"""
+    qtbot.keyClicks(function_plotter.function_input, "sin(x)")
+    qtbot.keyClicks(function_plotter.xmin_input, "-10")
+    qtbot.keyClicks(function_plotter.xmax_input, "10")
+    qtbot.mouseClick(function_plotter.plot_button, Qt.LeftButton)
+    function_plotter.zoom_in()
+    x_zoomed_in, y_zoomed_in = function_plotter.curves[0].x_data, function_plotter.curves[0].y_data
+    function_plotter.zoom_out()
+    with mock.patch("utils.helpers.evaluate_at", side_effect=AssertionError("evaluated")):
+        function_plotter.zoom_in()
+        function_plotter.zoom_out()
+    function_plotter.zoom_in()
+    assert np.array_equal(function_plotter.curves[0].x_data, x_zoomed_in), "Returning to the view did not give the same samples"
+    assert np.array_equal(function_plotter.curves[0].y_data, y_zoomed_in)
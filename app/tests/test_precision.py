@@ -0,0 +1,68 @@
+import numpy as np
+from matplotlib.lines import Line2D
+from utils import curves, expressions, helpers, precision
+
+def test_is_resolution_limited():
+    """Test the is_resolution_limited function detects views narrower than float64 spacing allows."""
+    assert not precision.is_resolution_limited(-1, 1, 1000)
+    assert precision.is_resolution_limited(1, 1 + 1e-14, 1000)
+    assert np.unique(precision.get_distinct_samples(1, 1 + 1e-14, 1000)).size < 1000
+
+def test_get_roughness():
+    """Test the get_roughness function separates smooth curves from rounding noise."""
+    x_data = np.linspace(-10, 10, 1000)
+    assert precision.get_roughness(np.sin(x_data)) < precision.ROUGHNESS_TOLERANCE
+    noise = np.random.default_rng(0).normal(size=1000)
+    assert precision.get_roughness(noise) > precision.ROUGHNESS_TOLERANCE
+
+def test_high_precision_evaluator_detects_cancellation():
+    """Test the HighPrecisionEvaluator class only escalates when float64 samples are wrong."""
+    tree = expressions.parse_expression("(1-cos(x))/x^2")
+    evaluator = precision.HighPrecisionEvaluator(tree)
+    x_data = np.linspace(-1e-7, 1e-7, 200)
+    y_data = helpers.evaluate_at(expressions.compile_expression(tree), x_data)
+    assert evaluator.has_cancellation(x_data, y_data)
+    assert evaluator.escalate(x_data) > precision.MIN_PRECISION_BITS
+    assert np.allclose(evaluator.evaluate(x_data), 0.5)
+    x_data = np.linspace(1, 2, 200)
+    assert not evaluator.has_cancellation(x_data, helpers.evaluate_at(expressions.compile_expression(tree), x_data))
+
+def test_high_precision_evaluator_detects_complete_cancellation():
+    """Test the HighPrecisionEvaluator class probes flat float64 samples and escalates when every digit cancelled."""
+    for text, xmin, xmax, expected in (("(1-cos(x))/x^2", 1e-9, 2e-9, lambda x: 0.5), ("(x+1)-1", 1e-17, 2e-17, lambda x: x)):
+        tree = expressions.parse_expression(text)
+        evaluator = precision.HighPrecisionEvaluator(tree)
+        x_data = np.linspace(xmin, xmax, 200)
+        y_data = helpers.evaluate_at(expressions.compile_expression(tree), x_data)
+        assert precision.is_flat(y_data) and not y_data.any()
+        assert evaluator.has_cancellation(x_data, y_data)
+        evaluator.escalate(x_data)
+        assert np.allclose(evaluator.evaluate(x_data), expected(x_data), rtol=1e-12)
+    constant = expressions.parse_expression("x - x + 2")
+    x_data = np.linspace(1e-9, 2e-9, 200)
+    assert not precision.HighPrecisionEvaluator(constant).has_cancellation(x_data, helpers.evaluate_at(expressions.compile_expression(constant), x_data))
+
+def test_curve_resample_refines_flat_view():
+    """Test the Curve class evaluates a view whose float64 samples cancelled to zero with mpmath."""
+    cached_expression = helpers.get_cached_expression("(1-cos(x))/x^2")
+    x_data, y_data = helpers.evaluate_function(cached_expression.kernel, -1, 1, 1000)
+    curve = curves.Curve(Line2D([], []), cached_expression.kernel, x_data, y_data, width_pixels=100, function_string=str(cached_expression.tree))
+    curve.resample(1e-9, 2e-9, 1000)
+    assert np.allclose(curve.y_data, 0.5)
+
+def test_high_precision_evaluator_caches_values():
+    """Test the HighPrecisionEvaluator class reuses values cached at enough precision."""
+    evaluator = precision.HighPrecisionEvaluator(expressions.parse_expression("sqrt(x)"), max_cached_samples=4)
+    assert np.isnan(evaluator.evaluate(np.array([-1.0]))[0])
+    evaluator.function = None
+    assert np.isnan(evaluator.evaluate(np.array([-1.0]))[0])
+    assert len(evaluator.cache) == 1
+
+def test_curve_resample_refines_deep_zoom():
+    """Test the Curve class evaluates a deeply zoomed view with mpmath."""
+    cached_expression = helpers.get_cached_expression("(x+1)-1")
+    x_data, y_data = helpers.evaluate_function(cached_expression.kernel, -1, 1, 1000)
+    curve = curves.Curve(Line2D([], []), cached_expression.kernel, x_data, y_data, width_pixels=100, function_string=str(cached_expression.tree))
+    curve.resample(1e-15, 2e-15, 1000)
+    assert curve.x_data.size <= precision.SAMPLES_PER_PIXEL * 100
+    assert np.allclose(curve.y_data, curve.x_data, rtol=1e-12)
@@ -0,0 +1,49 @@
+import numpy as np
+from functools import partial
+from utils import helpers, sampling
+from utils.enums import SamplingMode
+
+def get_evaluate(function_string: str):
+    """Get a vectorized evaluator for a function string."""
+    return partial(helpers.evaluate_at, helpers.get_cached_expression(function_string).kernel)
+
+def test_adaptive_sample_linear_function():
+    """Test the adaptive_sample function does not refine a straight line."""
+    x_data, y_data = sampling.adaptive_sample(get_evaluate("2*x+1"), 0, 10, max_samples=10_000)
+    assert len(x_data) == sampling.DEFAULT_INITIAL_SAMPLES + sampling.DEFAULT_INITIAL_SAMPLES - 1
+    assert np.allclose(y_data, 2 * x_data + 1)
+
+def test_adaptive_sample_sorted_and_within_range():
+    """Test the adaptive_sample function returns sorted samples including both ends."""
+    x_data, y_data = sampling.adaptive_sample(get_evaluate("sin(1/x)"), 0.01, 1, max_samples=4000)
+    assert np.all(np.diff(x_data) > 0)
+    assert x_data[0] == 0.01 and x_data[-1] == 1
+    assert len(x_data) == len(y_data) <= 4000
+
+def test_adaptive_sample_refines_sharp_features():
+    """Test the adaptive_sample function spends its samples around a narrow peak."""
+    x_data, _ = sampling.adaptive_sample(get_evaluate("exp(-1000*x^2)"), -10, 10, max_samples=2000)
+    near_peak = np.count_nonzero(np.abs(x_data) < 0.2)
+    far_from_peak = np.count_nonzero(np.abs(x_data) > 5)
+    assert near_peak > far_from_peak
+
+def test_adaptive_sample_budget():
+    """Test the adaptive_sample function respects the sample budget."""
+    x_data, _ = sampling.adaptive_sample(get_evaluate("sin(1/x)"), 0.0001, 1, max_samples=500)
+    assert len(x_data) <= 500
+
+def test_get_deviation_pixels_undefined_values():
+    """Test the get_deviation_pixels function with undefined values."""
+    left_y = np.array([0.0, np.nan, np.nan])
+    mid_y = np.array([1.0, 1.0, np.nan])
+    right_y = np.array([0.0, 0.0, np.nan])
+    deviation = sampling.get_deviation_pixels(left_y, mid_y, right_y, y_scale=2.0)
+    assert deviation.tolist() == [2.0, np.inf, 0.0]
+
+def test_get_xy_data_adaptive():
+    """Test the get_xy_data function in adaptive sampling mode."""
+    function_parsed = helpers.parse_function_string("x^2")
+    x_data, y_data = helpers.get_xy_data(function_parsed, -1, 1, num_samples=1000, sampling_mode=SamplingMode.ADAPTIVE)
+    assert x_data.dtype == np.float64 and y_data.dtype == np.float64
+    assert len(x_data) <= 1000
+    assert np.allclose(y_data, x_data**2)
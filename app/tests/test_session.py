@@ -0,0 +1,42 @@
+import json
+import pytest
+from utils import expressions, session
+from utils.exceptions import ValidationError
+
+def test_save_and_load_session(tmp_path):
+    """Test the save_session and load_session functions round trip a session state."""
+    file_name = str(tmp_path / "nested" / "session.json")
+    session.save_session(file_name, {"curves": [{"function": "x**2"}]})
+    assert session.load_session(file_name) == {"version": session.SESSION_VERSION, "curves": [{"function": "x**2"}]}
+
+def test_load_session_invalid(tmp_path):
+    """Test the load_session function rejects corrupt files and other versions."""
+    file_name = tmp_path / "session.json"
+    file_name.write_text("{")
+    with pytest.raises(ValidationError, match="The session file is not valid."):
+        session.load_session(str(file_name))
+    file_name.write_text(json.dumps({"version": session.SESSION_VERSION + 1}))
+    with pytest.raises(ValidationError, match="The session file is not supported."):
+        session.load_session(str(file_name))
+
+def test_expression_store(tmp_path):
+    """Test the ExpressionStore class round trips trees and ignores other versions and invalid data."""
+    file_name = str(tmp_path / "expressions.json")
+    trees = {text: expressions.parse_expression(text) for text in ("x**2+1", "log(x,2)*sin(-x)", "pi")}
+    store = session.ExpressionStore(file_name)
+    store.save(trees)
+    assert store.load() == trees
+    assert session.ExpressionStore(file_name, version="other").load() == {}
+    data = json.loads(open(file_name).read())
+    data["expressions"]["bad"] = ["call", "__import__", [["symbol", "os"]]]
+    with open(file_name, "w") as json_file:
+        json.dump(data, json_file)
+    assert store.load() == {}
+
+def test_expression_store_is_bounded(tmp_path, monkeypatch):
+    """Test the ExpressionStore class keeps only the newest trees."""
+    monkeypatch.setattr(session, "MAX_STORED_EXPRESSIONS", 2)
+    store = session.ExpressionStore(str(tmp_path / "expressions.json"))
+    for text in ("x", "x+1", "x+2"):
+        store.save({text: expressions.parse_expression(text)})
+    assert list(store.load()) == ["x+1", "x+2"]
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from PySide6.QtWidgets import QWidget
+from utils import startup
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_plotter_import_does_not_load_sympy():
+    """Test importing the plotter window leaves sympy and loguru to be loaded lazily."""
+    code = "import sys, function_plotter; print('sympy' in sys.modules, 'loguru' in sys.modules)"
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    output = subprocess.run([sys.executable, "-c", code], cwd=APP_DIRECTORY, env=environment, capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["False", "False"]
+
+def test_first_paint_spans_do_not_load_loguru():
+    """Test spans recorded while the window first draws stay in memory instead of loading loguru or printing to stderr."""
+    code = (
+        "import sys\n"
+        "from PySide6.QtWidgets import QApplication\n"
+        "app = QApplication([])\n"
+        "from function_plotter import FunctionPlotter\n"
+        "plotter = FunctionPlotter()\n"
+        "plotter.canvas.draw()\n"
+        "print('loguru' in sys.modules)\n"
+    )
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=APP_DIRECTORY, env=environment, capture_output=True, text=True, check=True)
+    assert completed.stdout.split() == ["False"]
+    assert "took" not in completed.stderr
+
+def test_startup_timer():
+    """Test the StartupTimer class reports its milestones in order."""
+    startup_timer = startup.StartupTimer(time.perf_counter())
+    startup_timer.mark("imports")
+    startup_timer.mark("first paint")
+    assert list(startup_timer.marks) == ["imports", "first paint"]
+    assert startup_timer.marks["imports"] <= startup_timer.marks["first paint"]
+    assert startup_timer.report().splitlines()[1].startswith("first paint")
+
+@pytest.mark.qt
+def test_first_paint_watcher(qtbot):
+    """Test the FirstPaintWatcher class calls back once after the widget is first painted."""
+    widget = QWidget()
+    qtbot.addWidget(widget)
+    calls = []
+    startup.FirstPaintWatcher(widget, lambda: calls.append(True))
+    widget.show()
+    qtbot.waitUntil(lambda: bool(calls), timeout=2000)
+    widget.repaint()
+    qtbot.wait(10)
+    assert calls == [True]
+
+def test_start_warm_up():
+    """Test the start_warm_up function loads sympy in the background and then calls back."""
+    done = []
+    startup.start_warm_up(lambda: done.append(True)).join(timeout=60)
+    assert done == [True]
+    assert "sympy" in sys.modules
@@ -0,0 +1,74 @@
+import numpy as np
+from matplotlib.figure import Figure
+from utils import helpers, surfaces
+from utils.enums import SurfaceStyle
+
+def get_kernel(function_string="sin(x)*cos(y)"):
+    return helpers.get_cached_expression(function_string).kernel
+
+def test_get_level_and_index_range():
+    """Test the get_level and get_index_range functions align the grid to power of two steps."""
+    assert surfaces.get_level(10, 100) == -3
+    assert surfaces.get_index_range(-1, 1, -3) == (-8, 8)
+    assert surfaces.get_index_range(0.01, 0.99, -1) == (0, 2)
+
+def test_mesh_cache_evaluates_function():
+    """Test the MeshCache class evaluates the function at the grid points covering the window."""
+    mesh_cache = surfaces.MeshCache()
+    mesh = mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), -1, 1, -2, 2, 100, 50)
+    x_grid, y_grid = np.meshgrid(mesh.x_values, mesh.y_values)
+    assert np.allclose(mesh.values, np.sin(x_grid) * np.cos(y_grid))
+    assert mesh.x_values[0] <= -1 and mesh.x_values[-1] >= 1
+    assert mesh.y_values[0] <= -2 and mesh.y_values[-1] >= 2
+    assert mesh_cache.evaluated_points == mesh.values.size
+
+def test_mesh_cache_reuses_overlap():
+    """Test the MeshCache class only evaluates the points a pan or zoom exposes."""
+    mesh_cache = surfaces.MeshCache()
+    mesh = mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), 0, 1, 0, 1, 64, 64)
+    mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), 0, 1, 0, 1, 64, 64)
+    assert mesh_cache.evaluated_points == mesh.values.size
+    mesh_cache.evaluated_points = 0
+    panned = mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), 0.25, 1.25, 0, 1, 64, 64)
+    assert mesh_cache.evaluated_points == 16 * panned.values.shape[0]
+    mesh_cache.evaluated_points = 0
+    zoomed_out = mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), 0, 2, 0, 2, 64, 64)
+    assert mesh_cache.evaluated_points == zoomed_out.values.size - 41 * 33
+    x_grid, y_grid = np.meshgrid(zoomed_out.x_values, zoomed_out.y_values)
+    assert np.allclose(zoomed_out.values, np.sin(x_grid) * np.cos(y_grid))
+
+def test_mesh_cache_revisits_windows_without_evaluating():
+    """Test the MeshCache class keeps the mesh of every window, so panning away and back or returning to the origin evaluates nothing."""
+    mesh_cache = surfaces.MeshCache()
+    origin = mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), -1, 1, -1, 1, 64, 64)
+    mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), 3, 5, -1, 1, 64, 64)
+    mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), -4, 4, -4, 4, 64, 64)
+    mesh_cache.evaluated_points = 0
+    assert mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), 3, 5, -1, 1, 64, 64).values.size > 0
+    assert mesh_cache.get_mesh("sin(x)*cos(y)", get_kernel(), -1, 1, -1, 1, 64, 64) is origin
+    assert mesh_cache.evaluated_points == 0
+    assert len(mesh_cache) == 3
+
+def test_mesh_cache_evicts_to_byte_budget():
+    """Test the MeshCache class drops the least recently used meshes above its byte budget."""
+    mesh_cache = surfaces.MeshCache(max_bytes=40_000)
+    for function_string in ("x + y", "x - y", "x * y"):
+        mesh_cache.get_mesh(function_string, get_kernel(function_string), 0, 1, 0, 1, 64, 64)
+    assert len(mesh_cache) == 1
+
+def test_surface_draws_heatmap_and_contour():
+    """Test the Surface class draws and removes a heatmap and a contour plot."""
+    ax = Figure().add_subplot(111)
+    mesh_cache = surfaces.MeshCache()
+    heatmap = surfaces.Surface(ax, get_kernel(), "sin(x)*cos(y)", SurfaceStyle.HEATMAP, -3, 3, mesh_cache)
+    heatmap.reset(400, 300)
+    assert ax.images and ax.images[0].get_array().shape == (49, 97)
+    heatmap.set_view(-1, 1, -1, 1, 400, 300)
+    assert len(ax.images) == 1
+    heatmap.remove()
+    assert not ax.images
+    contour = surfaces.Surface(ax, get_kernel(), "sin(x)*cos(y)", SurfaceStyle.CONTOUR, -3, 3, mesh_cache)
+    contour.reset(400, 300)
+    assert ax.collections
+    contour.remove()
+    assert not ax.collections
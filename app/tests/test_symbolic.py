@@ -0,0 +1,39 @@
+import pytest
+import sympy
+from utils.symbolic import NO_CLOSED_FORM_MESSAGE, SymbolicService
+
+x = sympy.Symbol("x")
+
+@pytest.fixture
+def symbolic_service():
+    service = SymbolicService(timeout_seconds=30)
+    yield service
+    service.close()
+
+def test_derivative_is_memoized(symbolic_service: SymbolicService):
+    """Test the derivative method returns the memoized result on repeated calls."""
+    result = symbolic_service.derivative(x**3)
+    assert result.ok and result.expression == 3 * x**2
+    assert symbolic_service.derivative(x**3) is result
+
+def test_integral(symbolic_service: SymbolicService):
+    """Test the integral method computes the antiderivative in the worker process."""
+    result = symbolic_service.integral(x**2)
+    assert result.ok and str(result) == "x**3/3"
+    assert symbolic_service.integral(x**2) is result
+
+def test_integral_without_closed_form(symbolic_service: SymbolicService):
+    """Test the integral method reports integrals sympy leaves unevaluated."""
+    result = symbolic_service.integral(x**x)
+    assert not result.ok and str(result) == NO_CLOSED_FORM_MESSAGE
+
+def test_integral_timeout_kills_worker(symbolic_service: SymbolicService):
+    """Test the integral method gives up after the timeout and replaces the worker."""
+    symbolic_service.integral(x)
+    worker = symbolic_service._process
+    symbolic_service.timeout_seconds = 0.01
+    result = symbolic_service.integral(sympy.exp(-x**2) * sympy.sin(x**3) * sympy.log(x))
+    assert not result.ok and result.message == NO_CLOSED_FORM_MESSAGE
+    assert not worker.is_alive()
+    symbolic_service.timeout_seconds = 30
+    assert str(symbolic_service.integral(2 * x)) == "x**2"
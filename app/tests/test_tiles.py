@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from utils import helpers, tiles
+
+@pytest.fixture
+def kernel():
+    kernel = helpers.get_cached_expression("sin(x)").kernel
+    def counted(x_data):
+        counted.points += x_data.size
+        return kernel(x_data)
+    counted.points = 0
+    return counted
+
+def test_get_level():
+    """Test the get_level function picks the power of two step closest to the requested resolution."""
+    assert tiles.get_level(0, 1, 1025) == -10
+    assert tiles.get_level(0, 1000, 1001) == 0
+    assert tiles.can_tile(0, 1, -10) and not tiles.can_tile(1, 1 + 1e-15, -80)
+
+def test_tile_cache_assembles_view(kernel):
+    """Test the TileCache class returns evenly spaced samples covering the view."""
+    tile_cache = tiles.TileCache()
+    x_data, y_data = tile_cache.get_samples("sin(x)", kernel, -3.3, 7.1, 2001)
+    assert x_data[0] <= -3.3 and x_data[-1] >= 7.1
+    assert np.allclose(np.diff(x_data), 2.0**-8)
+    assert np.allclose(y_data, np.sin(x_data))
+    assert kernel.points == x_data.size and tile_cache.misses == x_data.size // tiles.TILE_SAMPLES
+
+def test_tile_cache_reuses_tiles(kernel):
+    """Test the TileCache class only evaluates the tiles a pan exposes and nothing when returning to a view."""
+    tile_cache = tiles.TileCache()
+    tile_cache.get_samples("sin(x)", kernel, 0, 10, 2001)
+    kernel.points = 0
+    tile_cache.get_samples("sin(x)", kernel, 5, 15, 2001)
+    assert 0 < kernel.points <= 5 * 2**8 + tiles.TILE_SAMPLES
+    kernel.points = 0
+    tile_cache.get_samples("sin(x)", kernel, 0, 10, 2001)
+    tile_cache.get_samples("sin(x)", kernel, 5, 15, 2001)
+    assert kernel.points == 0
+
+def test_tile_cache_evicts_least_recently_used(kernel):
+    """Test the TileCache class keeps its tiles within the byte budget, evicting the least recently used."""
+    tile_bytes = tiles.TILE_SAMPLES * 8
+    tile_cache = tiles.TileCache(max_bytes=4 * tile_bytes)
+    tile_cache.get_samples("sin(x)", kernel, 0, 3 * 2**8 - 1, 3 * 2**8)
+    tile_cache.get_samples("sin(x)", kernel, 0, 2**8 - 1, 2**8)
+    tile_cache.get_samples("sin(x)", kernel, 10 * 2**8, 12 * 2**8 - 1, 2 * 2**8)
+    assert len(tile_cache) == 4 and tile_cache.nbytes == 4 * tile_bytes
+    kernel.points = 0
+    tile_cache.get_samples("sin(x)", kernel, 0, 2**8 - 1, 2**8)
+    assert kernel.points == 0
+
+def test_tile_cache_fuses_missing_tiles():
+    """Test the TileCache class evaluates the tiles several expressions miss in one call and reuses cached ones."""
+    tile_cache = tiles.TileCache()
+    keys = ("sin(x)", "cos(x)")
+    fused_kernel = helpers.get_fused_kernel(keys)
+    calls = []
+    def evaluate(x_data):
+        calls.append(x_data.size)
+        return helpers.evaluate_fused_at(fused_kernel, x_data)
+    x_data, (sin_data, cos_data) = tile_cache.get_fused_samples(keys, evaluate, 0, 10, 2001)
+    assert len(calls) == 1 and np.allclose(sin_data, np.sin(x_data)) and np.allclose(cos_data, np.cos(x_data))
+    tile_cache.get_fused_samples(keys, evaluate, 0, 10, 2001)
+    assert len(calls) == 1
+    assert np.array_equal(tile_cache.get_samples("cos(x)", None, 0, 10, 2001)[1], cos_data)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from utils import viewport
+
+def sample_square(xmin: float, xmax: float, num_samples: int):
+    """Sample x^2 and record the sampled ranges."""
+    sample_square.calls.append((xmin, xmax, num_samples))
+    x_data = np.linspace(xmin, xmax, num_samples)
+    return x_data, x_data**2
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    sample_square.calls = []
+
+def test_zoom_limits():
+    """Test the zoom_limits function keeps the anchor fixed."""
+    assert viewport.zoom_limits((0, 10), 0, 0.5) == (0, 5)
+    assert viewport.zoom_limits((0, 10), 10, 0.5) == (5, 10)
+    assert viewport.zoom_limits((-1, 1), 0.5, 2) == (-2.5, 1.5)
+
+def test_zoom_about_center():
+    """Test the zoom_about_center function keeps the center fixed and stops at float64 resolution."""
+    assert viewport.zoom_about_center((0, 10), 0.5) == (2.5, 7.5)
+    limits = (1.0, 1.0 + 10 * np.spacing(1.0))
+    assert viewport.zoom_about_center(limits, 0.5) == limits
+
+def test_resample_view_pan_computes_exposed_interval_only():
+    """Test the resample_view function only samples the newly exposed interval on a pan."""
+    x_data, y_data = sample_square(0, 10, 101)
+    sample_square.calls = []
+    x_new, y_new = viewport.resample_view(sample_square, x_data, y_data, 2, 12, 101)
+    assert len(sample_square.calls) == 1
+    xmin, xmax, _ = sample_square.calls[0]
+    assert xmin == pytest.approx(10) and xmax == pytest.approx(12)
+    assert x_new[0] <= 2 and x_new[-1] >= 12
+    assert np.allclose(np.diff(x_new), 0.1)
+    assert np.allclose(y_new, x_new**2)
+
+def test_resample_view_zoom_resamples_visible_range():
+    """Test the resample_view function samples the visible range again on a deep zoom."""
+    x_data, y_data = sample_square(0, 10, 101)
+    sample_square.calls = []
+    x_new, _ = viewport.resample_view(sample_square, x_data, y_data, 4, 5, 101)
+    assert sample_square.calls == [(4, 5, 101)]
+    assert x_new[0] == 4 and x_new[-1] == 5
+
+def test_resample_view_drops_far_samples():
+    """Test the resample_view function drops samples far outside the view."""
+    x_data, y_data = sample_square(0, 10, 101)
+    x_new, _ = viewport.resample_view(sample_square, x_data, y_data, 8, 18, 101)
+    assert x_new[0] >= 8 - viewport.KEEP_MARGIN * 10
+    assert x_new[-1] >= 18
@@ -1,5 +1,8 @@
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtTest import QTest
+from unittest import mock
+from utils import widgets
+from utils.enums import MessageType
 from utils.widgets import CustomMessageBox
 
 def test_custom_message_box(custom_message_box):
@@ -29,4 +32,15 @@ def test_custom_message_box_showWithTimeout():
     buttons = QMessageBox.Ok
     CustomMessageBox.showWithTimeout(timeout_seconds, title, message, icon, buttons)
     QTest.qWait(timeout_seconds * 1000 + 100)
-    assert True
\ No newline at end of file
+    assert True
+
+def test_show_message():
+    """Test the show_message function."""
+    timeout_seconds = 2
+    title = "Test"
+    message = "Test message"
+    message_type = MessageType.INFORMATION
+
+    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout") as mock_show_with_timeout:
+        widgets.show_message(timeout_seconds, title, message, message_type)
+        mock_show_with_timeout.assert_called_once_with(timeout_seconds=timeout_seconds, title=title, message=message, icon=QMessageBox.Information)
@@ -0,0 +1,149 @@
+import os
+import pytest
+import numpy as np
+from threading import Event
+from unittest import mock
+from PySide6.QtCore import Qt
+from function_plotter import FunctionPlotter
+from utils import workers
+from utils.enums import SamplingMode
+from utils.exceptions import EvaluationCancelled
+
+def test_evaluate_plot_request():
+    """Test the evaluate_plot_request function."""
+    result = workers.evaluate_plot_request("x^2", "0", "2", 5, SamplingMode.UNIFORM)
+    assert (result.xmin, result.xmax) == (0, 2)
+    assert np.allclose(result.y_data, result.x_data**2)
+
+def test_evaluate_plot_request_cancelled():
+    """Test the evaluate_plot_request function stops when cancelled."""
+    cancelled = Event()
+    cancelled.set()
+    with pytest.raises(EvaluationCancelled):
+        workers.evaluate_plot_request("x^2", "0", "2", 5, SamplingMode.UNIFORM, cancelled)
+
+def test_evaluation_job_signals(qtbot):
+    """Test the EvaluationJob class emits finished and failed with its job id."""
+    job = workers.EvaluationJob(7, "x^2", "0", "2", 5, SamplingMode.UNIFORM)
+    with qtbot.waitSignal(job.signals.finished) as blocker:
+        job.run()
+    assert blocker.args[0] == 7
+    job = workers.EvaluationJob(8, "", "0", "2", 5, SamplingMode.UNIFORM)
+    with qtbot.waitSignal(job.signals.failed) as blocker:
+        job.run()
+    assert blocker.args == [8, "function is empty"]
+
+def test_cancelled_evaluation_job_is_silent(qtbot):
+    """Test a cancelled EvaluationJob does not emit its result."""
+    job = workers.EvaluationJob(1, "x^2", "0", "2", 5, SamplingMode.UNIFORM)
+    job.cancel()
+    with qtbot.assertNotEmitted(job.signals.finished):
+        job.run()
+
+def test_evaluation_job_unexpected_error(qtbot, monkeypatch):
+    """Test the EvaluationJob class emits failed when evaluating raises an unexpected error."""
+    def evaluate_function(*args):
+        raise MemoryError("out of memory")
+    monkeypatch.setattr(workers.helpers, "evaluate_function", evaluate_function)
+    job = workers.EvaluationJob(3, "x^2", "0", "2", 5, SamplingMode.UNIFORM)
+    with qtbot.waitSignal(job.signals.failed) as blocker:
+        job.run()
+    assert blocker.args == [3, "function can not be evaluated.-MemoryError: out of memory"]
+
+def test_export_job_unexpected_error(qtbot, tmp_path):
+    """Test the ExportJob class emits failed and removes the partial file when a kernel raises an unexpected error."""
+    def kernel(x_data):
+        raise RuntimeError("kernel failed")
+    file_name = tmp_path / "data.npy"
+    job = workers.ExportJob(4, str(file_name), [kernel], ["f"], 0, 1, 10)
+    with qtbot.waitSignal(job.signals.failed) as blocker:
+        job.run()
+    assert blocker.args == [4, "data can not be exported.-RuntimeError: kernel failed"]
+    assert not file_name.exists()
+
+@pytest.mark.qt
+def test_background_plot(qtbot, background_function_plotter: FunctionPlotter):
+    """Test plotting evaluates on a worker and draws when the result arrives"""
+    qtbot.keyClicks(background_function_plotter.function_input, "x^2")
+    qtbot.keyClicks(background_function_plotter.xmin_input, "1")
+    qtbot.keyClicks(background_function_plotter.xmax_input, "10")
+    with qtbot.waitSignal(background_function_plotter.plot_finished, timeout=10000):
+        qtbot.mouseClick(background_function_plotter.plot_button, Qt.LeftButton)
+        assert background_function_plotter.busy_indicator.isVisibleTo(background_function_plotter)
+    x, y = background_function_plotter.ax.get_lines()[0].get_data()
+    assert x[-1] == 10 and y[-1] == 100
+    assert not background_function_plotter.busy_indicator.isVisibleTo(background_function_plotter)
+
+@pytest.mark.qt
+def test_background_plot_unexpected_error(qtbot, background_function_plotter: FunctionPlotter, monkeypatch):
+    """Test a plot whose evaluation raises an unexpected error reports it and clears the busy indicator"""
+    def evaluate_function(*args):
+        raise MemoryError("out of memory")
+    monkeypatch.setattr(workers.helpers, "evaluate_function", evaluate_function)
+    qtbot.keyClicks(background_function_plotter.function_input, "x^2")
+    qtbot.keyClicks(background_function_plotter.xmin_input, "1")
+    qtbot.keyClicks(background_function_plotter.xmax_input, "10")
+    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout") as show_message:
+        with qtbot.waitSignal(background_function_plotter.plot_finished, timeout=10000):
+            qtbot.mouseClick(background_function_plotter.plot_button, Qt.LeftButton)
+    assert show_message.call_args.kwargs["message"] == "function can not be evaluated."
+    assert not background_function_plotter.busy_indicator.isVisibleTo(background_function_plotter)
+
+@pytest.mark.qt
+def test_background_plot_supersedes_older_request(qtbot, background_function_plotter: FunctionPlotter):
+    """Test a newer plot request supersedes an in-flight older one"""
+    qtbot.keyClicks(background_function_plotter.xmin_input, "1")
+    qtbot.keyClicks(background_function_plotter.xmax_input, "10")
+    qtbot.keyClicks(background_function_plotter.function_input, "x")
+    background_function_plotter.plot()
+    background_function_plotter.function_input.setText("x^3")
+    with qtbot.waitSignal(background_function_plotter.plot_finished, timeout=10000):
+        background_function_plotter.plot()
+    background_function_plotter.thread_pool.waitForDone()
+    qtbot.wait(50)
+    lines = background_function_plotter.ax.get_lines()
+    assert len(lines) == 1
+    assert lines[0].get_label() == "x**3"
+
+@pytest.mark.qt
+def test_background_integral(qtbot, background_function_plotter: FunctionPlotter, monkeypatch):
+    """Test the integral is computed on a worker, leaving the window responsive until it arrives"""
+    integrating = Event()
+    integral = workers.helpers.symbolic_service.integral
+    def wait_and_integrate(expression):
+        integrating.wait(10)
+        return integral(expression)
+    monkeypatch.setattr(workers.helpers.symbolic_service, "integral", wait_and_integrate)
+    qtbot.keyClicks(background_function_plotter.function_input, "x^2")
+    qtbot.keyClicks(background_function_plotter.xmin_input, "1")
+    qtbot.keyClicks(background_function_plotter.xmax_input, "10")
+    with qtbot.waitSignal(background_function_plotter.plot_finished, timeout=10000):
+        qtbot.mouseClick(background_function_plotter.plot_button, Qt.LeftButton)
+    with mock.patch("utils.widgets.CustomMessageBox.showWithTimeout"):
+        with qtbot.waitSignal(background_function_plotter.integral_finished, timeout=20000) as blocker:
+            qtbot.mouseClick(background_function_plotter.integral_button, Qt.LeftButton)
+            assert background_function_plotter.statusBar().currentMessage() == "Integrating..."
+            integrating.set()
+    assert blocker.args == ["x**3/3 + C"]
+    assert background_function_plotter.statusBar().currentMessage() == ""
+
+@pytest.mark.qt
+def test_background_export(qtbot, background_function_plotter: FunctionPlotter, tmp_path):
+    """Test exporting streams on a worker with its progress shown, and a cancelled export leaves no file"""
+    qtbot.keyClicks(background_function_plotter.function_input, "sin(x)")
+    qtbot.keyClicks(background_function_plotter.xmin_input, "0")
+    qtbot.keyClicks(background_function_plotter.xmax_input, "10")
+    with qtbot.waitSignal(background_function_plotter.plot_finished, timeout=10000):
+        qtbot.mouseClick(background_function_plotter.plot_button, Qt.LeftButton)
+    file_name = str(tmp_path / "data.npy")
+    background_function_plotter.export_data(file_name=file_name, num_samples=1001)
+    assert background_function_plotter.cancel_export_button.isVisibleTo(background_function_plotter)
+    qtbot.waitUntil(lambda: background_function_plotter.export_job is None, timeout=10000)
+    assert np.load(file_name).shape == (1001, 2)
+    assert not background_function_plotter.export_progress_bar.isVisibleTo(background_function_plotter)
+    cancelled_file_name = str(tmp_path / "cancelled.npy")
+    background_function_plotter.export_data(file_name=cancelled_file_name, num_samples=20_000_000)
+    qtbot.mouseClick(background_function_plotter.cancel_export_button, Qt.LeftButton)
+    background_function_plotter.thread_pool.waitForDone()
+    assert not os.path.exists(cancelled_file_name)
+    assert not background_function_plotter.cancel_export_button.isVisibleTo(background_function_plotter)
@@ -0,0 +1,226 @@
+import math
+from functools import partial
+from itertools import count
+import numpy as np
+from typing import Callable
+from matplotlib.lines import Line2D
+from utils import decimation, helpers, numerics, precision, tiles, viewport
+from utils.enums import IntegrationMethod, OverlayKind, SamplingMode
+from utils.exceptions import ValidationError
+
+MAX_ANCHOR_SAMPLES = 100_001
+DEFAULT_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+USE_COUNTER = count()
+
+class Curve:
+    """A plotted function: its line artist, compiled kernel and sampled data.
+
+    x_data and y_data keep the full resolution samples in contiguous arrays of dtype, and
+    the line only gets a decimated copy for the current view and canvas width. float32
+    halves the memory of curves that are only displayed. When a view is deeper than
+    float64 can resolve, the visible samples are evaluated again with mpmath at the
+    precision they need. Under memory pressure a curve can be evicted down to its
+    decimated samples and evaluates its kernel again the next time the view changes.
+    """
+    __slots__ = (
+        "line",
+        "kernel",
+        "sampling_mode",
+        "width_pixels",
+        "function_string",
+        "dtype",
+        "home_x_data",
+        "home_y_data",
+        "x_data",
+        "y_data",
+        "xmin",
+        "xmax",
+        "view",
+        "last_used",
+        "evicted",
+        "high_precision",
+        "derived_from",
+    )
+
+    def __init__(self, line: Line2D, kernel: Callable, x_data: np.ndarray, y_data: np.ndarray, sampling_mode: SamplingMode = SamplingMode.UNIFORM, width_pixels: float = decimation.DEFAULT_WIDTH_PIXELS, function_string: str = "", dtype: type = np.float64):
+        self.line = line
+        self.function_string = function_string
+        self.derived_from = None
+        self.sampling_mode = sampling_mode
+        self.width_pixels = width_pixels
+        self.dtype = np.dtype(dtype)
+        self.replace(kernel, x_data, y_data)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the sample arrays of the curve."""
+        arrays = {id(array): array for array in (self.home_x_data, self.home_y_data, self.x_data, self.y_data)}
+        return sum(array.nbytes for array in arrays.values())
+
+    def replace(self, kernel: Callable, x_data: np.ndarray, y_data: np.ndarray) -> None:
+        """Swap in a new kernel and home samples, keeping the line artist."""
+        self.kernel = kernel
+        self.home_x_data, self.home_y_data = self.to_dtype(x_data), self.to_dtype(y_data)
+        self.xmin = float(x_data[0])
+        self.xmax = float(x_data[-1])
+        self.evicted = False
+        self.high_precision = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Show the samples of the home range again, without evaluating the kernel."""
+        self.set_data(self.home_x_data, self.home_y_data)
+        self.set_view(self.xmin, self.xmax)
+
+    def sample(self, xmin: float, xmax: float, num_samples: int) -> tuple[np.ndarray, np.ndarray]:
+        """Evaluate the curve kernel over an x range."""
+        return helpers.evaluate_function(self.kernel, xmin, xmax, num_samples, self.sampling_mode)
+
+    def resample(self, view_xmin: float, view_xmax: float, num_samples: int) -> None:
+        """Resample the curve for the visible x range and update its line.
+
+        Evenly sampled curves are assembled from the shared tile cache, so returning to a
+        region at a zoom level already seen evaluates nothing.
+        """
+        if self.can_use_tiles(view_xmin, view_xmax, num_samples):
+            x_data, y_data = tiles.tile_cache.get_samples(self.function_string, self.kernel, view_xmin, view_xmax, num_samples)
+        elif self.evicted:
+            x_data, y_data = self.sample(view_xmin, view_xmax, num_samples)
+        else:
+            x_data, y_data = viewport.resample_view(self.sample, self.x_data, self.y_data, view_xmin, view_xmax, num_samples)
+        self.show_samples(x_data, y_data, view_xmin, view_xmax, num_samples)
+
+    def can_use_tiles(self, view_xmin: float, view_xmax: float, num_samples: int) -> bool:
+        """Check whether the curve is resampled from the shared tile cache for a view."""
+        return bool(self.function_string) and self.sampling_mode == SamplingMode.UNIFORM and tiles.can_tile(view_xmin, view_xmax, tiles.get_level(view_xmin, view_xmax, num_samples))
+
+    def show_samples(self, x_data: np.ndarray, y_data: np.ndarray, view_xmin: float, view_xmax: float, num_samples: int) -> None:
+        """Store freshly resampled data for a view and update the line."""
+        self.evicted = False
+        self.set_data(*self.refine(x_data, y_data, view_xmin, view_xmax, num_samples))
+        self.set_view(view_xmin, view_xmax)
+
+    def refine(self, x_data: np.ndarray, y_data: np.ndarray, view_xmin: float, view_xmax: float, num_samples: int) -> tuple[np.ndarray, np.ndarray]:
+        """Replace samples float64 cannot resolve in the view with distinct x values and, on cancellation, mpmath values.
+
+        Only the visible window is evaluated with mpmath, at SAMPLES_PER_PIXEL samples per pixel column.
+        """
+        if precision.is_resolution_limited(view_xmin, view_xmax, num_samples):
+            x_data = precision.get_distinct_samples(view_xmin, view_xmax, num_samples)
+            y_data = helpers.evaluate_at(self.kernel, x_data)
+        visible = (x_data >= view_xmin) & (x_data <= view_xmax)
+        if not self.function_string or not self.get_high_precision().has_cancellation(x_data[visible], y_data[visible]):
+            return x_data, y_data
+        num_precise = min(num_samples, precision.SAMPLES_PER_PIXEL * math.ceil(self.width_pixels))
+        x_precise = precision.get_distinct_samples(view_xmin, view_xmax, num_precise)
+        self.high_precision.escalate(x_precise)
+        return x_precise, self.high_precision.evaluate(x_precise)
+
+    def get_high_precision(self) -> precision.HighPrecisionEvaluator:
+        """Get the mpmath evaluator of the curve, creating it the first time it is needed."""
+        if self.high_precision is None:
+            self.high_precision = precision.HighPrecisionEvaluator(helpers.get_cached_expression(self.function_string).tree)
+        return self.high_precision
+
+    def set_view(self, view_xmin: float, view_xmax: float, width_pixels: float | None = None) -> None:
+        """Update the line with the samples decimated for a view and canvas width."""
+        self.view = (view_xmin, view_xmax)
+        if width_pixels is not None:
+            self.width_pixels = width_pixels
+        self.last_used = next(USE_COUNTER)
+        self.line.set_data(*self.decimate(self.x_data, self.y_data))
+
+    def decimate(self, x_data: np.ndarray, y_data: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Decimate data sampled like this curve for its current view."""
+        return decimation.decimate(x_data, y_data, *self.view, self.width_pixels)
+
+    def evict(self) -> None:
+        """Drop the full resolution samples, keeping only what the line shows of the view and home range."""
+        self.home_x_data, self.home_y_data = decimation.decimate(self.home_x_data, self.home_y_data, self.xmin, self.xmax, self.width_pixels)
+        self.set_data(*self.decimate(self.x_data, self.y_data))
+        self.evicted = True
+
+    def set_data(self, x_data: np.ndarray, y_data: np.ndarray) -> None:
+        self.x_data, self.y_data = self.to_dtype(x_data), self.to_dtype(y_data)
+
+    def to_dtype(self, data: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(data, dtype=self.dtype)
+
+def resample_curves(curves: list[Curve], view_xmin: float, view_xmax: float, num_samples: int) -> None:
+    """Resample several curves for the visible x range, evaluating all the tiled ones in one fused pass over x.
+
+    The tiled curves share one kernel compiled from all their expressions, so subexpressions
+    common to a function and its derivatives are evaluated once. A curve that can not be
+    evaluated keeps its samples and is only decimated for the view.
+    """
+    tiled = [curve for curve in curves if curve.can_use_tiles(view_xmin, view_xmax, num_samples)]
+    if len(tiled) > 1:
+        keys = tuple(curve.function_string for curve in tiled)
+        try:
+            fused_kernel = helpers.get_fused_kernel(keys)
+            x_data, y_datas = tiles.tile_cache.get_fused_samples(keys, partial(helpers.evaluate_fused_at, fused_kernel), view_xmin, view_xmax, num_samples)
+        except ValidationError:
+            pass
+        else:
+            for curve, y_data in zip(tiled, y_datas):
+                try:
+                    curve.show_samples(x_data, y_data, view_xmin, view_xmax, num_samples)
+                except ValidationError:
+                    curve.set_view(view_xmin, view_xmax)
+            curves = [curve for curve in curves if curve not in tiled]
+    for curve in curves:
+        try:
+            curve.resample(view_xmin, view_xmax, num_samples)
+        except ValidationError:
+            curve.set_view(view_xmin, view_xmax)
+
+def enforce_memory_budget(curves: list[Curve], budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES) -> bool:
+    """Evict hidden curves, then the least recently used ones, until their samples fit the budget.
+
+    Returns whether any curve was evicted, so overlays computed from them can be updated.
+    """
+    total_bytes = sum(curve.nbytes for curve in curves)
+    evicted = False
+    for curve in sorted(curves, key=lambda curve: (curve.line.get_visible(), curve.last_used)):
+        if total_bytes <= budget_bytes:
+            break
+        if curve.evicted:
+            continue
+        nbytes = curve.nbytes
+        curve.evict()
+        total_bytes -= nbytes - curve.nbytes
+        evicted = True
+    return evicted
+
+class OverlayCurve:
+    """A derivative or running integral computed numerically from another curve's samples."""
+    __slots__ = ("line", "source", "kind", "integration_method")
+
+    def __init__(self, line: Line2D, source: Curve, kind: OverlayKind, integration_method: IntegrationMethod = IntegrationMethod.SIMPSON):
+        self.line = line
+        self.source = source
+        self.kind = kind
+        self.integration_method = integration_method
+        self.update()
+
+    def update(self) -> None:
+        """Recompute the overlay from the current samples of its source curve."""
+        x_data, y_data = self.source.x_data, self.source.y_data
+        if self.kind == OverlayKind.DERIVATIVE:
+            overlay_data = numerics.numerical_derivative(x_data, y_data)
+        else:
+            initial = self.get_integral_to(float(x_data[0])) if x_data.size else 0.0
+            overlay_data = numerics.cumulative_integral(x_data, y_data, initial, self.integration_method)
+        self.line.set_data(*self.source.decimate(x_data, overlay_data))
+
+    def get_integral_to(self, x: float) -> float:
+        """Integrate the source curve from its xmin to x, so the running integral stays anchored at xmin."""
+        xmin = self.source.xmin
+        if x == xmin:
+            return 0.0
+        x_data = self.source.x_data
+        step = (x_data[-1] - x_data[0]) / max(x_data.size - 1, 1) or abs(x - xmin)
+        num_samples = min(max(math.ceil(abs(x - xmin) / step) + 1, 3), MAX_ANCHOR_SAMPLES)
+        x_anchor, y_anchor = self.source.sample(min(x, xmin), max(x, xmin), num_samples)
+        integral = numerics.definite_integral(x_anchor, y_anchor, self.integration_method)
+        return integral if x > xmin else -integral
@@ -0,0 +1,49 @@
+import numpy as np
+
+DEFAULT_WIDTH_PIXELS = 800
+POINTS_PER_BUCKET = 4
+
+def decimate(x_data: np.ndarray, y_data: np.ndarray, view_xmin: float, view_xmax: float, width_pixels: float = DEFAULT_WIDTH_PIXELS) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce sorted samples to what a line width_pixels wide can show of the view.
+
+    The view is split into one bucket per pixel column and each bucket keeps its first, last,
+    lowest and highest sample (M4), so the rasterized line keeps every spike and extremum.
+    One sample beyond each side of the view is kept so the line runs to the edges, and the
+    first undefined sample of every gap is kept so gaps stay visible.
+    """
+    start = max(int(np.searchsorted(x_data, view_xmin, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x_data, view_xmax, side="right")) + 1, x_data.size)
+    x_visible, y_visible = x_data[start:stop], y_data[start:stop]
+    num_buckets = max(int(width_pixels), 1)
+    if x_visible.size <= POINTS_PER_BUCKET * num_buckets or view_xmax <= view_xmin:
+        return x_visible, y_visible
+    buckets = np.floor((x_visible - view_xmin) * (num_buckets / (view_xmax - view_xmin))).astype(np.int64)
+    np.clip(buckets, -1, num_buckets, out=buckets)
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    ends = np.append(starts[1:], buckets.size) - 1
+    indices = np.concatenate([
+        starts,
+        ends,
+        get_extreme_indices(np.fmin, y_visible, buckets, starts),
+        get_extreme_indices(np.fmax, y_visible, buckets, starts),
+        get_gap_indices(y_visible),
+    ])
+    indices = np.unique(indices)
+    return x_visible[indices], y_visible[indices]
+
+def get_extreme_indices(reduce: np.ufunc, y_data: np.ndarray, buckets: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Get the index of the first lowest (np.fmin) or highest (np.fmax) defined sample of every bucket."""
+    extremes = reduce.reduceat(y_data, starts)
+    counts = np.diff(np.append(starts, y_data.size))
+    candidates = np.flatnonzero(y_data == np.repeat(extremes, counts))
+    candidate_buckets = buckets[candidates]
+    first = np.ones(candidates.size, dtype=bool)
+    first[1:] = candidate_buckets[1:] != candidate_buckets[:-1]
+    return candidates[first]
+
+def get_gap_indices(y_data: np.ndarray) -> np.ndarray:
+    """Get the index of the first sample of every run of undefined samples."""
+    undefined = np.isnan(y_data)
+    gap_starts = undefined.copy()
+    gap_starts[1:] &= ~undefined[:-1]
+    return np.flatnonzero(gap_starts)
@@ -4,4 +4,29 @@ class MessageType(Enum):
     """Enum for message types."""
     ERROR = 1
     WARNING = 2
-    INFORMATION = 3
\ No newline at end of file
+    INFORMATION = 3
+
+class SamplingMode(Enum):
+    """Enum for x sampling strategies."""
+    UNIFORM = 1
+    ADAPTIVE = 2
+
+class OverlayKind(Enum):
+    """Enum for curves derived numerically from a plotted function."""
+    DERIVATIVE = 1
+    INTEGRAL = 2
+
+class IntegrationMethod(Enum):
+    """Enum for cumulative integration rules."""
+    TRAPEZOID = 1
+    SIMPSON = 2
+
+class ExportFormat(Enum):
+    """Enum for sampled data export file formats."""
+    NPY = 1
+    CSV = 2
+
+class SurfaceStyle(Enum):
+    """Enum for how functions of x and y are drawn as z = f(x, y)."""
+    HEATMAP = 1
+    CONTOUR = 2
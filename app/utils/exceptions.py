@@ -1,4 +1,7 @@
 class ValidationError(Exception):
     def __init__(self, message):            
         super().__init__(message)
-            
\ No newline at end of file
+            
+class EvaluationCancelled(Exception):
+    def __init__(self, message="evaluation was cancelled"):
+        super().__init__(message)
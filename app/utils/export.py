@@ -0,0 +1,96 @@
+import csv
+import os
+from threading import Event
+from typing import Callable
+import numpy as np
+from numpy.lib.format import open_memmap
+from utils import helpers, parallel
+from utils.enums import ExportFormat
+from utils.exceptions import ValidationError
+
+DEFAULT_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024
+MAX_EXPORT_SAMPLES = 2_000_000_000
+EXPORT_FORMATS = {".npy": ExportFormat.NPY, ".csv": ExportFormat.CSV}
+CSV_NUMBER_FORMAT = "%.17g"
+
+class NpyWriter:
+    """Write sample columns into a memory-mapped .npy file, flushing after every chunk."""
+
+    def __init__(self, file_name: str, num_samples: int, labels: list[str]):
+        self.table = open_memmap(file_name, mode="w+", dtype=np.float64, shape=(num_samples, len(labels)))
+
+    def write(self, start: int, columns: list[np.ndarray]) -> None:
+        stop = start + columns[0].size
+        for index, column in enumerate(columns):
+            self.table[start:stop, index] = column
+        self.table.flush()
+
+    def close(self) -> None:
+        self.table.flush()
+        del self.table
+
+class CsvWriter:
+    """Write sample columns as CSV rows under a header of labels."""
+
+    def __init__(self, file_name: str, num_samples: int, labels: list[str]):
+        self.file = open(file_name, "w", newline="")
+        csv.writer(self.file).writerow(labels)
+        self.rows = None
+
+    def write(self, start: int, columns: list[np.ndarray]) -> None:
+        if self.rows is None or self.rows.shape[0] < columns[0].size:
+            self.rows = np.empty((columns[0].size, len(columns)), dtype=np.float64)
+        rows = self.rows[:columns[0].size]
+        for index, column in enumerate(columns):
+            rows[:, index] = column
+        np.savetxt(self.file, rows, fmt=CSV_NUMBER_FORMAT, delimiter=",")
+
+    def close(self) -> None:
+        self.file.close()
+
+WRITERS = {ExportFormat.NPY: NpyWriter, ExportFormat.CSV: CsvWriter}
+
+def get_export_format(file_name: str) -> ExportFormat:
+    """Get the export format of a file name from its extension."""
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValidationError("Please choose a .npy or .csv file to export the data." + "-" + extension)
+    return EXPORT_FORMATS[extension]
+
+def get_chunk_size(num_columns: int, memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES) -> int:
+    """Get how many rows to evaluate at once so a chunk and its temporaries fit the budget."""
+    return max(memory_budget_bytes // (num_columns * np.dtype(np.float64).itemsize * 2), 1)
+
+def export_samples(
+    file_name: str,
+    kernels: list[Callable[[np.ndarray], np.ndarray]],
+    labels: list[str],
+    xmin: float,
+    xmax: float,
+    num_samples: int,
+    memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+    cancelled: Event | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> None:
+    """Stream x and the value of every kernel at num_samples evenly spaced x values to a file.
+
+    The x values are generated and evaluated one chunk at a time and written straight to the
+    .npy memory map or the CSV file, so memory stays within memory_budget_bytes whatever the
+    sample count. A partially written file is removed if the export fails or is cancelled.
+    """
+    if num_samples < 2:
+        raise ValidationError("number of samples must be at least 2.")
+    export_format = get_export_format(file_name)
+    labels = ["x"] + labels
+    chunk_size = get_chunk_size(len(labels), memory_budget_bytes)
+    writer = WRITERS[export_format](file_name, num_samples, labels)
+    try:
+        for start, x_chunk in parallel.iter_x_chunks(xmin, xmax, num_samples, chunk_size, cancelled):
+            writer.write(start, [x_chunk] + [helpers.evaluate_at(kernel, x_chunk) for kernel in kernels])
+            if on_progress:
+                on_progress(start + x_chunk.size, num_samples)
+    except Exception:
+        writer.close()
+        os.remove(file_name)
+        raise
+    writer.close()
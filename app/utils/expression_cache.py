@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+from utils import expressions
+
+DEFAULT_CACHE_SIZE = 128
+
+class CachedExpression:
+    """A parsed expression tree together with its free symbols, compiled numeric kernel and sympy form."""
+
+    def __init__(self, tree: expressions.Node, compile_kernel: Callable):
+        self.tree = tree
+        self.free_symbols = tree.free_symbols
+        self._compile_kernel = compile_kernel
+        self._kernel = None
+        self._expression = None
+
+    @property
+    def kernel(self) -> Callable:
+        """The compiled numeric kernel, compiled on first use."""
+        if self._kernel is None:
+            self._kernel = self._compile_kernel(self.tree)
+        return self._kernel
+
+    @property
+    def expression(self):
+        """The sympy expression, converted on first use by a symbolic operation."""
+        if self._expression is None:
+            self._expression = expressions.to_sympy(self.tree)
+        return self._expression
+
+class ExpressionCache:
+    """A bounded, thread-safe LRU cache of parsed expressions keyed on normalized input."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedExpression] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def items(self) -> list[tuple[str, CachedExpression]]:
+        """Get a snapshot of the entries, least recently used first."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def get(self, key: str) -> CachedExpression | None:
+        """Get an entry and mark it as most recently used, or None if missing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedExpression) -> None:
+        """Insert an entry, evicting the least recently used entries above maxsize."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key: str, factory: Callable[[], CachedExpression]) -> CachedExpression:
+        """Get an entry, creating and inserting it with factory on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            entry = factory()
+            self.put(key, entry)
+        return entry
+
+    def resize(self, maxsize: int) -> None:
+        """Change the size limit, evicting entries if the cache is now too large."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove every entry and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,543 @@
+import math
+import operator
+import re
+from typing import TYPE_CHECKING, Callable
+import numpy as np
+from utils.exceptions import ValidationError
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(?P<name>[A-Za-z_]\w*)|(?P<operator>\*\*|[-+*/^(),=]))")
+INVALID_FUNCTION_MESSAGE = "function is not valid"
+TOO_DEEP_MESSAGE = INVALID_FUNCTION_MESSAGE + "-" + "expression is nested too deeply"
+GRAMMAR_VERSION = 2
+
+if TYPE_CHECKING:
+    import sympy
+
+def cot(value):
+    return 1 / np.tan(value)
+
+def sec(value):
+    return 1 / np.cos(value)
+
+def csc(value):
+    return 1 / np.sin(value)
+
+def logarithm(value, base=None):
+    return np.log(value) if base is None else np.log(value) / np.log(base)
+
+# name: (numpy function, sympy function name, accepted argument counts)
+FUNCTIONS = {
+    "sin": (np.sin, "sin", (1,)),
+    "cos": (np.cos, "cos", (1,)),
+    "tan": (np.tan, "tan", (1,)),
+    "cot": (cot, "cot", (1,)),
+    "sec": (sec, "sec", (1,)),
+    "csc": (csc, "csc", (1,)),
+    "asin": (np.arcsin, "asin", (1,)),
+    "acos": (np.arccos, "acos", (1,)),
+    "atan": (np.arctan, "atan", (1,)),
+    "atan2": (np.arctan2, "atan2", (2,)),
+    "sinh": (np.sinh, "sinh", (1,)),
+    "cosh": (np.cosh, "cosh", (1,)),
+    "tanh": (np.tanh, "tanh", (1,)),
+    "asinh": (np.arcsinh, "asinh", (1,)),
+    "acosh": (np.arccosh, "acosh", (1,)),
+    "atanh": (np.arctanh, "atanh", (1,)),
+    "exp": (np.exp, "exp", (1,)),
+    "log": (logarithm, "log", (1, 2)),
+    "ln": (np.log, "log", (1,)),
+    "sqrt": (np.sqrt, "sqrt", (1,)),
+    "cbrt": (np.cbrt, "cbrt", (1,)),
+    "abs": (np.abs, "Abs", (1,)),
+    "Abs": (np.abs, "Abs", (1,)),
+    "sign": (np.sign, "sign", (1,)),
+    "floor": (np.floor, "floor", (1,)),
+    "ceiling": (np.ceil, "ceiling", (1,)),
+    "ceil": (np.ceil, "ceiling", (1,)),
+    "Min": (np.minimum, "Min", (2,)),
+    "Max": (np.maximum, "Max", (2,)),
+}
+CONSTANTS = {"pi": (math.pi, "pi"), "E": (math.e, "E"), "e": (math.e, "E")}
+# name: mpmath function name, for the functions whose name differs from the parsed one
+MPMATH_FUNCTIONS = {"ln": "log", "abs": "fabs", "Abs": "fabs", "ceiling": "ceil", "Min": "min", "Max": "max"}
+MPMATH_CONSTANTS = {"pi": "pi", "E": "e", "e": "e"}
+BINARY_OPERATORS = {
+    "+": (np.add, operator.add, 1),
+    "-": (np.subtract, operator.sub, 1),
+    "*": (np.multiply, operator.mul, 2),
+    "/": (np.divide, operator.truediv, 2),
+    "**": (np.power, operator.pow, 4),
+}
+UNARY_PRECEDENCE = 3
+ATOM_PRECEDENCE = 5
+
+class Node:
+    """An immutable node of a parsed expression tree, compared and hashed by structure."""
+    __slots__ = ("free_symbols",)
+
+    def key(self) -> tuple:
+        raise NotImplementedError
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        try:
+            return hash((type(self).__name__, self.key()))
+        except RecursionError:
+            raise ValidationError(TOO_DEEP_MESSAGE)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self.key()!r}"
+
+    @property
+    def precedence(self) -> int:
+        return ATOM_PRECEDENCE
+
+class Number(Node):
+    """A numeric literal, keeping its source text for exact symbolic conversion."""
+    __slots__ = ("text", "value")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.value = float(text)
+        self.free_symbols = frozenset()
+
+    def key(self) -> tuple:
+        return (self.text,)
+
+    def __str__(self) -> str:
+        return self.text
+
+class Constant(Node):
+    """A named mathematical constant such as pi."""
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = CONSTANTS[name][0]
+        self.free_symbols = frozenset()
+
+    def key(self) -> tuple:
+        return (self.name,)
+
+    def __str__(self) -> str:
+        return self.name
+
+class Symbol(Node):
+    """A variable."""
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+        self.free_symbols = frozenset((name,))
+
+    def key(self) -> tuple:
+        return (self.name,)
+
+    def __str__(self) -> str:
+        return self.name
+
+class Call(Node):
+    """A call of an elementary function."""
+    __slots__ = ("name", "args")
+
+    def __init__(self, name: str, args: tuple[Node, ...]):
+        self.name = name
+        self.args = args
+        self.free_symbols = frozenset().union(*(arg.free_symbols for arg in args))
+
+    def key(self) -> tuple:
+        return (self.name, self.args)
+
+    def __str__(self) -> str:
+        return f"{self.name}({', '.join(str(arg) for arg in self.args)})"
+
+class UnaryOp(Node):
+    """A negation."""
+    __slots__ = ("operand",)
+
+    def __init__(self, operand: Node):
+        self.operand = operand
+        self.free_symbols = operand.free_symbols
+
+    def key(self) -> tuple:
+        return (self.operand,)
+
+    @property
+    def precedence(self) -> int:
+        return UNARY_PRECEDENCE
+
+    def __str__(self) -> str:
+        return f"-{parenthesize(self.operand, self.operand.precedence < UNARY_PRECEDENCE)}"
+
+class BinaryOp(Node):
+    """An arithmetic operation on two operands."""
+    __slots__ = ("operator", "left", "right")
+
+    def __init__(self, operator: str, left: Node, right: Node):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.free_symbols = left.free_symbols | right.free_symbols
+
+    def key(self) -> tuple:
+        return (self.operator, self.left, self.right)
+
+    @property
+    def precedence(self) -> int:
+        return BINARY_OPERATORS[self.operator][2]
+
+    def __str__(self) -> str:
+        precedence = self.precedence
+        if self.operator == "**":
+            return f"{parenthesize(self.left, self.left.precedence <= precedence)}**{parenthesize(self.right, self.right.precedence < precedence)}"
+        # a left-associative chain such as x + x + ... + x is printed in one loop, so its length costs no recursion
+        node, parts = self, []
+        while type(node) is BinaryOp and node.precedence == precedence:
+            separator = f" {node.operator} " if precedence == 1 else node.operator
+            parts.append(separator + parenthesize(node.right, node.right.precedence <= precedence))
+            node = node.left
+        parts.append(parenthesize(node, node.precedence < precedence))
+        return "".join(reversed(parts))
+
+class Equation(BinaryOp):
+    """An equation lhs = rhs, evaluated as lhs - rhs so that its curve is where the difference is 0."""
+    __slots__ = ()
+
+    def __init__(self, left: Node, right: Node):
+        super().__init__("-", left, right)
+
+    def key(self) -> tuple:
+        return (self.left, self.right)
+
+    @property
+    def precedence(self) -> int:
+        return 0
+
+    def __str__(self) -> str:
+        return f"{self.left} = {self.right}"
+
+def parenthesize(node: Node, needed: bool) -> str:
+    return f"({node})" if needed else str(node)
+
+def tokenize(text: str) -> list[tuple[str, str]]:
+    """Split an expression into (kind, text) tokens, kind being number, name or operator."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise ValidationError(INVALID_FUNCTION_MESSAGE + "-" + f"unexpected character {text[position:].lstrip()[0]!r}")
+        kind = match.lastgroup
+        token = match.group(kind)
+        tokens.append((kind, "**" if token == "^" else token))
+        position = match.end()
+    return tokens
+
+class Parser:
+    """A recursive descent parser for the plotter grammar, with Python operator precedence."""
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise ValidationError(INVALID_FUNCTION_MESSAGE + "-" + "empty expression")
+        node = self.parse_sum()
+        if self.peek() == "=":
+            self.advance()
+            node = Equation(node, self.parse_sum())
+        if self.position < len(self.tokens):
+            raise self.error(f"unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def advance(self) -> tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise self.error("unexpected end of expression")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        if self.advance()[1] != text:
+            raise self.error(f"expected {text!r}")
+
+    def error(self, detail: str) -> ValidationError:
+        return ValidationError(INVALID_FUNCTION_MESSAGE + "-" + detail)
+
+    def parse_sum(self) -> Node:
+        node = self.parse_product()
+        while self.peek() in ("+", "-"):
+            node = BinaryOp(self.advance()[1], node, self.parse_product())
+        return node
+
+    def parse_product(self) -> Node:
+        node = self.parse_unary()
+        while self.peek() in ("*", "/"):
+            node = BinaryOp(self.advance()[1], node, self.parse_unary())
+        return node
+
+    def parse_unary(self) -> Node:
+        if self.peek() == "-":
+            self.advance()
+            return UnaryOp(self.parse_unary())
+        if self.peek() == "+":
+            self.advance()
+            return self.parse_unary()
+        return self.parse_power()
+
+    def parse_power(self) -> Node:
+        node = self.parse_atom()
+        if self.peek() == "**":
+            self.advance()
+            return BinaryOp("**", node, self.parse_unary())
+        return node
+
+    def parse_atom(self) -> Node:
+        kind, text = self.advance()
+        if kind == "number":
+            return Number(text)
+        if kind == "name":
+            if self.peek() == "(":
+                return self.parse_call(text)
+            if text in FUNCTIONS:
+                raise self.error(f"{text} needs arguments")
+            return Constant(text) if text in CONSTANTS else Symbol(text)
+        if text == "(":
+            node = self.parse_sum()
+            self.expect(")")
+            return node
+        raise self.error(f"unexpected {text!r}")
+
+    def parse_call(self, name: str) -> Node:
+        if name not in FUNCTIONS:
+            raise self.error(f"unknown function {name}")
+        self.expect("(")
+        args = [self.parse_sum()]
+        while self.peek() == ",":
+            self.advance()
+            args.append(self.parse_sum())
+        self.expect(")")
+        if len(args) not in FUNCTIONS[name][2]:
+            raise self.error(f"{name} takes {' or '.join(map(str, FUNCTIONS[name][2]))} arguments")
+        return Call(name, tuple(args))
+
+def parse_expression(text: str) -> Node:
+    """Parse an expression into a tree without evaluating any of it, an equation lhs = rhs into an Equation."""
+    try:
+        return Parser(tokenize(text)).parse()
+    except RecursionError:
+        raise ValidationError(TOO_DEEP_MESSAGE)
+
+def compile_expression(tree: Node, variables: tuple[str, ...] = ("x",)) -> Callable[..., np.ndarray]:
+    """Compile a tree into nested NumPy calls taking one array per variable.
+
+    Subtrees that do not depend on any variable are evaluated once at compile time, and
+    chains of sums or products such as x + x + ... + x are compiled into one loop rather
+    than one call per term.
+    """
+    try:
+        return compile_subtree(tree, variables)
+    except RecursionError:
+        raise ValidationError(TOO_DEEP_MESSAGE)
+
+def compile_subtree(tree: Node, variables: tuple[str, ...]) -> Callable[..., np.ndarray]:
+    if not tree.free_symbols:
+        with np.errstate(all="ignore"):
+            value = compile_node(tree, variables)()
+        return lambda *args: value
+    return compile_node(tree, variables)
+
+def compile_node(node: Node, variables: tuple[str, ...]) -> Callable[..., np.ndarray]:
+    if isinstance(node, (Number, Constant)):
+        value = node.value
+        return lambda *args: value
+    if isinstance(node, Symbol):
+        index = variables.index(node.name)
+        return lambda *args: args[index]
+    if isinstance(node, UnaryOp):
+        operand = compile_subtree(node.operand, variables)
+        return lambda *args: np.negative(operand(*args))
+    if isinstance(node, BinaryOp) and node.operator == "**":
+        left, right = compile_subtree(node.left, variables), compile_subtree(node.right, variables)
+        return lambda *args: np.power(left(*args), right(*args))
+    if isinstance(node, BinaryOp):
+        # walk down the left operands of a left-associative chain of + and - (or * and /), so its length costs no recursion
+        precedence = BINARY_OPERATORS[node.operator][2]
+        chain = [(BINARY_OPERATORS[node.operator][0], compile_subtree(node.right, variables))]
+        node = node.left
+        while type(node) is BinaryOp and BINARY_OPERATORS[node.operator][2] == precedence:
+            chain.append((BINARY_OPERATORS[node.operator][0], compile_subtree(node.right, variables)))
+            node = node.left
+        first = compile_subtree(node, variables)
+        chain.reverse()
+
+        def compiled_chain(*args):
+            value = first(*args)
+            for function, right in chain:
+                value = function(value, right(*args))
+            return value
+        return compiled_chain
+    function = FUNCTIONS[node.name][0]
+    compiled_args = [compile_subtree(arg, variables) for arg in node.args]
+    if len(compiled_args) == 1:
+        arg, = compiled_args
+        return lambda *args: function(arg(*args))
+    return lambda *args: function(*(compiled_arg(*args) for compiled_arg in compiled_args))
+
+def compile_fused(trees: list[Node], variables: tuple[str, ...] = ("x",)) -> Callable[..., np.ndarray]:
+    """Compile several trees into one kernel returning their values stacked into an array of shape (len(trees), ...).
+
+    Structurally equal subtrees are evaluated once per call for all the trees (common
+    subexpression elimination), subtrees that do not depend on any variable are folded at
+    compile time, and every intermediate array is released after its last use.
+    """
+    slots: dict[Node, int] = {}
+    constants: dict[int, object] = {}
+    # (slot, function, argument slots) in evaluation order; a None function loads the variable at index argument slots
+    steps: list[tuple[int, Callable | None, tuple[int, ...] | int]] = []
+
+    def visit(node: Node) -> int:
+        if node in slots:
+            return slots[node]
+        if not node.free_symbols:
+            with np.errstate(all="ignore"):
+                value = compile_node(node, variables)()
+            slot = slots[node] = len(slots)
+            constants[slot] = value
+            return slot
+        if isinstance(node, Symbol):
+            function, arguments = None, variables.index(node.name)
+        elif isinstance(node, UnaryOp):
+            function, arguments = np.negative, (visit(node.operand),)
+        elif isinstance(node, BinaryOp):
+            function, arguments = BINARY_OPERATORS[node.operator][0], (visit(node.left), visit(node.right))
+        else:
+            function, arguments = FUNCTIONS[node.name][0], tuple(visit(arg) for arg in node.args)
+        slot = slots[node] = len(slots)
+        steps.append((slot, function, arguments))
+        return slot
+
+    try:
+        root_slots = [visit(tree) for tree in trees]
+    except RecursionError:
+        raise ValidationError(TOO_DEEP_MESSAGE)
+    num_slots = len(slots)
+    last_uses = {argument: index for index, (_, function, arguments) in enumerate(steps) if function is not None for argument in arguments}
+    released = [[argument for argument, last_use in last_uses.items() if last_use == index and argument not in constants] for index in range(len(steps))]
+    rows = {slot: [row for row, root_slot in enumerate(root_slots) if root_slot == slot] for slot in root_slots}
+
+    def fused(*args):
+        out = np.empty((len(trees), *np.broadcast_shapes(*(np.shape(arg) for arg in args))))
+        values = [None] * num_slots
+        for slot, value in constants.items():
+            values[slot] = value
+            for row in rows.get(slot, ()):
+                out[row] = value
+        for index, (slot, function, arguments) in enumerate(steps):
+            slot_rows = rows.get(slot, [])
+            if function is None:
+                values[slot] = args[arguments]
+            elif slot_rows and isinstance(function, np.ufunc):
+                # a curve is written straight into its row of the stacked output
+                values[slot] = function(*(values[argument] for argument in arguments), out=out[slot_rows[0]])
+                slot_rows = slot_rows[1:]
+            else:
+                values[slot] = function(*(values[argument] for argument in arguments))
+            for row in slot_rows:
+                out[row] = values[slot]
+            for argument in released[index]:
+                values[argument] = None
+        return out
+    return fused
+
+def compile_mpmath(node: Node, variables: tuple[str, ...] = ("x",)) -> Callable:
+    """Compile a tree into nested mpmath calls taking one mpf per variable, at the working precision of the caller.
+
+    mpmath is imported here rather than at module load, as it is only needed for deep zoom.
+    """
+    try:
+        return compile_mpmath_node(node, variables)
+    except RecursionError:
+        raise ValidationError(TOO_DEEP_MESSAGE)
+
+def compile_mpmath_node(node: Node, variables: tuple[str, ...]) -> Callable:
+    import mpmath
+    if isinstance(node, Number):
+        return lambda *args: mpmath.mpf(node.text)
+    if isinstance(node, Constant):
+        constant = getattr(mpmath, MPMATH_CONSTANTS[node.name])
+        return lambda *args: +constant
+    if isinstance(node, Symbol):
+        index = variables.index(node.name)
+        return lambda *args: args[index]
+    if isinstance(node, UnaryOp):
+        operand = compile_mpmath_node(node.operand, variables)
+        return lambda *args: -operand(*args)
+    if isinstance(node, BinaryOp):
+        function = BINARY_OPERATORS[node.operator][1]
+        left, right = compile_mpmath_node(node.left, variables), compile_mpmath_node(node.right, variables)
+        return lambda *args: function(left(*args), right(*args))
+    name = MPMATH_FUNCTIONS.get(node.name, node.name)
+    function = {"min": min, "max": max}.get(name) or getattr(mpmath, name)
+    compiled_args = [compile_mpmath_node(arg, variables) for arg in node.args]
+    return lambda *args: function(*(compiled_arg(*args) for compiled_arg in compiled_args))
+
+def to_sympy(node: Node) -> "sympy.Expr":
+    """Convert a tree to the equivalent sympy expression, for symbolic operations.
+
+    sympy is imported here rather than at module load, so plotting never pays for it.
+    """
+    import sympy
+    if isinstance(node, Number):
+        return sympy.Integer(node.text) if node.text.isdigit() else sympy.Float(node.text)
+    if isinstance(node, Constant):
+        return getattr(sympy, CONSTANTS[node.name][1])
+    if isinstance(node, Symbol):
+        return sympy.Symbol(node.name)
+    if isinstance(node, UnaryOp):
+        return -to_sympy(node.operand)
+    if isinstance(node, BinaryOp):
+        return BINARY_OPERATORS[node.operator][1](to_sympy(node.left), to_sympy(node.right))
+    return getattr(sympy, FUNCTIONS[node.name][1])(*(to_sympy(arg) for arg in node.args))
+
+def to_data(node: Node) -> list:
+    """Convert a tree to nested lists of strings that can be stored as JSON."""
+    if isinstance(node, Number):
+        return ["number", node.text]
+    if isinstance(node, Constant):
+        return ["constant", node.name]
+    if isinstance(node, Symbol):
+        return ["symbol", node.name]
+    if isinstance(node, UnaryOp):
+        return ["negative", to_data(node.operand)]
+    if isinstance(node, Equation):
+        return ["equation", to_data(node.left), to_data(node.right)]
+    if isinstance(node, BinaryOp):
+        return ["binary", node.operator, to_data(node.left), to_data(node.right)]
+    return ["call", node.name, [to_data(arg) for arg in node.args]]
+
+def from_data(data: list) -> Node:
+    """Rebuild a tree stored by to_data, validating it against the grammar as it goes."""
+    kind = data[0]
+    if kind == "number":
+        return Number(data[1])
+    if kind == "constant" and data[1] in CONSTANTS:
+        return Constant(data[1])
+    if kind == "symbol" and re.fullmatch(r"[A-Za-z_]\w*", data[1]):
+        return Symbol(data[1])
+    if kind == "negative":
+        return UnaryOp(from_data(data[1]))
+    if kind == "equation":
+        return Equation(from_data(data[1]), from_data(data[2]))
+    if kind == "binary" and data[1] in BINARY_OPERATORS:
+        return BinaryOp(data[1], from_data(data[2]), from_data(data[3]))
+    if kind == "call" and data[1] in FUNCTIONS and len(data[2]) in FUNCTIONS[data[1]][2]:
+        return Call(data[1], tuple(from_data(arg) for arg in data[2]))
+    raise ValueError(f"invalid expression data {data!r}")
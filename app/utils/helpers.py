@@ -1,21 +1,53 @@
-import sympy
-from PySide6.QtWidgets import QWidget
-from PySide6.QtWidgets import QMessageBox
-from loguru import logger
+import numpy as np
+from typing import TYPE_CHECKING, Callable
+from threading import Event, Lock
 import re
-from utils.widgets import CustomMessageBox
-from utils.enums import MessageType
+from functools import lru_cache, partial
+from utils.enums import SamplingMode
+from utils import expressions, parallel, sampling
 from utils.exceptions import ValidationError
+from utils.expression_cache import CachedExpression, ExpressionCache
+from utils.symbolic import SymbolicService
+from utils.instrumentation import instrumentation
+
+if TYPE_CHECKING:
+    import sympy
 
 LOGGING_FILE_PATH = "logs/debug.log"
+DEFAULT_NUM_SAMPLES = 101
+PLOT_NUM_SAMPLES = 5001
+IMPLICIT_VARIABLES = ("x", "y")
+FUSED_KERNEL_CACHE_SIZE = 32
+
+expression_cache = ExpressionCache()
+symbolic_service = SymbolicService()
+logging_sink_id = None
+logging_lock = Lock()
 
-def parse_function_string(function_string: str) -> sympy:
+def parse_function_string(function_string: str) -> "sympy.Expr":
     """Parse a function string into a sympy expression."""
-    validate_function(function_string)
-    normalized_function: str = normalize_function(function_string)
-    function_parsed = parse_function_string_to_sympy(normalized_function)
-    return function_parsed
+    return get_cached_expression(function_string).expression
+
+def get_cached_expression(function_string: str) -> CachedExpression:
+    """Get the parsed and compiled expression for a function string from the expression cache."""
+    with instrumentation.span("parse"):
+        validate_function(function_string)
+        normalized_function: str = normalize_function(function_string)
+        return expression_cache.get_or_create(
+            normalized_function,
+            lambda: CachedExpression(parse_function_string_to_tree(normalized_function), compile_plot_function),
+        )
     
+def preload_expressions(trees: dict[str, expressions.Node]) -> None:
+    """Put parsed trees keyed by normalized function string into the expression cache, so they are not parsed again."""
+    for normalized_function, tree in trees.items():
+        if normalized_function not in expression_cache:
+            expression_cache.put(normalized_function, CachedExpression(tree, compile_plot_function))
+
+def get_cached_trees() -> dict[str, expressions.Node]:
+    """Get the parsed tree of every cached expression keyed by normalized function string."""
+    return {normalized_function: entry.tree for normalized_function, entry in expression_cache.items()}
+
 def validate_function(function_string: str) -> bool:
     """Validate a function string."""
     if not function_string:
@@ -27,13 +59,13 @@ def normalize_function(function_string: str) -> bool:
     function_string = function_string.replace("^", "**")
     return function_string
 
-def parse_function_string_to_sympy(function_string: str) -> sympy.core:
+def parse_function_string_to_tree(function_string: str) -> expressions.Node:
+    """Parse a function string into an expression tree with the restricted plotter grammar."""
+    return expressions.parse_expression(function_string)
+
+def parse_function_string_to_sympy(function_string: str) -> "sympy.Expr":
     """Parse a function string into a sympy expression."""
-    try:
-        function_string_parsed = sympy.parse_expr(function_string)
-    except SyntaxError:
-        raise ValidationError("function is not valid")
-    return function_string_parsed
+    return expressions.to_sympy(parse_function_string_to_tree(function_string))
     
 def get_x_range(xmin_input: str, xmax_input: str) -> tuple[float, float]:
     """Get the range of x values to plot."""
@@ -47,24 +79,103 @@ def get_x_range(xmin_input: str, xmax_input: str) -> tuple[float, float]:
         validation_error_message = "Please enter a valid number for the minimum and maximum values of x." + "-" + str(error)
         raise ValidationError(validation_error_message)
         
-def get_xy_data(function_parsed: sympy.core, xmin: float, xmax: float):
+def compile_function(function_parsed: "expressions.Node | sympy.Expr", variables: tuple[str, ...] = ("x",)) -> Callable[..., np.ndarray]:
+    """Compile an expression tree, or a sympy expression, into a NumPy-vectorized function of its variables."""
+    if not isinstance(function_parsed, expressions.Node):
+        function_parsed = expressions.parse_expression(str(function_parsed))
+    check_variables(function_parsed, variables)
+    return expressions.compile_expression(function_parsed, variables)
+
+def check_variables(function_parsed: expressions.Node, variables: tuple[str, ...]) -> None:
+    """Check that an expression tree only depends on the given variables."""
+    unknown_symbols = function_parsed.free_symbols - set(variables)
+    if unknown_symbols:
+        unknown_symbols_names = ", ".join(sorted(unknown_symbols))
+        raise ValidationError(f"function must only depend on {', '.join(variables)}." + "-" + unknown_symbols_names)
+
+def compile_fused_functions(functions_parsed: list[expressions.Node], variables: tuple[str, ...] = ("x",)) -> Callable[..., np.ndarray]:
+    """Compile several expression trees into one kernel evaluating all of them in a single pass, sharing common subexpressions."""
+    for function_parsed in functions_parsed:
+        check_variables(function_parsed, variables)
+    return expressions.compile_fused(functions_parsed, variables)
+
+@lru_cache(maxsize=FUSED_KERNEL_CACHE_SIZE)
+def get_fused_kernel(function_strings: tuple[str, ...]) -> Callable[[np.ndarray], np.ndarray]:
+    """Get the fused kernel of several functions of x, compiled once per combination of functions."""
+    return compile_fused_functions([get_cached_expression(function_string).tree for function_string in function_strings])
+
+def get_derivative_tree(function_string: str) -> expressions.Node:
+    """Get the symbolic derivative of a function of x as an expression tree, so it can be fused with the function."""
+    return expressions.parse_expression(str(symbolic_service.derivative(parse_function_string(function_string))))
+
+def is_implicit(function_parsed: expressions.Node) -> bool:
+    """Check whether a plotted function is an implicit curve, an equation or f(x, y) = 0, rather than y = f(x)."""
+    return isinstance(function_parsed, expressions.Equation) or "y" in function_parsed.free_symbols
+
+def compile_plot_function(function_parsed: expressions.Node) -> Callable[..., np.ndarray]:
+    """Compile a plotted function of x, or of x and y for an implicit curve."""
+    return compile_function(function_parsed, IMPLICIT_VARIABLES if is_implicit(function_parsed) else ("x",))
+
+def get_label(function_parsed: expressions.Node) -> str:
+    """Get the legend label of a plotted function."""
+    if is_implicit(function_parsed) and not isinstance(function_parsed, expressions.Equation):
+        return f"{function_parsed} = 0"
+    return str(function_parsed)
+
+def evaluate_function(function_compiled: Callable[[np.ndarray], np.ndarray], xmin: float, xmax: float, num_samples: int = DEFAULT_NUM_SAMPLES, sampling_mode: SamplingMode = SamplingMode.UNIFORM, cancelled: Event | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Evaluate a compiled function over evenly spaced or adaptively chosen x values."""
+    if num_samples < 2:
+        raise ValidationError("number of samples must be at least 2.")
+    evaluate = partial(evaluate_at, function_compiled)
+    if sampling_mode == SamplingMode.ADAPTIVE:
+        return sampling.adaptive_sample(evaluate, xmin, xmax, max_samples=num_samples)
+    return parallel.evaluate_chunked(evaluate, xmin, xmax, num_samples, cancelled=cancelled)
+
+def evaluate_at(function_compiled: Callable[..., np.ndarray], x_data: np.ndarray, *other_data: np.ndarray) -> np.ndarray:
+    """Evaluate a compiled function at the given x values, and y values for an implicit curve."""
+    try:
+        with np.errstate(all="ignore"):
+            y_values = function_compiled(x_data, *other_data)
+        return to_real_array(y_values, x_data.shape)
+    except (NameError, TypeError, ValueError, ZeroDivisionError) as error:
+        raise ValidationError("function can not be evaluated." + "-" + str(error))
+
+def evaluate_fused_at(fused_compiled: Callable[[np.ndarray], np.ndarray], x_data: np.ndarray) -> np.ndarray:
+    """Evaluate a fused kernel at the given x values, into one row per function with infinite values mapped to NaN."""
+    try:
+        with np.errstate(all="ignore"):
+            y_values = fused_compiled(x_data)
+            y_values[~np.isfinite(y_values)] = np.nan
+        return y_values
+    except (NameError, TypeError, ValueError, ZeroDivisionError) as error:
+        raise ValidationError("function can not be evaluated." + "-" + str(error))
+
+def to_real_array(values, shape: tuple[int, ...]) -> np.ndarray:
+    """Convert evaluated values to a float64 array, mapping non-real and infinite values to NaN."""
+    values = np.broadcast_to(np.asarray(values), shape)
+    if np.iscomplexobj(values):
+        values = np.where(values.imag == 0, values.real, np.nan)
+    real_array = np.array(values, dtype=np.float64)
+    real_array[~np.isfinite(real_array)] = np.nan
+    return real_array
+
+def get_xy_data(function_parsed: "expressions.Node | sympy.Expr", xmin: float, xmax: float, num_samples: int = DEFAULT_NUM_SAMPLES, sampling_mode: SamplingMode = SamplingMode.UNIFORM) -> tuple[np.ndarray, np.ndarray]:
     """Get the x and y data to plot."""
-    x = sympy.Symbol("x")
-    x_data = [xmin + (xmax - xmin) * i / 100 for i in range(101)]
-    y_data = [function_parsed.subs(x, xi).evalf() for xi in x_data]
-    return x_data, y_data
-
-
-def show_message(timeout_seconds: float, title: str, message: str, message_type: MessageType) -> None:
-    """Show a message to the user."""
-    user_message = message.split("-")[0]
-    logger.add(LOGGING_FILE_PATH)
-    if message_type == MessageType.ERROR:
-        logger.error(message)
-        CustomMessageBox.showWithTimeout(timeout_seconds=timeout_seconds, title=title, message=user_message, icon=QMessageBox.Warning)
-    elif message_type == MessageType.WARNING:
-        logger.warning(message)
-        CustomMessageBox.showWithTimeout(timeout_seconds=timeout_seconds, title=title, message=user_message, icon=QMessageBox.Warning)
-    elif message_type == MessageType.INFORMATION:
-        logger.info(message)
-        CustomMessageBox.showWithTimeout(timeout_seconds=timeout_seconds, title=title, message=user_message, icon=QMessageBox.Information)
+    function_compiled = compile_function(function_parsed)
+    return evaluate_function(function_compiled, xmin, xmax, num_samples, sampling_mode)
+
+
+def configure_logging() -> int:
+    """Route loguru to a single non-blocking file sink, configured once per process.
+
+    Timing spans are only logged from then on, so entry points that never configure
+    logging do not print them through the default stderr sink.
+    """
+    from loguru import logger
+    global logging_sink_id
+    with logging_lock:
+        if logging_sink_id is None:
+            logger.remove()
+            logging_sink_id = logger.add(LOGGING_FILE_PATH, enqueue=True)
+            instrumentation.attach_logger(logger)
+        return logging_sink_id
@@ -0,0 +1,166 @@
+from typing import Callable
+import numpy as np
+from matplotlib.lines import Line2D
+from utils import helpers
+
+COARSE_CELLS = 64
+REFINEMENT_LEVELS = 4
+# corner offsets of the four children of a cell, in half cell widths
+CHILD_OFFSETS = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+class Cells:
+    """Axis-aligned grid cells of one size, as arrays of their lower left corners and corner values."""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, width: float, height: float, corners: np.ndarray):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        # columns: lower left, lower right, upper left, upper right
+        self.corners = corners
+
+    def __len__(self) -> int:
+        return self.x.size
+
+    def select(self, mask: np.ndarray) -> "Cells":
+        return Cells(self.x[mask], self.y[mask], self.width, self.height, self.corners[mask])
+
+def get_crossing_mask(corners: np.ndarray) -> np.ndarray:
+    """Get which cells have defined corner values of both signs, so the curve crosses them."""
+    defined = np.isfinite(corners).all(axis=1)
+    positive = corners > 0
+    return defined & positive.any(axis=1) & ~positive.all(axis=1)
+
+def get_coarse_cells(kernel: Callable[..., np.ndarray], xmin: float, xmax: float, ymin: float, ymax: float, num_cells: int) -> Cells:
+    """Evaluate the function on a num_cells by num_cells grid in one vectorized call."""
+    x_grid, y_grid = np.meshgrid(np.linspace(xmin, xmax, num_cells + 1), np.linspace(ymin, ymax, num_cells + 1))
+    values = helpers.evaluate_at(kernel, x_grid, y_grid)
+    corners = np.stack([values[:-1, :-1], values[:-1, 1:], values[1:, :-1], values[1:, 1:]], axis=-1).reshape(-1, 4)
+    return Cells(x_grid[:-1, :-1].ravel(), y_grid[:-1, :-1].ravel(), (xmax - xmin) / num_cells, (ymax - ymin) / num_cells, corners)
+
+def refine(kernel: Callable[..., np.ndarray], cells: Cells) -> Cells:
+    """Split every cell into four, evaluating the five new points of all cells in one vectorized call."""
+    half_width, half_height = cells.width / 2, cells.height / 2
+    # the 3 by 3 points of a split cell, indexed [row, column]
+    points = np.empty((len(cells), 3, 3))
+    points[:, 0, 0], points[:, 0, 2], points[:, 2, 0], points[:, 2, 2] = cells.corners.T
+    new_points = ((0, 1), (1, 0), (1, 1), (1, 2), (2, 1))
+    x_new = np.concatenate([cells.x + column * half_width for _, column in new_points])
+    y_new = np.concatenate([cells.y + row * half_height for row, _ in new_points])
+    values = helpers.evaluate_at(kernel, x_new, y_new).reshape(len(new_points), len(cells))
+    for (row, column), value in zip(new_points, values):
+        points[:, row, column] = value
+    children = [
+        Cells(
+            cells.x + column * half_width,
+            cells.y + row * half_height,
+            half_width,
+            half_height,
+            np.stack([points[:, row, column], points[:, row, column + 1], points[:, row + 1, column], points[:, row + 1, column + 1]], axis=-1),
+        )
+        for column, row in CHILD_OFFSETS
+    ]
+    return Cells(
+        np.concatenate([child.x for child in children]),
+        np.concatenate([child.y for child in children]),
+        half_width,
+        half_height,
+        np.concatenate([child.corners for child in children]),
+    )
+
+def march_squares(cells: Cells) -> tuple[np.ndarray, np.ndarray]:
+    """Get the line segments where the curve crosses each cell, interpolating linearly along its edges.
+
+    Saddle cells, whose diagonal corners share a sign, are resolved with the mean of their corners.
+    Returns the segments, an array of shape (number of segments, 2, 2), and for each end of
+    each segment the smaller magnitude of the function at the two ends of its edge.
+    """
+    lower_left, lower_right, upper_left, upper_right = cells.corners.T
+    # edges in order: bottom, right, top, left, as (start value, end value, start point, direction)
+    edges = (
+        (lower_left, lower_right, (0, 0), (1, 0)),
+        (lower_right, upper_right, (1, 0), (0, 1)),
+        (upper_left, upper_right, (0, 1), (1, 0)),
+        (lower_left, upper_left, (0, 0), (0, 1)),
+    )
+    crossings = np.empty((len(cells), 4, 2))
+    crossed = np.empty((len(cells), 4), dtype=bool)
+    bounds = np.empty((len(cells), 4))
+    for index, (start, end, (x_start, y_start), (x_direction, y_direction)) in enumerate(edges):
+        crossed[:, index] = (start > 0) != (end > 0)
+        bounds[:, index] = np.minimum(np.abs(start), np.abs(end))
+        with np.errstate(all="ignore"):
+            fraction = np.where(crossed[:, index], start / (start - end), 0.5)
+        crossings[:, index, 0] = cells.x + (x_start + fraction * x_direction) * cells.width
+        crossings[:, index, 1] = cells.y + (y_start + fraction * y_direction) * cells.height
+    saddle = crossed.all(axis=1)
+    single = ~saddle
+    edge_order = np.argsort(~crossed[single], axis=1, kind="stable")[:, :2]
+    segments = [np.take_along_axis(crossings[single], edge_order[:, :, None], axis=1)]
+    segment_bounds = [np.take_along_axis(bounds[single], edge_order, axis=1)]
+    if saddle.any():
+        saddle_crossings, saddle_bounds = crossings[saddle], bounds[saddle]
+        center_positive = cells.corners[saddle].mean(axis=1) > 0
+        # cut off the lower left and upper right corners when their sign differs from the center
+        cut_diagonal = ((lower_left[saddle] > 0) != center_positive)[:, None, None]
+        for cut_edges, kept_edges in (([3, 0], [0, 1]), ([1, 2], [2, 3])):
+            segments.append(np.where(cut_diagonal, saddle_crossings[:, cut_edges], saddle_crossings[:, kept_edges]))
+            segment_bounds.append(np.where(cut_diagonal[:, :, 0], saddle_bounds[:, cut_edges], saddle_bounds[:, kept_edges]))
+    return np.concatenate(segments), np.concatenate(segment_bounds)
+
+def drop_poles(kernel: Callable[..., np.ndarray], segments: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Drop segments where the sign change comes from a pole rather than a root.
+
+    Near a root the function shrinks from both ends of an edge towards the interpolated
+    crossing, near a pole it is larger there than at one of the ends.
+    """
+    values = helpers.evaluate_at(kernel, segments[:, :, 0], segments[:, :, 1])
+    return segments[(np.abs(values) <= bounds).all(axis=1)]
+
+def contour(
+    kernel: Callable[..., np.ndarray],
+    xmin: float,
+    xmax: float,
+    ymin: float,
+    ymax: float,
+    num_cells: int = COARSE_CELLS,
+    levels: int = REFINEMENT_LEVELS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Trace the curve f(x, y) = 0 over a rectangle as line segments separated by NaN.
+
+    The function is evaluated on a coarse grid, then only the cells where it changes sign are
+    split into four, levels times, so the curve is as sharp as a grid 2**levels times finer at
+    a small fraction of its evaluations. The crossed leaf cells are contoured with marching squares.
+    """
+    cells = get_coarse_cells(kernel, xmin, xmax, ymin, ymax, num_cells)
+    cells = cells.select(get_crossing_mask(cells.corners))
+    for _ in range(levels):
+        if not len(cells):
+            break
+        cells = refine(kernel, cells)
+        cells = cells.select(get_crossing_mask(cells.corners))
+    if not len(cells):
+        return np.empty(0), np.empty(0)
+    segments = drop_poles(kernel, *march_squares(cells))
+    separators = np.full((len(segments), 1), np.nan)
+    return np.hstack([segments[:, :, 0], separators]).ravel(), np.hstack([segments[:, :, 1], separators]).ravel()
+
+class ImplicitCurve:
+    """A plotted implicit curve f(x, y) = 0, traced again whenever the view changes."""
+    __slots__ = ("line", "kernel", "function_string", "xmin", "xmax", "home_x_data", "home_y_data")
+
+    def __init__(self, line: Line2D, kernel: Callable[..., np.ndarray], x_data: np.ndarray, y_data: np.ndarray, xmin: float, xmax: float, function_string: str = ""):
+        self.line = line
+        self.kernel = kernel
+        self.function_string = function_string
+        self.xmin, self.xmax = xmin, xmax
+        self.home_x_data, self.home_y_data = x_data, y_data
+        self.reset()
+
+    def reset(self) -> None:
+        """Show the curve traced over the range it was plotted with again, without evaluating the function."""
+        self.line.set_data(self.home_x_data, self.home_y_data)
+
+    def set_view(self, view_xmin: float, view_xmax: float, view_ymin: float, view_ymax: float) -> None:
+        """Trace the curve again over the visible rectangle."""
+        self.line.set_data(*contour(self.kernel, view_xmin, view_xmax, view_ymin, view_ymax))
@@ -0,0 +1,101 @@
+import json
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+import numpy as np
+
+STAGES = ("parse", "compile", "evaluate", "draw", "export")
+HISTOGRAM_BUCKETS_MILLISECONDS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+RECENT_SPANS = 512
+
+class Instrumentation:
+    """Thread-safe timing spans per pipeline stage, with recent samples and latency histograms."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._logger = None
+        # spans recorded before logging is configured, logged once it is
+        self._pending_messages = deque(maxlen=RECENT_SPANS)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every recorded span."""
+        with self._lock:
+            self._recent = {stage: deque(maxlen=RECENT_SPANS) for stage in STAGES}
+            self._bucket_counts = {stage: [0] * len(HISTOGRAM_BUCKETS_MILLISECONDS) for stage in STAGES}
+            self._counts = {stage: 0 for stage in STAGES}
+            self._totals = {stage: 0.0 for stage in STAGES}
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time the body of a with block as one span of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the duration of one span of a stage."""
+        milliseconds = seconds * 1000
+        bucket = next(index for index, bound in enumerate(HISTOGRAM_BUCKETS_MILLISECONDS) if milliseconds <= bound)
+        message = f"{stage} took {milliseconds:.2f} ms"
+        with self._lock:
+            self._recent[stage].append(milliseconds)
+            self._bucket_counts[stage][bucket] += 1
+            self._counts[stage] += 1
+            self._totals[stage] += milliseconds
+            logger = self._logger
+            if logger is None:
+                self._pending_messages.append(message)
+        if logger is not None:
+            logger.debug(message)
+
+    def attach_logger(self, logger) -> None:
+        """Log every later span with a configured logger, and the spans recorded before it was attached."""
+        with self._lock:
+            self._logger = logger
+            pending_messages = list(self._pending_messages)
+            self._pending_messages.clear()
+        for message in pending_messages:
+            logger.debug(message)
+
+    def last(self, stage: str) -> float | None:
+        """Get the duration in milliseconds of the latest span of a stage."""
+        with self._lock:
+            recent = self._recent[stage]
+            return recent[-1] if recent else None
+
+    def summary(self) -> str:
+        """Get the latest duration of every stage that has run, for a status area."""
+        timings = [(stage, self.last(stage)) for stage in STAGES]
+        return " | ".join(f"{stage} {milliseconds:.1f} ms" for stage, milliseconds in timings if milliseconds is not None)
+
+    def histograms(self) -> dict:
+        """Get the count, mean, percentiles of recent spans and the latency histogram of every stage."""
+        with self._lock:
+            histograms = {}
+            for stage in STAGES:
+                recent = np.array(self._recent[stage])
+                count = self._counts[stage]
+                histograms[stage] = {
+                    "count": count,
+                    "mean_ms": self._totals[stage] / count if count else None,
+                    "p50_ms": float(np.percentile(recent, 50)) if recent.size else None,
+                    "p95_ms": float(np.percentile(recent, 95)) if recent.size else None,
+                    "max_ms": float(recent.max()) if recent.size else None,
+                    "buckets": [
+                        {"le_ms": "inf" if math.isinf(bound) else bound, "count": bucket_count}
+                        for bound, bucket_count in zip(HISTOGRAM_BUCKETS_MILLISECONDS, self._bucket_counts[stage])
+                    ],
+                }
+            return histograms
+
+    def dump(self, file_name: str) -> None:
+        """Write the per-stage histograms to a JSON file."""
+        with open(file_name, "w") as histograms_file:
+            json.dump(self.histograms(), histograms_file, indent=2)
+
+instrumentation = Instrumentation()
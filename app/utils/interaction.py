@@ -0,0 +1,94 @@
+from matplotlib.axes import Axes
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.lines import Line2D
+from matplotlib.transforms import Affine2D, blended_transform_factory
+
+CROSSHAIR_STYLE = {"color": "gray", "linewidth": 0.8, "linestyle": "--"}
+
+class InteractionLayer:
+    """Blit the moving artists (a crosshair and the lines being panned) over a cached background.
+
+    The static figure is rendered once per full draw and copied on every draw_event, so a
+    mouse move only restores that copy, redraws the animated artists and blits the axes box.
+    """
+
+    def __init__(self, canvas: FigureCanvasBase):
+        self.canvas = canvas
+        self.ax = None
+        self.background = None
+        self.crosshair = []
+        self.panned_lines = []
+        self.pan_origin = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    @property
+    def panning(self) -> bool:
+        return self.pan_origin is not None
+
+    def attach(self, ax: Axes) -> None:
+        """Create the crosshair for new axes."""
+        self.ax = ax
+        self.pan_origin = None
+        self.panned_lines = []
+        vertical = Line2D([0, 0], [0, 1], transform=blended_transform_factory(ax.transData, ax.transAxes), **CROSSHAIR_STYLE)
+        horizontal = Line2D([0, 1], [0, 0], transform=blended_transform_factory(ax.transAxes, ax.transData), **CROSSHAIR_STYLE)
+        self.crosshair = [vertical, horizontal]
+        for line in self.crosshair:
+            line.set_animated(True)
+            line.set_visible(False)
+            line.set_clip_box(ax.bbox)
+            ax.figure.add_artist(line)
+
+    def on_draw(self, event) -> None:
+        """Cache the freshly drawn background and draw the animated artists on top of it."""
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_animated()
+
+    def draw_animated(self) -> None:
+        for line in self.panned_lines + self.crosshair:
+            self.canvas.figure.draw_artist(line)
+
+    def blit(self) -> None:
+        """Restore the cached background, redraw the animated artists and blit the axes."""
+        if self.background is None or self.ax is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.ax.bbox)
+
+    def update_crosshair(self, x: float, y: float) -> None:
+        """Move the crosshair to a point in data coordinates."""
+        if not self.crosshair:
+            return
+        vertical, horizontal = self.crosshair
+        vertical.set_xdata([x, x])
+        horizontal.set_ydata([y, y])
+        vertical.set_visible(True)
+        horizontal.set_visible(True)
+        self.blit()
+
+    def start_pan(self, lines: list[Line2D], x: float, y: float) -> None:
+        """Take lines out of the background so they can be dragged by blitting."""
+        self.pan_origin = self.ax.transData.transform((x, y))
+        self.panned_lines = list(lines)
+        for line in self.panned_lines:
+            line.set_animated(True)
+        self.canvas.draw()
+
+    def update_pan(self, x: float, y: float) -> None:
+        """Offset the panned lines by the distance dragged since start_pan."""
+        if not self.panning:
+            return
+        dx, dy = self.ax.transData.transform((x, y)) - self.pan_origin
+        offset = self.ax.transData + Affine2D().translate(dx, dy)
+        for line in self.panned_lines:
+            line.set_transform(offset)
+        self.blit()
+
+    def end_pan(self) -> None:
+        """Put the panned lines back in place and into the background."""
+        for line in self.panned_lines:
+            line.set_transform(self.ax.transData)
+            line.set_animated(False)
+        self.panned_lines = []
+        self.pan_origin = None
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+import numpy as np
+from typing import Callable
+from utils.exceptions import EvaluationCancelled
+
+PARALLEL_THRESHOLD = 1_000_000
+DEFAULT_CHUNK_SIZE = 262_144
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1
+
+def evaluate_chunked(
+    evaluate: Callable[[np.ndarray], np.ndarray],
+    xmin: float,
+    xmax: float,
+    num_samples: int,
+    chunk_size: int | None = None,
+    max_workers: int | None = None,
+    parallel_threshold: int | None = None,
+    cancelled: Event | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Evaluate a function over evenly spaced x values, splitting large ranges into chunks.
+
+    The x and y arrays are allocated once and each chunk is computed and written into its
+    slice of them by a worker thread. NumPy releases the GIL inside its ufunc loops, so the
+    chunks run in parallel without pickling data between processes or concatenating results.
+    Jobs below parallel_threshold samples, or with a single worker, are evaluated serially.
+    The module defaults are read at call time so they can be tuned globally.
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    parallel_threshold = PARALLEL_THRESHOLD if parallel_threshold is None else parallel_threshold
+    x_data = np.empty(num_samples, dtype=np.float64)
+    y_data = np.empty(num_samples, dtype=np.float64)
+    step = get_step(xmin, xmax, num_samples)
+
+    def fill_chunk(start: int) -> None:
+        if cancelled is not None and cancelled.is_set():
+            raise EvaluationCancelled()
+        stop = min(start + chunk_size, num_samples)
+        x_chunk = fill_x_chunk(x_data[start:stop], start, xmin, xmax, num_samples, step)
+        y_data[start:stop] = evaluate(x_chunk)
+
+    chunk_starts = range(0, num_samples, chunk_size)
+    if num_samples < parallel_threshold or max_workers <= 1 or len(chunk_starts) == 1:
+        for start in chunk_starts:
+            fill_chunk(start)
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunk_starts))) as executor:
+            for future in [executor.submit(fill_chunk, start) for start in chunk_starts]:
+                future.result()
+    return x_data, y_data
+
+def get_step(xmin: float, xmax: float, num_samples: int) -> float:
+    """Get the spacing of num_samples evenly spaced x values from xmin to xmax."""
+    return (xmax - xmin) / (num_samples - 1)
+
+def fill_x_chunk(x_chunk: np.ndarray, start: int, xmin: float, xmax: float, num_samples: int, step: float) -> np.ndarray:
+    """Write the evenly spaced x values from index start into x_chunk, ending exactly at xmax."""
+    stop = start + x_chunk.size
+    np.multiply(np.arange(start, stop, dtype=np.float64), step, out=x_chunk)
+    x_chunk += xmin
+    if stop == num_samples:
+        x_chunk[-1] = xmax
+    return x_chunk
+
+def iter_x_chunks(xmin: float, xmax: float, num_samples: int, chunk_size: int | None = None, cancelled: Event | None = None):
+    """Yield (start, x_chunk) pairs covering num_samples evenly spaced x values, chunk by chunk.
+
+    Every chunk is written into the same buffer, so memory stays at one chunk however many
+    samples there are; a caller must copy a chunk it wants to keep past the next iteration.
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    step = get_step(xmin, xmax, num_samples)
+    buffer = np.empty(min(chunk_size, num_samples), dtype=np.float64)
+    for start in range(0, num_samples, chunk_size):
+        if cancelled is not None and cancelled.is_set():
+            raise EvaluationCancelled()
+        stop = min(start + chunk_size, num_samples)
+        yield start, fill_x_chunk(buffer[:stop - start], start, xmin, xmax, num_samples, step)
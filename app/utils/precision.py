@@ -0,0 +1,117 @@
+import math
+from collections import OrderedDict
+import numpy as np
+from utils import expressions
+
+RESOLUTION_ULPS = 4
+ROUGHNESS_TOLERANCE = 1.0
+CANCELLATION_TOLERANCE = 1e-3
+NUM_PROBES = 9
+MIN_PRECISION_BITS = 106
+MAX_PRECISION_BITS = 1024
+SAMPLES_PER_PIXEL = 2
+MAX_CACHED_SAMPLES = 100_000
+
+def is_resolution_limited(view_xmin: float, view_xmax: float, num_samples: int) -> bool:
+    """Check whether num_samples evenly spaced x values over the view are closer than float64 can tell apart."""
+    spacing = np.spacing(max(abs(view_xmin), abs(view_xmax)))
+    return (view_xmax - view_xmin) / max(num_samples - 1, 1) < RESOLUTION_ULPS * spacing
+
+def get_distinct_samples(view_xmin: float, view_xmax: float, num_samples: int) -> np.ndarray:
+    """Get up to num_samples evenly spaced x values over the view, without the duplicates float64 rounding makes."""
+    return np.unique(np.linspace(view_xmin, view_xmax, num_samples))
+
+def get_roughness(y_data: np.ndarray) -> float:
+    """Measure how noisy samples look, as their mean third difference per sample relative to their range.
+
+    Smooth curves score well below one at any zoom, staircases score a few units and rounding
+    noise scores about the number of samples.
+    """
+    finite = y_data[np.isfinite(y_data)]
+    if finite.size < 4:
+        return 0.0
+    y_range = finite.max() - finite.min()
+    if y_range == 0:
+        return 0.0
+    return float(finite.size * np.mean(np.abs(np.diff(finite, 3))) / y_range)
+
+def is_flat(y_data: np.ndarray) -> bool:
+    """Check whether the defined samples all have one value, as when cancellation wipes out every digit."""
+    finite = y_data[np.isfinite(y_data)]
+    return finite.size > 0 and bool(finite.min() == finite.max())
+
+class HighPrecisionEvaluator:
+    """Evaluate a tree with mpmath at the precision a view needs, caching the values by x.
+
+    Float64 evaluation stays the default; a curve only asks for this when its visible samples
+    look noisy and a few probes show float64 disagreeing with a higher precision evaluation.
+    """
+
+    def __init__(self, tree: expressions.Node, max_cached_samples: int = MAX_CACHED_SAMPLES):
+        self.function = expressions.compile_mpmath(tree)
+        self.max_cached_samples = max_cached_samples
+        self.cache: OrderedDict[float, tuple[int, float]] = OrderedDict()
+        self.precision_bits = MIN_PRECISION_BITS
+
+    def evaluate(self, x_data: np.ndarray, precision_bits: int | None = None) -> np.ndarray:
+        """Evaluate the tree at every x, reusing cached values computed at least as precisely."""
+        precision_bits = precision_bits or self.precision_bits
+        y_data = np.empty(x_data.size)
+        for index, x in enumerate(x_data.tolist()):
+            cached = self.cache.get(x)
+            if cached and cached[0] >= precision_bits:
+                self.cache.move_to_end(x)
+                y_data[index] = cached[1]
+                continue
+            y_data[index] = self.evaluate_at(x, precision_bits)
+            self.cache[x] = (precision_bits, y_data[index])
+            if len(self.cache) > self.max_cached_samples:
+                self.cache.popitem(last=False)
+        return y_data
+
+    def evaluate_at(self, x: float, precision_bits: int) -> float:
+        import mpmath
+        with mpmath.workprec(precision_bits):
+            try:
+                value = self.function(mpmath.mpf(x))
+            except (ZeroDivisionError, ValueError, OverflowError):
+                return math.nan
+        if isinstance(value, mpmath.mpc):
+            return float(value.real) if value.imag == 0 else math.nan
+        return float(value)
+
+    def has_cancellation(self, x_data: np.ndarray, y_data: np.ndarray) -> bool:
+        """Check whether float64 samples disagree with the tree evaluated precisely at a few probes.
+
+        Partial cancellation shows up as noise, so smooth samples are trusted without probing.
+        Complete cancellation leaves flat samples, such as (1-cos(x))/x^2 evaluating to 0 for
+        tiny x, so flat samples are always probed.
+        """
+        if get_roughness(y_data) < ROUGHNESS_TOLERANCE and not is_flat(y_data):
+            return False
+        probes = np.linspace(0, x_data.size - 1, NUM_PROBES).astype(int)
+        precise = self.evaluate(x_data[probes], MIN_PRECISION_BITS)
+        return not self.agrees(y_data[probes], precise, y_data)
+
+    def escalate(self, x_data: np.ndarray) -> int:
+        """Double the precision until a few probes agree with twice that precision, up to MAX_PRECISION_BITS."""
+        span = x_data[-1] - x_data[0]
+        magnitude = max(abs(x_data[0]), abs(x_data[-1]))
+        zoom_bits = math.ceil(math.log2(magnitude / span)) if span > 0 and magnitude > span else 0
+        precision_bits = max(MIN_PRECISION_BITS, 53 + zoom_bits)
+        probes = x_data[np.linspace(0, x_data.size - 1, NUM_PROBES).astype(int)]
+        while precision_bits < MAX_PRECISION_BITS:
+            values = self.evaluate(probes, precision_bits)
+            if self.agrees(values, self.evaluate(probes, 2 * precision_bits), values):
+                break
+            precision_bits *= 2
+        self.precision_bits = min(precision_bits, MAX_PRECISION_BITS)
+        return self.precision_bits
+
+    def agrees(self, values: np.ndarray, precise: np.ndarray, y_data: np.ndarray) -> bool:
+        finite = np.isfinite(values) & np.isfinite(precise)
+        if not finite.any():
+            return True
+        all_finite = np.concatenate([y_data[np.isfinite(y_data)], precise[finite]])
+        scale = all_finite.max() - all_finite.min() or np.abs(precise[finite]).max() or 1.0
+        return bool(np.all(np.abs(values[finite] - precise[finite]) <= CANCELLATION_TOLERANCE * scale))
@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Callable
+
+DEFAULT_INITIAL_SAMPLES = 65
+DEFAULT_TOLERANCE_PIXELS = 0.25
+DEFAULT_MIN_WIDTH_PIXELS = 0.05
+DEFAULT_VIEWPORT_PIXELS = (800, 420)
+
+def adaptive_sample(
+    evaluate: Callable[[np.ndarray], np.ndarray],
+    xmin: float,
+    xmax: float,
+    max_samples: int,
+    initial_samples: int = DEFAULT_INITIAL_SAMPLES,
+    tolerance_pixels: float = DEFAULT_TOLERANCE_PIXELS,
+    viewport_pixels: tuple[int, int] = DEFAULT_VIEWPORT_PIXELS,
+    min_width_pixels: float = DEFAULT_MIN_WIDTH_PIXELS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sample a function on a coarse grid and subdivide intervals that are not linear in pixel space.
+
+    Every pass evaluates the midpoints of the candidate intervals in one vectorized call.
+    Intervals whose midpoint is further than tolerance_pixels from the chord, or that border
+    an undefined value, are split in two and become the next candidates. Sampling stops when
+    no interval needs refinement, intervals get narrower than min_width_pixels, or the
+    max_samples budget is spent, in which case the intervals with the largest deviation win.
+    """
+    initial_samples = max(2, min(initial_samples, max_samples))
+    x_coarse = np.linspace(xmin, xmax, initial_samples)
+    y_coarse = evaluate(x_coarse)
+    x_scale, y_scale = get_pixel_scales(y_coarse, xmin, xmax, viewport_pixels)
+
+    x_parts, y_parts = [x_coarse], [y_coarse]
+    left_x, right_x = x_coarse[:-1], x_coarse[1:]
+    left_y, right_y = y_coarse[:-1], y_coarse[1:]
+    priority = np.full(left_x.size, np.inf)
+    budget = max_samples - initial_samples
+    while left_x.size and budget > 0:
+        if left_x.size > budget:
+            keep = np.argsort(priority)[::-1][:budget]
+            left_x, right_x, left_y, right_y = left_x[keep], right_x[keep], left_y[keep], right_y[keep]
+        mid_x = (left_x + right_x) / 2
+        mid_y = evaluate(mid_x)
+        budget -= mid_x.size
+        x_parts.append(mid_x)
+        y_parts.append(mid_y)
+
+        deviation = get_deviation_pixels(left_y, mid_y, right_y, y_scale)
+        wide_enough = (right_x - left_x) * x_scale > 2 * min_width_pixels
+        refine = (deviation > tolerance_pixels) & wide_enough
+        priority = np.concatenate([deviation[refine], deviation[refine]])
+        left_x, right_x = np.concatenate([left_x[refine], mid_x[refine]]), np.concatenate([mid_x[refine], right_x[refine]])
+        left_y, right_y = np.concatenate([left_y[refine], mid_y[refine]]), np.concatenate([mid_y[refine], right_y[refine]])
+
+    x_data = np.concatenate(x_parts)
+    y_data = np.concatenate(y_parts)
+    order = np.argsort(x_data, kind="stable")
+    return x_data[order], y_data[order]
+
+def get_pixel_scales(y_data: np.ndarray, xmin: float, xmax: float, viewport_pixels: tuple[int, int]) -> tuple[float, float]:
+    """Get the pixels per data unit along x and y for the sampled range."""
+    width_pixels, height_pixels = viewport_pixels
+    x_scale = width_pixels / (xmax - xmin)
+    y_finite = y_data[np.isfinite(y_data)]
+    y_span = float(y_finite.max() - y_finite.min()) if y_finite.size else 0.0
+    y_scale = height_pixels / y_span if y_span > 0 else float(height_pixels)
+    return x_scale, y_scale
+
+def get_deviation_pixels(left_y: np.ndarray, mid_y: np.ndarray, right_y: np.ndarray, y_scale: float) -> np.ndarray:
+    """Get the pixel distance between each midpoint and the chord of its interval.
+
+    Intervals with a mix of defined and undefined values get an infinite deviation so the
+    edges of the domain are located, intervals that are undefined everywhere get zero.
+    """
+    with np.errstate(invalid="ignore"):
+        deviation = np.abs(mid_y - (left_y + right_y) / 2) * y_scale
+    undefined = np.isnan(left_y).astype(int) + np.isnan(mid_y) + np.isnan(right_y)
+    deviation[(undefined > 0) & (undefined < 3)] = np.inf
+    deviation[undefined == 3] = 0.0
+    return deviation
@@ -0,0 +1,73 @@
+import json
+import os
+import numpy as np
+from utils import expressions
+from utils.exceptions import ValidationError
+
+SESSION_VERSION = 1
+EXPRESSION_STORE_FILE_NAME = "expressions.json"
+MAX_STORED_EXPRESSIONS = 1024
+EXPRESSION_STORE_VERSION = f"{expressions.GRAMMAR_VERSION}/numpy-{np.__version__}"
+
+def write_json_atomically(file_name: str, data: dict) -> None:
+    """Write data as JSON to a temporary file and move it over file_name, so a crash never leaves half a file."""
+    directory = os.path.dirname(file_name)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_file_name = file_name + ".tmp"
+    with open(temporary_file_name, "w") as json_file:
+        json.dump(data, json_file, indent=2)
+    os.replace(temporary_file_name, file_name)
+
+def get_expression_store_path(session_file_name: str) -> str:
+    """Get the path of the expression store kept next to a session file."""
+    return os.path.join(os.path.dirname(session_file_name), EXPRESSION_STORE_FILE_NAME)
+
+def save_session(file_name: str, state: dict) -> None:
+    """Save the state of a plotting session."""
+    write_json_atomically(file_name, {"version": SESSION_VERSION, **state})
+
+def load_session(file_name: str) -> dict:
+    """Load the state of a plotting session saved by save_session."""
+    with open(file_name) as json_file:
+        try:
+            state = json.load(json_file)
+        except json.JSONDecodeError as error:
+            raise ValidationError("The session file is not valid." + "-" + str(error))
+    if not isinstance(state, dict) or state.get("version") != SESSION_VERSION:
+        raise ValidationError("The session file is not supported." + "-" + file_name)
+    return state
+
+class ExpressionStore:
+    """Parsed expression trees kept on disk as JSON, keyed by normalized text, for warm starts.
+
+    The file records the grammar and NumPy versions it was written with and is ignored when
+    they change, so a stale tree is never compiled against a different library.
+    """
+
+    def __init__(self, file_name: str, version: str = EXPRESSION_STORE_VERSION):
+        self.file_name = file_name
+        self.version = version
+
+    def load(self) -> dict[str, expressions.Node]:
+        """Get the stored trees, or none if the file is missing, unreadable or from another version."""
+        try:
+            with open(self.file_name) as json_file:
+                data = json.load(json_file)
+            if data.get("version") != self.version:
+                return {}
+            return {key: expressions.from_data(tree_data) for key, tree_data in data["expressions"].items()}
+        except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+            return {}
+
+    def save(self, trees: dict[str, expressions.Node]) -> None:
+        """Store trees, merged with the ones already on disk, keeping the MAX_STORED_EXPRESSIONS newest."""
+        stored_trees = self.load()
+        for key in trees:
+            stored_trees.pop(key, None)
+        stored_trees.update(trees)
+        stored_trees = dict(list(stored_trees.items())[-MAX_STORED_EXPRESSIONS:])
+        write_json_atomically(self.file_name, {
+            "version": self.version,
+            "expressions": {key: expressions.to_data(tree) for key, tree in stored_trees.items()},
+        })
@@ -0,0 +1,53 @@
+import time
+from threading import Thread
+from typing import Callable
+from PySide6.QtCore import QEvent, QObject, QTimer
+from PySide6.QtWidgets import QWidget
+
+class StartupTimer:
+    """Startup milestones in milliseconds since a start time taken before the heavy imports."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        """Record that a milestone was reached now."""
+        self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def report(self) -> str:
+        """Get one line per milestone, for the startup timing mode."""
+        return "\n".join(f"{name:<20} {milliseconds:>9.1f} ms" for name, milliseconds in self.marks.items())
+
+class FirstPaintWatcher(QObject):
+    """Call back once, right after a widget is painted for the first time."""
+
+    def __init__(self, widget: QWidget, callback: Callable[[], None]):
+        super().__init__(widget)
+        self.callback = callback
+        self.painted = False
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Paint and not self.painted:
+            self.painted = True
+            QTimer.singleShot(0, self.callback)
+        return False
+
+def warm_up() -> None:
+    """Load what the first plot and the first symbolic operation need, ahead of time."""
+    from utils import expressions, helpers
+    # the spans recorded while the window first painted are logged once the file sink exists
+    helpers.configure_logging()
+    helpers.evaluate_function(helpers.get_cached_expression("sin(x)").kernel, 0, 1)
+    expressions.to_sympy(expressions.parse_expression("x"))
+
+def start_warm_up(callback: Callable[[], None] | None = None) -> Thread:
+    """Run warm_up in a daemon thread, then call callback from that thread."""
+    def run():
+        warm_up()
+        if callback:
+            callback()
+    thread = Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
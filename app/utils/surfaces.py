@@ -0,0 +1,155 @@
+import math
+from collections import OrderedDict
+from typing import Callable
+import numpy as np
+from matplotlib.axes import Axes
+from utils import helpers
+from utils.enums import SurfaceStyle
+
+PIXELS_PER_CELL = 4
+CONTOUR_LEVELS = 12
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_LEVEL_GAP = 16
+# meshes kept per cache, bounding the meshes each new window is assembled from
+MAX_CACHED_MESHES = 64
+
+def get_level(span: float, num_cells: int) -> int:
+    """Get the power of two grid step that covers span in at most num_cells cells."""
+    return math.ceil(math.log2(span / max(num_cells, 1)))
+
+def get_index_range(low: float, high: float, level: int) -> tuple[int, int]:
+    """Get the first and last index of the grid points at multiples of 2**level that cover [low, high]."""
+    step = math.ldexp(1.0, level)
+    return math.floor(low / step), math.ceil(high / step)
+
+def get_source_indices(indices: np.ndarray, level: int, cached_start: int, cached_level: int, cached_size: int) -> np.ndarray:
+    """Map grid indices at level to the indices of the same points in a cached mesh at cached_level, or -1."""
+    if level >= cached_level:
+        source_indices = indices * 2 ** (level - cached_level) - cached_start
+    else:
+        factor = 2 ** (cached_level - level)
+        source_indices = np.where(indices % factor == 0, indices // factor - cached_start, -1)
+    return np.where((source_indices >= 0) & (source_indices < cached_size), source_indices, -1)
+
+class Mesh:
+    """Values of a function of x and y at the grid points i * 2**level_x, j * 2**level_y."""
+
+    def __init__(self, level_x: int, level_y: int, start_x: int, start_y: int, values: np.ndarray):
+        self.level_x = level_x
+        self.level_y = level_y
+        self.start_x = start_x
+        self.start_y = start_y
+        self.values = values
+
+    @property
+    def x_values(self) -> np.ndarray:
+        return np.ldexp(np.arange(self.start_x, self.start_x + self.values.shape[1], dtype=np.float64), self.level_x)
+
+    @property
+    def y_values(self) -> np.ndarray:
+        return np.ldexp(np.arange(self.start_y, self.start_y + self.values.shape[0], dtype=np.float64), self.level_y)
+
+class MeshCache:
+    """Meshes of evaluated functions keyed by expression, grid levels and index window, least recently used evicted first.
+
+    Grid points are multiples of power of two steps, so a panned or zoomed window lands on
+    points the cached meshes of the same expression already hold, and only the rest of the
+    new mesh is evaluated. Revisiting a window returns its cached mesh as is.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, max_meshes: int = MAX_CACHED_MESHES):
+        self.max_bytes = max_bytes
+        self.max_meshes = max_meshes
+        self.evaluated_points = 0
+        self._meshes: OrderedDict[tuple[str, int, int, int, int, int, int], Mesh] = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._meshes)
+
+    def get_mesh(self, key: str, kernel: Callable[..., np.ndarray], xmin: float, xmax: float, ymin: float, ymax: float, num_x: int, num_y: int) -> Mesh:
+        """Get the mesh of a function over a window at about num_x by num_y cells, reusing cached points."""
+        level_x, level_y = get_level(xmax - xmin, num_x), get_level(ymax - ymin, num_y)
+        start_x, stop_x = get_index_range(xmin, xmax, level_x)
+        start_y, stop_y = get_index_range(ymin, ymax, level_y)
+        mesh_key = (key, level_x, level_y, start_x, start_y, stop_x, stop_y)
+        if mesh_key in self._meshes:
+            self._meshes.move_to_end(mesh_key)
+            return self._meshes[mesh_key]
+        x_indices, y_indices = np.arange(start_x, stop_x + 1), np.arange(start_y, stop_y + 1)
+        values = np.full((y_indices.size, x_indices.size), np.nan)
+        covered = np.zeros(values.shape, dtype=bool)
+        for cached_key, cached in self._meshes.items():
+            if cached_key[0] != key or max(abs(cached.level_x - level_x), abs(cached.level_y - level_y)) > MAX_LEVEL_GAP:
+                continue
+            source_x = get_source_indices(x_indices, level_x, cached.start_x, cached.level_x, cached.values.shape[1])
+            source_y = get_source_indices(y_indices, level_y, cached.start_y, cached.level_y, cached.values.shape[0])
+            target = np.ix_(source_y >= 0, source_x >= 0)
+            values[target] = cached.values[np.ix_(source_y[source_y >= 0], source_x[source_x >= 0])]
+            covered[target] = True
+        mesh = Mesh(level_x, level_y, start_x, start_y, values)
+        if not covered.all():
+            x_grid, y_grid = np.meshgrid(mesh.x_values, mesh.y_values)
+            values[~covered] = helpers.evaluate_at(kernel, x_grid[~covered], y_grid[~covered])
+            self.evaluated_points += np.count_nonzero(~covered)
+        self.put(mesh_key, mesh)
+        return mesh
+
+    def put(self, key: tuple[str, int, int, int, int, int, int], mesh: Mesh) -> None:
+        if key in self._meshes:
+            self._nbytes -= self._meshes[key].values.nbytes
+        self._meshes[key] = mesh
+        self._meshes.move_to_end(key)
+        self._nbytes += mesh.values.nbytes
+        while len(self._meshes) > 1 and (self._nbytes > self.max_bytes or len(self._meshes) > self.max_meshes):
+            _, evicted = self._meshes.popitem(last=False)
+            self._nbytes -= evicted.values.nbytes
+
+    def clear(self) -> None:
+        self._meshes.clear()
+        self._nbytes = 0
+        self.evaluated_points = 0
+
+class Surface:
+    """A function z = f(x, y) drawn as a heatmap or contour plot, evaluated again for every view at the canvas resolution."""
+
+    def __init__(self, ax: Axes, kernel: Callable[..., np.ndarray], function_string: str, style: SurfaceStyle, xmin: float, xmax: float, mesh_cache: MeshCache):
+        self.ax = ax
+        self.kernel = kernel
+        self.function_string = function_string
+        self.style = style
+        self.xmin, self.xmax = xmin, xmax
+        self.mesh_cache = mesh_cache
+        self.artist = None
+
+    def set_view(self, view_xmin: float, view_xmax: float, view_ymin: float, view_ymax: float, width_pixels: float, height_pixels: float) -> None:
+        """Draw the function over the visible window with one mesh cell per PIXELS_PER_CELL pixels."""
+        num_x, num_y = math.ceil(width_pixels / PIXELS_PER_CELL), math.ceil(height_pixels / PIXELS_PER_CELL)
+        mesh = self.mesh_cache.get_mesh(self.function_string, self.kernel, view_xmin, view_xmax, view_ymin, view_ymax, num_x, num_y)
+        x_values, y_values = mesh.x_values, mesh.y_values
+        if self.style == SurfaceStyle.HEATMAP:
+            half_x, half_y = math.ldexp(0.5, mesh.level_x), math.ldexp(0.5, mesh.level_y)
+            extent = (x_values[0] - half_x, x_values[-1] + half_x, y_values[0] - half_y, y_values[-1] + half_y)
+            if self.artist is None:
+                self.artist = self.ax.imshow(mesh.values, origin="lower", extent=extent, aspect="auto", interpolation="nearest", zorder=0)
+            else:
+                self.artist.set_data(mesh.values)
+                self.artist.set_extent(extent)
+                self.artist.autoscale()
+            return
+        self.remove()
+        if np.isfinite(mesh.values).any() and np.nanmin(mesh.values) < np.nanmax(mesh.values):
+            self.artist = self.ax.contour(x_values, y_values, mesh.values, levels=CONTOUR_LEVELS, zorder=0)
+
+    def reset(self, width_pixels: float, height_pixels: float) -> None:
+        """Draw the function over the range it was plotted with again."""
+        self.set_view(self.xmin, self.xmax, self.xmin, self.xmax, width_pixels, height_pixels)
+
+    def remove(self) -> None:
+        """Remove the heatmap or contour lines from the axes."""
+        if self.artist is None:
+            return
+        # a matplotlib 3.6 contour set is not an artist itself, only its line collections are
+        for artist in getattr(self.artist, "collections", [self.artist]):
+            artist.remove()
+        self.artist = None
@@ -0,0 +1,132 @@
+import multiprocessing
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sympy
+
+DEFAULT_INTEGRAL_TIMEOUT_SECONDS = 10.0
+WORKER_STARTUP_TIMEOUT_SECONDS = 60.0
+DEFAULT_MEMO_SIZE = 256
+NO_CLOSED_FORM_MESSAGE = "no closed form within budget"
+
+class SymbolicResult:
+    """The outcome of a symbolic operation: an expression, or a message saying why there is none."""
+
+    def __init__(self, expression: "sympy.Expr | None" = None, message: str | None = None):
+        self.expression = expression
+        self.message = message
+
+    @property
+    def ok(self) -> bool:
+        return self.expression is not None
+
+    def __str__(self) -> str:
+        return str(self.expression) if self.ok else self.message
+
+def serve_integrals(connection) -> None:
+    """Integrate expressions received on a pipe until it is closed, in a worker process."""
+    import sympy
+    x = sympy.Symbol("x")
+    connection.send("ready")
+    while True:
+        try:
+            expression = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((True, expression.integrate(x)))
+        except Exception as error:
+            connection.send((False, str(error)))
+
+class SymbolicService:
+    """Memoized derivatives and integrals, with integrals computed in a killable worker process.
+
+    sympy's integrate can run for minutes on non-elementary integrands, so it runs in a
+    separate process that is killed and replaced when it exceeds timeout_seconds. Results,
+    including timeouts, are memoized per expression and operation so repeated requests are
+    instant.
+    """
+
+    def __init__(self, timeout_seconds: float = DEFAULT_INTEGRAL_TIMEOUT_SECONDS, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.timeout_seconds = timeout_seconds
+        self.maxsize = maxsize
+        self._results: OrderedDict[tuple, SymbolicResult] = OrderedDict()
+        self._lock = Lock()
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._connection = None
+
+    def derivative(self, expression: "sympy.Expr") -> SymbolicResult:
+        """Get the derivative of an expression with respect to x."""
+        import sympy
+        key = (expression, "derivative")
+        result = self._get(key)
+        if result is None:
+            result = self._put(key, SymbolicResult(expression.diff(sympy.Symbol("x"))))
+        return result
+
+    def integral(self, expression: "sympy.Expr") -> SymbolicResult:
+        """Get the antiderivative of an expression with respect to x within the time budget."""
+        import sympy
+        key = (expression, "integral", self.timeout_seconds)
+        result = self._get(key)
+        if result is None:
+            with self._lock:
+                integral = self._integrate(expression)
+            if integral is None or integral.has(sympy.Integral):
+                result = SymbolicResult(message=NO_CLOSED_FORM_MESSAGE)
+            else:
+                result = SymbolicResult(integral)
+            self._put(key, result)
+        return result
+
+    def close(self) -> None:
+        """Stop the integration worker process."""
+        with self._lock:
+            self._stop_worker()
+
+    def _get(self, key: tuple) -> SymbolicResult | None:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def _put(self, key: tuple, result: SymbolicResult) -> SymbolicResult:
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return result
+
+    def _integrate(self, expression: "sympy.Expr") -> "sympy.Expr | None":
+        if not self._start_worker():
+            return None
+        self._connection.send(expression)
+        if not self._connection.poll(self.timeout_seconds):
+            self._stop_worker()
+            return None
+        succeeded, payload = self._connection.recv()
+        return payload if succeeded else None
+
+    def _start_worker(self) -> bool:
+        if self._process is not None and self._process.is_alive():
+            return True
+        self._connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(target=serve_integrals, args=(child_connection,), daemon=True)
+        self._process.start()
+        child_connection.close()
+        if not self._connection.poll(WORKER_STARTUP_TIMEOUT_SECONDS):
+            self._stop_worker()
+            return False
+        self._connection.recv()
+        return True
+
+    def _stop_worker(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._connection.close()
+        self._process = None
+        self._connection = None
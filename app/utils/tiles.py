@@ -0,0 +1,102 @@
+import math
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+import numpy as np
+from utils import helpers
+
+TILE_SAMPLES = 256
+DEFAULT_CACHE_BYTES = 128 * 1024 * 1024
+# largest grid index whose x value i * 2**level float64 still represents exactly
+MAX_TILE_INDEX = 2**52
+
+def get_level(view_xmin: float, view_xmax: float, num_samples: int) -> int:
+    """Get the power of two sample step closest to num_samples samples over the view."""
+    return round(math.log2((view_xmax - view_xmin) / max(num_samples - 1, 1)))
+
+def can_tile(view_xmin: float, view_xmax: float, level: int) -> bool:
+    """Check whether the samples of a view at level fall on exactly representable grid points."""
+    return max(abs(view_xmin), abs(view_xmax)) < math.ldexp(MAX_TILE_INDEX, level)
+
+class TileCache:
+    """Samples of curves in tiles of TILE_SAMPLES x values at power of two steps, keyed by (expression, level, tile index).
+
+    Tile t at level L holds the samples at x = (t * TILE_SAMPLES + k) * 2**L, so the same
+    region at the same zoom level always maps to the same tiles and a view is assembled
+    from cached tiles, evaluating only the missing ones. The least recently used tiles
+    are evicted above max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._tiles: OrderedDict[tuple[str, int, int], np.ndarray] = OrderedDict()
+        self._nbytes = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get_samples(self, key: str, kernel: Callable[[np.ndarray], np.ndarray], view_xmin: float, view_xmax: float, num_samples: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get evenly spaced samples covering the view at about num_samples resolution from the tiles of an expression."""
+        x_data, (y_data,) = self.get_fused_samples((key,), lambda x: helpers.evaluate_at(kernel, x)[np.newaxis], view_xmin, view_xmax, num_samples)
+        return x_data, y_data
+
+    def get_fused_samples(self, keys: tuple[str, ...], evaluate: Callable[[np.ndarray], np.ndarray], view_xmin: float, view_xmax: float, num_samples: int) -> tuple[np.ndarray, list[np.ndarray]]:
+        """Get samples covering the view for several expressions, evaluating the tiles any of them miss in one call.
+
+        evaluate takes x values and returns one row of values per key, like a fused kernel.
+        """
+        level = get_level(view_xmin, view_xmax, num_samples)
+        step = math.ldexp(1.0, level)
+        first_tile, last_tile = math.floor(view_xmin / step) // TILE_SAMPLES, math.ceil(view_xmax / step) // TILE_SAMPLES
+        tile_indices = range(first_tile, last_tile + 1)
+        with self._lock:
+            tiles = {(key, index): self._get((key, level, index)) for key in keys for index in tile_indices}
+        missing = sorted({index for (_, index), tile in tiles.items() if tile is None})
+        if missing:
+            x_missing = np.concatenate([self.get_tile_x(level, index) for index in missing])
+            y_missing = evaluate(x_missing)
+            with self._lock:
+                for key, y_row in zip(keys, y_missing):
+                    for index, tile in zip(missing, np.split(y_row, len(missing))):
+                        tile = tiles[key, index] = tile.copy()
+                        self._put((key, level, index), tile)
+        x_data = np.ldexp(np.arange(first_tile * TILE_SAMPLES, (last_tile + 1) * TILE_SAMPLES, dtype=np.float64), level)
+        return x_data, [np.concatenate([tiles[key, index] for index in tile_indices]) for key in keys]
+
+    def get_tile_x(self, level: int, index: int) -> np.ndarray:
+        return np.ldexp(np.arange(index * TILE_SAMPLES, (index + 1) * TILE_SAMPLES, dtype=np.float64), level)
+
+    def clear(self) -> None:
+        """Remove every tile and reset the hit and miss counters."""
+        with self._lock:
+            self._tiles.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _get(self, key: tuple[str, int, int]) -> np.ndarray | None:
+        tile = self._tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tiles.move_to_end(key)
+        return tile
+
+    def _put(self, key: tuple[str, int, int], tile: np.ndarray) -> None:
+        if key in self._tiles:
+            self._nbytes -= self._tiles[key].nbytes
+        self._tiles[key] = tile
+        self._nbytes += tile.nbytes
+        while self._nbytes > self.max_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+tile_cache = TileCache()
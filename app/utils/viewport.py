@@ -0,0 +1,66 @@
+import math
+import numpy as np
+from typing import Callable
+
+ZOOM_IN_FACTOR = 0.9
+ZOOM_OUT_FACTOR = 1.1
+RESOLUTION_TOLERANCE = 2.0
+KEEP_MARGIN = 0.5
+MIN_VIEW_ULPS = 64
+
+def zoom_limits(limits: tuple[float, float], anchor: float, factor: float) -> tuple[float, float]:
+    """Scale axis limits by factor while keeping anchor at the same screen position."""
+    low, high = limits
+    return anchor + (low - anchor) * factor, anchor + (high - anchor) * factor
+
+def zoom_about_center(limits: tuple[float, float], factor: float) -> tuple[float, float]:
+    """Scale axis limits by factor around their center, stopping before float64 can no longer tell the limits apart."""
+    low, high = limits
+    zoomed_low, zoomed_high = zoom_limits(limits, (low + high) / 2, factor)
+    if zoomed_high - zoomed_low < MIN_VIEW_ULPS * np.spacing(max(abs(low), abs(high))):
+        return limits
+    return zoomed_low, zoomed_high
+
+def resample_view(
+    sample: Callable[[float, float, int], tuple[np.ndarray, np.ndarray]],
+    x_data: np.ndarray,
+    y_data: np.ndarray,
+    view_xmin: float,
+    view_xmax: float,
+    num_samples: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Resample curve data so it covers the visible x range at num_samples resolution.
+
+    When the existing samples already have about the right spacing (a pan, or a small zoom)
+    only the newly exposed intervals on either side are sampled, and samples further than
+    KEEP_MARGIN view widths outside the view are dropped. Otherwise the visible range is
+    sampled again from scratch.
+    """
+    view_span = view_xmax - view_xmin
+    if view_span <= 0:
+        return x_data, y_data
+    target_step = view_span / (num_samples - 1)
+    if x_data.size < 2:
+        return sample(view_xmin, view_xmax, num_samples)
+    step = (x_data[-1] - x_data[0]) / (x_data.size - 1)
+    overlaps = x_data[0] < view_xmax and x_data[-1] > view_xmin
+    if not overlaps or not (target_step / RESOLUTION_TOLERANCE <= step <= target_step * RESOLUTION_TOLERANCE):
+        return sample(view_xmin, view_xmax, num_samples)
+
+    x_parts, y_parts = [], []
+    if view_xmin < x_data[0]:
+        num_left = math.ceil((x_data[0] - view_xmin) / step)
+        x_left, y_left = sample(x_data[0] - num_left * step, x_data[0], num_left + 1)
+        x_parts.append(x_left[:-1])
+        y_parts.append(y_left[:-1])
+    x_parts.append(x_data)
+    y_parts.append(y_data)
+    if view_xmax > x_data[-1]:
+        num_right = math.ceil((view_xmax - x_data[-1]) / step)
+        x_right, y_right = sample(x_data[-1], x_data[-1] + num_right * step, num_right + 1)
+        x_parts.append(x_right[1:])
+        y_parts.append(y_right[1:])
+    x_data, y_data = np.concatenate(x_parts), np.concatenate(y_parts)
+
+    keep = (x_data >= view_xmin - KEEP_MARGIN * view_span) & (x_data <= view_xmax + KEEP_MARGIN * view_span)
+    return x_data[keep], y_data[keep]
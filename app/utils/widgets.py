@@ -1,4 +1,9 @@
 from PySide6.QtWidgets import QMessageBox
+from PySide6.QtCore import Signal
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from utils.enums import MessageType
+from utils.helpers import configure_logging
+from utils.instrumentation import instrumentation
 
 class CustomMessageBox(QMessageBox):
 
@@ -31,5 +36,28 @@ class CustomMessageBox(QMessageBox):
         w.setIcon(icon)
         w.setStandardButtons(buttons)
         w.exec()
-    
-    
\ No newline at end of file
+
+def show_message(timeout_seconds: float, title: str, message: str, message_type: MessageType) -> None:
+    """Show a message to the user."""
+    from loguru import logger
+    user_message = message.split("-")[0]
+    configure_logging()
+    if message_type == MessageType.ERROR:
+        logger.error(message)
+        CustomMessageBox.showWithTimeout(timeout_seconds=timeout_seconds, title=title, message=user_message, icon=QMessageBox.Warning)
+    elif message_type == MessageType.WARNING:
+        logger.warning(message)
+        CustomMessageBox.showWithTimeout(timeout_seconds=timeout_seconds, title=title, message=user_message, icon=QMessageBox.Warning)
+    elif message_type == MessageType.INFORMATION:
+        logger.info(message)
+        CustomMessageBox.showWithTimeout(timeout_seconds=timeout_seconds, title=title, message=user_message, icon=QMessageBox.Information)
+
+class InstrumentedFigureCanvas(FigureCanvasQTAgg):
+    """A Qt figure canvas that records every full render as a draw span."""
+    drawn = Signal()
+
+    def draw(self):
+        """Render the figure."""
+        with instrumentation.span("draw"):
+            super().draw()
+        self.drawn.emit()
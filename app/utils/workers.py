@@ -0,0 +1,173 @@
+from threading import Event
+from typing import Callable
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, Signal
+from utils import export, helpers, implicit
+from utils.enums import SamplingMode, SurfaceStyle
+from utils.exceptions import EvaluationCancelled, ValidationError
+from utils.expression_cache import CachedExpression
+from utils.instrumentation import instrumentation
+
+class PlotResult:
+    """The parsed expression and sampled data for a plot request, or the style of a surface drawn later at the canvas resolution."""
+
+    def __init__(self, cached_expression: CachedExpression, xmin: float, xmax: float, x_data: np.ndarray, y_data: np.ndarray, surface_style: SurfaceStyle | None = None):
+        self.cached_expression = cached_expression
+        self.xmin = xmin
+        self.xmax = xmax
+        self.x_data = x_data
+        self.y_data = y_data
+        self.surface_style = surface_style
+
+    @property
+    def is_implicit(self) -> bool:
+        return helpers.is_implicit(self.cached_expression.tree) and not self.is_surface
+
+    @property
+    def is_surface(self) -> bool:
+        return self.surface_style is not None
+
+def evaluate_plot_request(function_string: str, xmin_input: str, xmax_input: str, num_samples: int, sampling_mode: SamplingMode, cancelled: Event | None = None, surface_style: SurfaceStyle | None = None) -> PlotResult:
+    """Parse, compile and evaluate a plot request, checking for cancellation between stages.
+
+    An implicit curve is traced over the square with the x range on both axes. A function of
+    x and y is only compiled when a surface style is given, its mesh depends on the canvas.
+    """
+    if cancelled is None:
+        cancelled = Event()
+    cached_expression = helpers.get_cached_expression(function_string)
+    xmin, xmax = helpers.get_x_range(xmin_input, xmax_input)
+    if cancelled.is_set():
+        raise EvaluationCancelled()
+    with instrumentation.span("compile"):
+        kernel = cached_expression.kernel
+    if cancelled.is_set():
+        raise EvaluationCancelled()
+    if surface_style and helpers.is_implicit(cached_expression.tree):
+        return PlotResult(cached_expression, xmin, xmax, np.empty(0), np.empty(0), surface_style)
+    with instrumentation.span("evaluate"):
+        if helpers.is_implicit(cached_expression.tree):
+            x_data, y_data = implicit.contour(kernel, xmin, xmax, xmin, xmax)
+        else:
+            x_data, y_data = helpers.evaluate_function(kernel, xmin, xmax, num_samples, sampling_mode, cancelled)
+    return PlotResult(cached_expression, xmin, xmax, x_data, y_data)
+
+def log_unexpected_error(message: str) -> None:
+    """Log an unexpected error of a job with its traceback, importing loguru only when one happens."""
+    from loguru import logger
+    helpers.configure_logging()
+    logger.exception(message)
+
+class EvaluationSignals(QObject):
+    """Signals emitted by an evaluation job."""
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+class EvaluationJob(QRunnable):
+    """Evaluate a plot request off the GUI thread and report back through signals."""
+
+    def __init__(self, job_id: int, function_string: str, xmin_input: str, xmax_input: str, num_samples: int, sampling_mode: SamplingMode, surface_style: SurfaceStyle | None = None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.function_string = function_string
+        self.xmin_input = xmin_input
+        self.xmax_input = xmax_input
+        self.num_samples = num_samples
+        self.sampling_mode = sampling_mode
+        self.surface_style = surface_style
+        self.cancelled = Event()
+        self.signals = EvaluationSignals()
+
+    def cancel(self) -> None:
+        """Ask the job to stop, its result will not be emitted."""
+        self.cancelled.set()
+
+    def run(self) -> None:
+        """Run the evaluation and emit finished or failed unless the job was cancelled."""
+        try:
+            result = evaluate_plot_request(self.function_string, self.xmin_input, self.xmax_input, self.num_samples, self.sampling_mode, self.cancelled, self.surface_style)
+        except EvaluationCancelled:
+            return
+        except ValidationError as validation_error:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.job_id, str(validation_error))
+            return
+        except Exception as error:
+            log_unexpected_error(f"Evaluating {self.function_string!r} failed")
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.job_id, "function can not be evaluated." + "-" + f"{type(error).__name__}: {error}")
+            return
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.job_id, result)
+
+class ExportSignals(QObject):
+    """Signals emitted by an export job."""
+    progress = Signal(int, int)
+    finished = Signal(int)
+    failed = Signal(int, str)
+    cancelled = Signal(int)
+
+class ExportJob(QRunnable):
+    """Stream the samples of the plotted functions to a file off the GUI thread, reporting progress in percent."""
+
+    def __init__(self, job_id: int, file_name: str, kernels: list[Callable[[np.ndarray], np.ndarray]], labels: list[str], xmin: float, xmax: float, num_samples: int):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.file_name = file_name
+        self.kernels = kernels
+        self.labels = labels
+        self.xmin = xmin
+        self.xmax = xmax
+        self.num_samples = num_samples
+        self.cancelled = Event()
+        self.signals = ExportSignals()
+
+    def cancel(self) -> None:
+        """Ask the job to stop, the partially written file is removed."""
+        self.cancelled.set()
+
+    def run(self) -> None:
+        """Run the export and emit finished, failed or cancelled."""
+        def on_progress(done: int, total: int) -> None:
+            self.signals.progress.emit(self.job_id, done * 100 // total)
+        try:
+            with instrumentation.span("export"):
+                export.export_samples(self.file_name, self.kernels, self.labels, self.xmin, self.xmax, self.num_samples, cancelled=self.cancelled, on_progress=on_progress)
+        except EvaluationCancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        except (ValidationError, OSError) as error:
+            self.signals.failed.emit(self.job_id, str(error))
+            return
+        except Exception as error:
+            log_unexpected_error(f"Exporting to {self.file_name!r} failed")
+            self.signals.failed.emit(self.job_id, "data can not be exported." + "-" + f"{type(error).__name__}: {error}")
+            return
+        self.signals.finished.emit(self.job_id)
+
+class IntegralSignals(QObject):
+    """Signals emitted by an integral job."""
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+class IntegralJob(QRunnable):
+    """Integrate an expression symbolically off the GUI thread, within the time budget of the symbolic service."""
+
+    def __init__(self, job_id: int, expression: "sympy.Expr"):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.expression = expression
+        self.signals = IntegralSignals()
+
+    def run(self) -> None:
+        """Run the integration and emit finished with its SymbolicResult, or failed."""
+        try:
+            result = helpers.symbolic_service.integral(self.expression)
+        except Exception as error:
+            log_unexpected_error(f"Integrating {self.expression} failed")
+            self.signals.failed.emit(self.job_id, "integral can not be computed." + "-" + f"{type(error).__name__}: {error}")
+            return
+        self.signals.finished.emit(self.job_id, result)